@@ -1,11 +1,14 @@
 # agents/adaptive_questionnaire_agent.py
 import os
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from dotenv import load_dotenv
 from google.adk import Agent
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
+from app.agents.runner_utils import run_agent, stream_agent
+from app.agents.session_manager import AgentSessionManager
+from app.agents.response_cache import ResponseCache
+from app.agents.context_compaction import ContextCompactor
+from app.agents.micro_batcher import batching_model
 
 load_dotenv()
 model_name = os.getenv("MODEL")
@@ -13,10 +16,14 @@ model_name = os.getenv("MODEL")
 
 class AdaptiveQuestionnaireAgent:
     """Starts a questionnaire for the patient based on the trigger."""
-    def __init__(self):
+    def __init__(self, session_manager: Optional[AgentSessionManager] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 context_compactor: Optional[ContextCompactor] = None):
+        # Long sessions keep the last turns verbatim and a summary of the rest
+        self.context_compactor = context_compactor or ContextCompactor()
         self.agent = Agent(
             name="AdaptiveQuestionnaire",
-            model=model_name,
+            model=batching_model(model_name),
             instruction="""
             You are an adaptive questionnaire agent that personalizes PRO surveys
             based on patient responses and comprehension signals.
@@ -27,48 +34,59 @@ class AdaptiveQuestionnaireAgent:
             - Support accessibility requirements
             - Ensure clinical relevance while maintaining engagement
             - Adapt delivery mode (text, simplified language, etc.)
-            """
+            """,
+            before_model_callback=self.context_compactor.before_model
         )
-        # Setup session, in-memory session service and runner
-        self.session = None
-        self.session_service = InMemorySessionService()
+        # Sessions are reused per patient and evicted when idle
+        self.session_manager = session_manager or AgentSessionManager()
+        self.response_cache = response_cache
         self.runner = Runner(
             agent=self.agent,
-            app_name="healthcare_companion",
-            session_service=self.session_service
+            app_name=self.session_manager.app_name,
+            session_service=self.session_manager.session_service
         )
 
     async def generate_adaptive_questions(self, patient_context: dict,
                                           message: Optional[str]) -> dict:
         """Generate personalized questions based on patient context"""
-        user_id = patient_context.get('id', 'user_123')
-        if not self.session:
-            session = await self.session_service.create_session(
-                user_id=user_id,
-                app_name="healthcare_companion"
-            )
-            self.session = session
-
-        # User message as content
-        user_message = types.Content(
-            role='user',
-            parts=[types.Part(text=message or "Hi")]
-        )
+        user_id = str(patient_context.get('id', 'user_123'))
+        session_id = await self.session_manager.get_session_id(self.agent.name, user_id)
+        # Only opening turns are cacheable; later ones depend on the history
+        fresh = self.session_manager.is_fresh(self.agent.name, user_id)
 
         # Run the agent with the input
-        events = self.runner.run(
+        final_response = await run_agent(
+            self.runner,
             user_id=user_id,
-            session_id=self.session.id,
-            new_message=user_message
-        )
-
-        # Extract the final LLM response
-        final_response = next(
-            (e.content.parts[0].text for e in events if e.is_final_response())
+            session_id=session_id,
+            text=message or "Hi",
+            cache=self.response_cache if fresh else None,
+            context=patient_context
         )
+        self.session_manager.record_turn(self.agent.name, user_id, message or "Hi", final_response)
 
         return {
             "message": final_response,
             "next_action": "trend_monitoring",
             "patient_id": patient_context.get('id')
         }
+
+    async def stream_adaptive_questions(self, patient_context: dict,
+                                        message: Optional[str]) -> AsyncIterator[dict]:
+        """Stream the reply: ``delta`` chunks, then the same dict as the non-streaming call"""
+        user_id = str(patient_context.get('id', 'user_123'))
+        session_id = await self.session_manager.get_session_id(self.agent.name, user_id)
+
+        final_response = ""
+        async for chunk in stream_agent(self.runner, user_id, session_id, message or "Hi"):
+            if chunk.final:
+                final_response = chunk.text
+            else:
+                yield {"delta": chunk.text}
+        self.session_manager.record_turn(self.agent.name, user_id, message or "Hi", final_response)
+
+        yield {
+            "message": final_response,
+            "next_action": "trend_monitoring",
+            "patient_id": patient_context.get('id')
+        }
@@ -0,0 +1,231 @@
+# agents/admission.py
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# 0 (the default) disables the rate limit; set it to the provider's quota
+LLM_RATE_PER_SECOND = float(os.getenv("LLM_RATE_PER_SECOND", "0"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "100"))
+LLM_MAX_WAIT_SECONDS = float(os.getenv("LLM_MAX_WAIT_SECONDS", "10"))
+
+# Lower value is served first
+PRIORITY_IN_PROGRESS = 0
+PRIORITY_NEW = 1
+
+
+class AdmissionRejected(Exception):
+    """Raised when a model call is shed instead of queued"""
+    def __init__(self, model: str, reason: str, retry_after: float):
+        super().__init__(f"Model {model} is overloaded ({reason}), retry in {retry_after:.0f}s")
+        self.model = model
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Rate limiter allowing bursts of ``burst`` calls at ``rate`` per second"""
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def time_until_token(self) -> float:
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate) if self.rate > 0 else float("inf")
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "deadline", "enqueued", "future")
+
+    def __init__(self, priority: int, seq: int, deadline: float):
+        self.priority = priority
+        self.seq = seq
+        self.deadline = deadline
+        self.enqueued = time.monotonic()
+        self.future = asyncio.get_running_loop().create_future()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AdmissionController:
+    """Concurrency limit, optional rate limit and bounded priority queue for one model.
+
+    Calls that would certainly miss their deadline (judged from the queue
+    ahead of them and the recent call duration) are shed up front rather
+    than left to time out in the queue; when the queue is full a new-session
+    call is shed in favour of an in-progress one.
+    """
+    def __init__(self, model: str, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 rate_per_second: float = LLM_RATE_PER_SECOND, burst: int = LLM_BURST,
+                 max_queue: int = LLM_MAX_QUEUE, max_wait: float = LLM_MAX_WAIT_SECONDS):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(rate_per_second, burst) if rate_per_second > 0 else None
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self.in_flight = 0
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._avg_service = 1.0  # seconds, exponentially weighted
+        self._waits: Deque[float] = deque(maxlen=1000)
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "deadline": 0}
+
+    @asynccontextmanager
+    async def admit(self, priority: int = PRIORITY_NEW, max_wait: Optional[float] = None):
+        """Wait for a slot, run the body, then release the slot"""
+        await self._acquire(priority, self.max_wait if max_wait is None else max_wait)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._avg_service = 0.8 * self._avg_service + 0.2 * (time.monotonic() - started)
+            self.in_flight -= 1
+            self._dispatch()
+
+    async def _acquire(self, priority: int, max_wait: float):
+        if not self._queue and self.in_flight < self.max_concurrency and self._take_token():
+            self._admitted(0.0)
+            return
+
+        # Calls ahead of this one that must finish (or start) first
+        ahead = sum(1 for waiter in self._queue if waiter.priority <= priority)
+        expected_wait = (ahead + 1) * self._avg_service / self.max_concurrency
+        if expected_wait > max_wait:
+            self._reject("deadline", expected_wait)
+
+        if len(self._queue) >= self.max_queue:
+            worst = max(self._queue)
+            if worst.priority <= priority:
+                self._reject("queue_full", expected_wait)
+            self._queue.remove(worst)
+            heapq.heapify(self._queue)
+            self.rejected["queue_full"] += 1
+            worst.future.set_exception(AdmissionRejected(self.model, "queue_full", expected_wait))
+
+        waiter = _Waiter(priority, next(self._seq), time.monotonic() + max_wait)
+        heapq.heappush(self._queue, waiter)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=max_wait)
+        except asyncio.TimeoutError:
+            if waiter.future.done() and not waiter.future.cancelled() and not waiter.future.exception():
+                return  # admitted just as the wait expired
+            self._discard(waiter)
+            self._reject("deadline", self.max_wait)
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled() and not waiter.future.exception():
+                # Give the slot to the next caller
+                self.in_flight -= 1
+                self._dispatch()
+            else:
+                self._discard(waiter)
+            raise
+
+    def _discard(self, waiter: _Waiter):
+        if waiter in self._queue:
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+        if not waiter.future.done():
+            waiter.future.cancel()
+
+    def _dispatch(self):
+        """Hand free slots to queued callers in priority order"""
+        now = time.monotonic()
+        while self._queue and self.in_flight < self.max_concurrency:
+            waiter = self._queue[0]
+            if waiter.future.done() or waiter.deadline <= now:
+                heapq.heappop(self._queue)
+                continue
+            if not self._take_token():
+                self._schedule(self.bucket.time_until_token())
+                return
+            heapq.heappop(self._queue)
+            self._admitted(now - waiter.enqueued)
+            waiter.future.set_result(None)
+
+    def _take_token(self) -> bool:
+        return self.bucket is None or self.bucket.try_take()
+
+    def _schedule(self, delay: float):
+        if self._timer is not None and not self._timer.cancelled():
+            return
+        loop = asyncio.get_running_loop()
+
+        def _fire():
+            self._timer = None
+            self._dispatch()
+
+        self._timer = loop.call_later(delay, _fire)
+
+    def _admitted(self, waited: float):
+        self.in_flight += 1
+        self.admitted += 1
+        self._waits.append(waited)
+
+    def _reject(self, reason: str, retry_after: float):
+        self.rejected[reason] += 1
+        raise AdmissionRejected(self.model, reason, max(retry_after, 1.0))
+
+    def stats(self) -> Dict:
+        waits = sorted(self._waits)
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._queue),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "wait_seconds": {
+                "avg": round(sum(waits) / len(waits), 4) if waits else 0.0,
+                "p95": round(waits[int(len(waits) * 0.95)], 4) if waits else 0.0,
+                "max": round(waits[-1], 4) if waits else 0.0
+            },
+            "avg_call_seconds": round(self._avg_service, 3),
+            "limits": {
+                "max_concurrency": self.max_concurrency,
+                "rate_per_second": self.bucket.rate if self.bucket else None,
+                "burst": self.bucket.burst if self.bucket else None,
+                "max_queue": self.max_queue,
+                "max_wait_seconds": self.max_wait
+            }
+        }
+
+
+class ModelAdmission:
+    """One admission controller per model name"""
+    def __init__(self, **limits):
+        self.limits = limits
+        self._controllers: Dict[str, AdmissionController] = {}
+
+    def for_model(self, model: str) -> AdmissionController:
+        controller = self._controllers.get(model)
+        if controller is None:
+            controller = self._controllers[model] = AdmissionController(model, **self.limits)
+        return controller
+
+    def stats(self) -> Dict[str, Dict]:
+        return {model: controller.stats() for model, controller in self._controllers.items()}
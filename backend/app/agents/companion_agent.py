@@ -1,11 +1,14 @@
 # agents/companion_agent.py
 import os
-from typing import Optional
+from typing import AsyncIterator, Optional
 from dotenv import load_dotenv
 from google.adk import Agent
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
+from app.agents.runner_utils import run_agent, stream_agent
+from app.agents.session_manager import AgentSessionManager
+from app.agents.response_cache import ResponseCache
+from app.agents.context_compaction import ContextCompactor
+from app.agents.micro_batcher import batching_model
 
 load_dotenv()
 model_name = os.getenv("MODEL")
@@ -13,11 +16,15 @@ model_name = os.getenv("MODEL")
 
 class CompanionAgent:
     """Agent that initiates the check-in process"""
-    def __init__(self):
+    def __init__(self, session_manager: Optional[AgentSessionManager] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 context_compactor: Optional[ContextCompactor] = None):
+        # Long sessions keep the last turns verbatim and a summary of the rest
+        self.context_compactor = context_compactor or ContextCompactor()
         # Define agent
         self.agent = Agent(
             name="HealthcareCompanion",
-            model=model_name,
+            model=batching_model(model_name),
             instruction="""
             You are a compassionate healthcare companion agent specialized in
             patient-reported outcomes (PROs) for chronic care patients.
@@ -29,44 +36,58 @@ class CompanionAgent:
             - Collect initial assessment data
 
             Always be empathetic, respectful, and encourage honest communication.
-            """
+            """,
+            before_model_callback=self.context_compactor.before_model
         )
-        # Setup in-memory session service and runner
-        self.session_service = InMemorySessionService()
+        # Sessions are reused per patient and evicted when idle
+        self.session_manager = session_manager or AgentSessionManager()
+        self.response_cache = response_cache
         self.runner = Runner(
             agent=self.agent,
-            app_name="healthcare_companion",
-            session_service=self.session_service
+            app_name=self.session_manager.app_name,
+            session_service=self.session_manager.session_service
         )
 
     async def initiate_checkin(self, patient_data: dict, message: Optional[str]) -> dict:
         """Initiate conversational check-in with patient"""
-        user_id = patient_data.get('id', 'user_123')
-        session = await self.session_service.create_session(
-            user_id=user_id,
-            app_name="healthcare_companion"
-        )
-
-        # User message as content
-        user_message = types.Content(
-            role='user',
-            parts=[types.Part(text=message or "Hi")]
-        )
+        user_id = str(patient_data.get('id', 'user_123'))
+        session_id = await self.session_manager.get_session_id(self.agent.name, user_id)
+        # Only opening turns are cacheable; later ones depend on the history
+        fresh = self.session_manager.is_fresh(self.agent.name, user_id)
 
         # Run the agent with the input
-        events = self.runner.run(
+        final_response = await run_agent(
+            self.runner,
             user_id=user_id,
-            session_id=session.id,
-            new_message=user_message
-        )
-
-        # Extract the final LLM response
-        final_response = next(
-            (e.content.parts[0].text for e in events if e.is_final_response())
+            session_id=session_id,
+            text=message or "Hi",
+            cache=self.response_cache if fresh else None,
+            context=patient_data
         )
+        self.session_manager.record_turn(self.agent.name, user_id, message or "Hi", final_response)
 
         return {
             "message": final_response,
             "next_action": "adaptive_questionnaire",
             "patient_id": patient_data.get('id')
         }
+
+    async def stream_checkin(self, patient_data: dict,
+                             message: Optional[str]) -> AsyncIterator[dict]:
+        """Stream the reply: ``delta`` chunks, then the same dict as the non-streaming call"""
+        user_id = str(patient_data.get('id', 'user_123'))
+        session_id = await self.session_manager.get_session_id(self.agent.name, user_id)
+
+        final_response = ""
+        async for chunk in stream_agent(self.runner, user_id, session_id, message or "Hi"):
+            if chunk.final:
+                final_response = chunk.text
+            else:
+                yield {"delta": chunk.text}
+        self.session_manager.record_turn(self.agent.name, user_id, message or "Hi", final_response)
+
+        yield {
+            "message": final_response,
+            "next_action": "adaptive_questionnaire",
+            "patient_id": patient_data.get('id')
+        }
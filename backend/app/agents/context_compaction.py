@@ -0,0 +1,237 @@
+# agents/context_compaction.py
+import logging
+import os
+import re
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.events import Event
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.sessions.state import State
+from google.genai import types
+
+load_dotenv()
+RECENT_TURNS = int(os.getenv("AGENT_CONTEXT_RECENT_TURNS", "6"))
+MAX_SUMMARIES = int(os.getenv("AGENT_CONTEXT_MAX_SUMMARIES", "5000"))
+logger = logging.getLogger(__name__)
+
+# Rough token estimate; good enough to compare prompts before and after
+CHARS_PER_TOKEN = 4
+
+# Session state key under which a session service exposes the summary of the
+# events it has deleted; temp: keys are never written back to the session
+SUMMARY_STATE_KEY = State.TEMP_PREFIX + "context_summary"
+
+# PRO readings worth carrying forward once the turn that reported them is dropped
+PRO_PATTERNS = {
+    "blood_pressure": re.compile(r"(?:blood\s+pressure|\bbp)\D{0,30}?(\d{2,3}\s*/\s*\d{2,3})", re.I),
+    "blood_sugar": re.compile(r"(?:blood\s+sugar|glucose|sugar)\D{0,30}?(\d{1,3}(?:\.\d+)?)", re.I),
+    "pain_level": re.compile(r"\bpain\D{0,30}?(\d{1,2})(?:\s*(?:/|out\s+of)\s*10)?", re.I),
+    "mood": re.compile(r"\bmood\D{0,30}?(\d{1,2})(?:\s*(?:/|out\s+of)\s*10)?", re.I),
+    "sleep_hours": re.compile(r"(\d{1,2}(?:\.\d+)?)\s*(?:hours?|hrs?)\s+(?:of\s+)?sleep|slept\D{0,20}?(\d{1,2}(?:\.\d+)?)", re.I),
+    "medication": re.compile(r"\b(missed|forgot|skipped|took|taken)\b[^.]{0,20}\b(?:meds|medications?|pills|insulin|doses?)\b", re.I),
+}
+
+EMOTION_WORDS = {
+    "anxious": ("anxious", "worried", "nervous", "stressed", "scared", "overwhelmed"),
+    "low": ("sad", "depressed", "down", "hopeless", "lonely", "miserable"),
+    "tired": ("tired", "exhausted", "fatigued", "drained", "sleepy"),
+    "positive": ("good", "great", "better", "happy", "hopeful", "improving"),
+}
+_EMOTION_LOOKUP = {word: emotion for emotion, words in EMOTION_WORDS.items() for word in words}
+_WORD = re.compile(r"[a-z]+")
+
+
+def _text(content: types.Content) -> str:
+    return " ".join(part.text for part in content.parts or () if part.text)
+
+
+def estimate_tokens(contents: List[types.Content]) -> int:
+    """Approximate prompt tokens of a list of contents"""
+    return sum(len(_text(content)) // CHARS_PER_TOKEN + 1 for content in contents)
+
+
+def _starts_turn(content: types.Content) -> bool:
+    """A patient message; function responses belong to the model turn before them"""
+    parts = content.parts or ()
+    return content.role == "user" and any(part.text for part in parts) \
+        and not any(part.function_response for part in parts)
+
+
+def _is_patient_message(event: Event) -> bool:
+    return event.author == "user" and event.content is not None and _starts_turn(event.content)
+
+
+@dataclass
+class ConversationSummary:
+    """Running structured summary of the turns dropped from the prompt.
+
+    ``folded_through`` is the timestamp of the last patient message folded
+    in, so the summary stays correct when older events are deleted.
+    """
+    turns: int = 0
+    pro_values: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    emotions: List[Tuple[str, int]] = field(default_factory=list)
+    folded_through: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationSummary":
+        return cls(
+            turns=data["turns"],
+            pro_values=data["pro_values"],
+            emotions=[tuple(step) for step in data["emotions"]],
+            folded_through=data["folded_through"]
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def add_events(self, events: Iterable[Event]):
+        """Fold the patient messages among ``events`` that are newer than the summary"""
+        for event in events:
+            if event.timestamp > self.folded_through and _is_patient_message(event):
+                self.add_turn(_text(event.content))
+                self.folded_through = event.timestamp
+
+    def add_turn(self, patient_text: str):
+        """Fold one patient message into the summary"""
+        self.turns += 1
+        for name, pattern in PRO_PATTERNS.items():
+            for match in pattern.finditer(patient_text):
+                value = next(group for group in match.groups() if group)
+                reading = self.pro_values.setdefault(name, {"first": value, "count": "0"})
+                reading["latest"] = value
+                reading["count"] = str(int(reading["count"]) + 1)
+
+        counts: Dict[str, int] = {}
+        for word in _WORD.findall(patient_text.lower()):
+            emotion = _EMOTION_LOOKUP.get(word)
+            if emotion:
+                counts[emotion] = counts.get(emotion, 0) + 1
+        if counts:
+            emotion = max(counts, key=counts.get)
+            # Consecutive turns with the same emotion are one step of the trajectory
+            if self.emotions and self.emotions[-1][0] == emotion:
+                self.emotions[-1] = (emotion, self.emotions[-1][1] + 1)
+            else:
+                self.emotions.append((emotion, 1))
+
+    def render(self) -> str:
+        lines = [f"Summary of {self.turns} earlier turns of this conversation:"]
+        for name, reading in self.pro_values.items():
+            detail = f"latest {reading['latest']}"
+            if reading["count"] != "1":
+                detail += f", first {reading['first']}, {reading['count']} reports"
+            lines.append(f"- {name}: {detail}")
+        if self.emotions:
+            trajectory = " -> ".join(f"{emotion} (x{count})" if count > 1 else emotion
+                                     for emotion, count in self.emotions[-8:])
+            lines.append(f"- emotional trajectory: {trajectory}")
+        return "\n".join(lines)
+
+
+class ContextCompactor:
+    """Keeps the last K turns of a session verbatim and summarizes the rest.
+
+    Installed as an agent ``before_model_callback``. Older turns are folded
+    into a per-session summary incrementally, so each request only processes
+    turns that fell out of the window since the previous one, and the prompt
+    stays bounded however long the session grows. Turns are tracked by event
+    timestamp rather than position, and a summary persisted by the session
+    service (``SUMMARY_STATE_KEY``) covers the events it has deleted.
+    """
+    def __init__(self, recent_turns: int = RECENT_TURNS, max_summaries: int = MAX_SUMMARIES):
+        self.recent_turns = recent_turns
+        self.max_summaries = max_summaries
+        self._summaries: "OrderedDict[Tuple[str, str], ConversationSummary]" = OrderedDict()
+        self.requests = 0
+        self.compacted = 0
+        self.turns_folded = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.max_tokens_after = 0
+
+    def compact(self, key: Tuple[str, str], contents: List[types.Content], events: List[Event],
+                persisted: Optional[Dict[str, Any]] = None) -> List[types.Content]:
+        """Contents to send to the model for the session identified by ``key``.
+
+        ``events`` are the session's events the contents were built from and
+        ``persisted`` the summary of any events already deleted from it.
+        """
+        starts = [index for index, content in enumerate(contents) if _starts_turn(content)]
+        if len(starts) <= self.recent_turns:
+            return contents
+
+        cut = starts[-self.recent_turns]
+        patient = [event for event in events if _is_patient_message(event)]
+        cut_time = patient[-self.recent_turns].timestamp if len(patient) >= self.recent_turns else 0.0
+
+        summary = self._resume(key, events, persisted)
+        folded = summary.turns
+        summary.add_events(event for event in patient if event.timestamp < cut_time)
+        self.turns_folded += summary.turns - folded
+
+        # Prefix the summary to the first kept patient message so roles still alternate
+        first = contents[cut]
+        summary_part = types.Part(text=summary.render() + "\n\n")
+        return [types.Content(role=first.role, parts=[summary_part, *first.parts])] + contents[cut + 1:]
+
+    def _resume(self, key: Tuple[str, str], events: List[Event],
+                persisted: Optional[Dict[str, Any]]) -> ConversationSummary:
+        """The cached summary of a session, if it is still valid"""
+        base = ConversationSummary.from_dict(persisted) if persisted else None
+        base_through = base.folded_through if base else 0.0
+        first_time = events[0].timestamp if events else float("inf")
+
+        cached = self._summaries.get(key)
+        # Stale if new to this worker, behind the persisted summary, or the
+        # events it folded are gone without being persisted (session reset)
+        if cached is None or cached.folded_through < base_through or \
+                base_through < cached.folded_through < first_time:
+            cached = base or ConversationSummary()
+            self._summaries[key] = cached
+        self._summaries.move_to_end(key)
+        while len(self._summaries) > self.max_summaries:
+            self._summaries.popitem(last=False)
+        return cached
+
+    def before_model(self, callback_context: CallbackContext,
+                     llm_request: LlmRequest) -> Optional[LlmResponse]:
+        """ADK callback; rewrites the request in place and never short-circuits the model"""
+        key = (callback_context.agent_name, callback_context.session.id)
+        before = estimate_tokens(llm_request.contents)
+        llm_request.contents = self.compact(
+            key, llm_request.contents, callback_context.session.events,
+            callback_context.state.get(SUMMARY_STATE_KEY)
+        )
+        after = estimate_tokens(llm_request.contents)
+
+        self.requests += 1
+        self.tokens_before += before
+        self.tokens_after += after
+        self.max_tokens_after = max(self.max_tokens_after, after)
+        if after < before:
+            self.compacted += 1
+            logger.debug(f"Compacted context for {key}: {before} -> {after} tokens")
+        return None
+
+    def end_session(self, agent_name: str, session_id: str):
+        """Forget the summary of a finished session"""
+        self._summaries.pop((agent_name, session_id), None)
+
+    def stats(self) -> Dict:
+        """Estimated prompt tokens before and after compaction"""
+        return {
+            "requests": self.requests,
+            "compacted": self.compacted,
+            "turns_folded": self.turns_folded,
+            "cached_summaries": len(self._summaries),
+            "recent_turns": self.recent_turns,
+            "avg_tokens_before": round(self.tokens_before / self.requests, 1) if self.requests else 0.0,
+            "avg_tokens_after": round(self.tokens_after / self.requests, 1) if self.requests else 0.0,
+            "max_tokens_after": self.max_tokens_after,
+            "tokens_saved": self.tokens_before - self.tokens_after
+        }
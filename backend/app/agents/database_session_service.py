@@ -0,0 +1,223 @@
+# agents/database_session_service.py
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+from sqlalchemy import delete, select, update
+from app.agents.context_compaction import SUMMARY_STATE_KEY, ConversationSummary
+from app.database import AsyncSessionLocal
+from app.models.models import AgentSession, AgentSessionEvent
+
+load_dotenv()
+SESSION_BACKEND = os.getenv("ADK_SESSION_BACKEND", "memory")
+APPEND_BATCH_SIZE = int(os.getenv("ADK_SESSION_BATCH_SIZE", "16"))
+COMPACT_AFTER_EVENTS = int(os.getenv("ADK_SESSION_COMPACT_AFTER", "40"))
+SNAPSHOT_EVENTS = int(os.getenv("ADK_SESSION_SNAPSHOT_EVENTS", "20"))
+
+
+def _persisted_state(state: Dict[str, Any]) -> str:
+    return json.dumps(
+        {key: value for key, value in state.items() if not key.startswith(State.TEMP_PREFIX)},
+        default=str
+    )
+
+
+class SqlAlchemySessionService(BaseSessionService):
+    """ADK session service stored in the backend database.
+
+    Events are buffered per session and written in one transaction when the
+    agent produces its final response (or the buffer fills up). Once more than
+    ``compact_after`` events pile up, the latest ``snapshot_events`` are kept
+    as a snapshot on the session row, the older ones are folded into the
+    row's conversation summary and their rows deleted; the merged state is
+    kept on the row, so a load reads at most ``snapshot_events +
+    compact_after`` events however long the conversation. Loaded sessions
+    carry the summary under ``SUMMARY_STATE_KEY`` for the context compactor.
+
+    Sequence numbers are reserved with a single UPDATE ... RETURNING, which
+    also locks the row until commit, so flushes from several workers never
+    collide on (session_id, seq).
+    """
+    def __init__(self, session_factory=AsyncSessionLocal,
+                 batch_size: int = APPEND_BATCH_SIZE,
+                 compact_after: int = COMPACT_AFTER_EVENTS,
+                 snapshot_events: int = SNAPSHOT_EVENTS):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.compact_after = max(compact_after, snapshot_events)
+        self.snapshot_events = snapshot_events
+        self._pending: Dict[str, Tuple[Session, List[Event]]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def create_session(self, *, app_name: str, user_id: str,
+                             state: Optional[Dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session_id = session_id or str(uuid.uuid4())
+        state = dict(state or {})
+        now = time.time()
+
+        async with self.session_factory() as db:
+            db.add(AgentSession(
+                id=session_id,
+                app_name=app_name,
+                user_id=user_id,
+                state=_persisted_state(state),
+                last_update_time=now
+            ))
+            await db.commit()
+        return Session(id=session_id, app_name=app_name, user_id=user_id,
+                       state=state, last_update_time=now)
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        limit = config.num_recent_events if config else None
+        after = config.after_timestamp if config else None
+
+        async with self.session_factory() as db:
+            row = await db.get(AgentSession, session_id)
+            if row is None or row.app_name != app_name or row.user_id != user_id:
+                return None
+            tail = []
+            if limit != 0:
+                query = select(AgentSessionEvent.data).where(
+                    AgentSessionEvent.session_id == session_id
+                )
+                if after is not None:
+                    query = query.where(AgentSessionEvent.timestamp >= after)
+                query = query.order_by(AgentSessionEvent.seq.desc())
+                if limit:
+                    query = query.limit(limit)
+                tail = list(await db.scalars(query))[::-1]
+            snapshot = json.loads(row.snapshot_events) if limit != 0 else []
+            state, summary, last_update_time = row.state, row.summary, row.last_update_time
+
+        events = [Event.model_validate(data) for data in snapshot]
+        events += [Event.model_validate_json(data) for data in tail]
+        pending = self._pending.get(session_id)
+        if pending and limit != 0:
+            events += pending[1]
+            state = _persisted_state(pending[0].state)
+        if after is not None:
+            events = [event for event in events if event.timestamp >= after]
+        if limit:
+            events = events[-limit:]
+
+        state = json.loads(state)
+        if summary:
+            state[SUMMARY_STATE_KEY] = json.loads(summary)
+        return Session(id=session_id, app_name=app_name, user_id=user_id,
+                       state=state, events=events,
+                       last_update_time=last_update_time)
+
+    async def list_sessions(self, *, app_name: str,
+                            user_id: Optional[str] = None) -> ListSessionsResponse:
+        query = select(AgentSession).where(AgentSession.app_name == app_name)
+        if user_id is not None:
+            query = query.where(AgentSession.user_id == user_id)
+        async with self.session_factory() as db:
+            rows = await db.scalars(query.order_by(AgentSession.last_update_time))
+            return ListSessionsResponse(sessions=[
+                Session(id=row.id, app_name=row.app_name, user_id=row.user_id,
+                        state=json.loads(row.state), last_update_time=row.last_update_time)
+                for row in rows
+            ])
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        self._pending.pop(session_id, None)
+
+        async with self.session_factory() as db:
+            await db.execute(delete(AgentSessionEvent).where(
+                AgentSessionEvent.session_id == session_id
+            ))
+            await db.execute(delete(AgentSession).where(
+                AgentSession.id == session_id,
+                AgentSession.app_name == app_name,
+                AgentSession.user_id == user_id
+            ))
+            await db.commit()
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session, event)
+        if event.partial:
+            return event
+        session.last_update_time = event.timestamp
+
+        _, events = self._pending.get(session.id, (session, []))
+        events.append(event)
+        self._pending[session.id] = (session, events)
+
+        if event.is_final_response() or len(events) >= self.batch_size:
+            await self._flush_session(session.id)
+        return event
+
+    async def flush(self) -> None:
+        for session_id in list(self._pending):
+            await self._flush_session(session_id)
+
+    async def _flush_session(self, session_id: str):
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            session, events = self._pending.pop(session_id, (None, []))
+            if not events:
+                return
+            rows = [(event.timestamp, event.model_dump_json(exclude_none=True)) for event in events]
+            state = _persisted_state(session.state)
+
+            async with self.session_factory() as db:
+                reserved = (await db.execute(
+                    update(AgentSession)
+                    .where(AgentSession.id == session_id)
+                    .values(next_seq=AgentSession.next_seq + len(rows), state=state,
+                            last_update_time=session.last_update_time)
+                    .returning(AgentSession.next_seq, AgentSession.compacted_through)
+                )).first()
+                if reserved is None:
+                    return
+                next_seq, compacted_through = reserved
+                first_seq = next_seq - len(rows)
+                db.add_all([
+                    AgentSessionEvent(session_id=session_id, seq=first_seq + offset,
+                                      timestamp=timestamp, data=data)
+                    for offset, (timestamp, data) in enumerate(rows)
+                ])
+                await db.flush()
+                if next_seq - 1 - compacted_through > self.compact_after:
+                    await self._compact(db, session_id, next_seq - 1)
+                await db.commit()
+
+    async def _compact(self, db, session_id: str, through: int):
+        """Keep the latest events as the snapshot, summarize the rest and drop their rows"""
+        row = await db.get(AgentSession, session_id)
+        tail = await db.scalars(
+            select(AgentSessionEvent.data)
+            .where(AgentSessionEvent.session_id == session_id,
+                   AgentSessionEvent.seq <= through)
+            .order_by(AgentSessionEvent.seq)
+        )
+        events = json.loads(row.snapshot_events) + [json.loads(data) for data in tail]
+        split = max(len(events) - self.snapshot_events, 0)
+
+        summary = ConversationSummary.from_dict(json.loads(row.summary)) if row.summary \
+            else ConversationSummary()
+        summary.add_events(Event.model_validate(data) for data in events[:split])
+        row.summary = json.dumps(summary.to_dict())
+        row.snapshot_events = json.dumps(events[split:])
+        row.compacted_through = through
+        await db.execute(delete(AgentSessionEvent).where(
+            AgentSessionEvent.session_id == session_id,
+            AgentSessionEvent.seq <= through
+        ))
+
+
+def build_session_service() -> BaseSessionService:
+    """Session service selected by ADK_SESSION_BACKEND ("memory" or "database")"""
+    if SESSION_BACKEND == "database":
+        return SqlAlchemySessionService()
+    return InMemorySessionService()
@@ -0,0 +1,6 @@
+# agents/errors.py
+# Kept free of SDK imports so the API layer can catch these before the agents load
+
+
+class AgentTimeoutError(Exception):
+    """Raised when an agent does not produce a final response in time"""
@@ -0,0 +1,89 @@
+# agents/fake_llm.py
+import asyncio
+import math
+import os
+import random
+from typing import AsyncGenerator
+from dotenv import load_dotenv
+from google.adk.models import BaseLlm, LLMRegistry
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+load_dotenv()
+
+COMPANION_REPLIES = [
+    "Thanks for checking in today. How have you been feeling since we last spoke?",
+    "I'm glad you reached out. Is anything about your health worrying you today?",
+    "It's good to hear from you. How did you sleep last night?",
+]
+QUESTIONNAIRE_REPLIES = [
+    "On a scale of 1-10, how would you rate your energy level today?",
+    "Did you take your medication as prescribed today?",
+    "What was your blood pressure reading this morning?",
+    "Which symptoms are you experiencing today? (Select all that apply)",
+]
+
+
+class FakeLlmError(Exception):
+    """Injected model failure, standing in for provider 429s and 5xx errors"""
+
+
+class FakeLlm(BaseLlm):
+    """Offline model for load tests, selected with MODEL=fake-llm.
+
+    Only registered when ENABLE_FAKE_LLM=true.
+
+    Latency before the first token is lognormal around
+    FAKE_LLM_LATENCY_MS (spread FAKE_LLM_LATENCY_SIGMA); the reply is then
+    generated at FAKE_LLM_TOKENS_PER_SECOND. FAKE_LLM_FAILURE_RATE of the
+    calls fail.
+    """
+    latency_ms: float = float(os.getenv("FAKE_LLM_LATENCY_MS", "800"))
+    latency_sigma: float = float(os.getenv("FAKE_LLM_LATENCY_SIGMA", "0.4"))
+    tokens_per_second: float = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "60"))
+    failure_rate: float = float(os.getenv("FAKE_LLM_FAILURE_RATE", "0"))
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"fake-.*"]
+
+    def _reply(self, llm_request: LlmRequest) -> str:
+        instruction = str(llm_request.config.system_instruction or "") if llm_request.config else ""
+        replies = QUESTIONNAIRE_REPLIES if "adaptive questionnaire agent" in instruction.lower() else COMPANION_REPLIES
+        turns = sum(1 for content in llm_request.contents if content.role == "user")
+        return replies[turns % len(replies)]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.latency_ms / 1000 * math.exp(random.gauss(0, self.latency_sigma)))
+        if random.random() < self.failure_rate:
+            raise FakeLlmError(f"{self.model}: injected failure (429 RESOURCE_EXHAUSTED)")
+
+        text = self._reply(llm_request)
+        words = text.split(" ")
+        token_delay = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        if stream:
+            for index, word in enumerate(words):
+                await asyncio.sleep(token_delay)
+                chunk = word if index == len(words) - 1 else word + " "
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=chunk)]),
+                                  partial=True)
+        else:
+            await asyncio.sleep(token_delay * len(words))
+
+        prompt_chars = sum(len(part.text or "") for content in llm_request.contents
+                           for part in (content.parts or []))
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_chars // 4,
+                candidates_token_count=len(words),
+                total_token_count=prompt_chars // 4 + len(words)
+            ),
+            turn_complete=True
+        )
+
+
+LLMRegistry.register(FakeLlm)
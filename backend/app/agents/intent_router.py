@@ -0,0 +1,173 @@
+# agents/intent_router.py
+import math
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+MIN_CONFIDENCE = float(os.getenv("INTENT_ROUTER_MIN_CONFIDENCE", "0.7"))
+
+COMPANION = "companion"
+QUESTIONNAIRE = "questionnaire"
+TREND_MONITOR = "trend_monitor"
+INTENTS = (COMPANION, QUESTIONNAIRE, TREND_MONITOR)
+
+# High-precision patterns, checked in order before the model
+RULES: List[Tuple[str, "re.Pattern[str]"]] = [
+    (TREND_MONITOR, re.compile(
+        r"\b(trends?|trending|over the (?:past|last)|history|progress|compared? to|"
+        r"getting (?:better|worse)|past (?:few )?(?:days|weeks|months)|last (?:week|month))\b", re.I)),
+    (QUESTIONNAIRE, re.compile(
+        r"\b(\d{2,3}\s*(?:/|over)\s*\d{2,3}|\d+(?:\.\d+)?\s*(?:mg/dl|mmol|bpm|kg|lbs?|hours?)|"
+        r"(?:out of|/)\s*10|took my|missed my|forgot my|questionnaire|survey)\b", re.I)),
+]
+RULE_CONFIDENCE = 0.95
+
+# Seed examples for the on-CPU model
+TRAINING_EXAMPLES: List[Tuple[str, str]] = [
+    ("hi", COMPANION), ("hello there", COMPANION), ("good morning", COMPANION),
+    ("I'm feeling really down today", COMPANION), ("I feel anxious and alone", COMPANION),
+    ("I'm scared about my diagnosis", COMPANION), ("thanks for checking in", COMPANION),
+    ("I just need someone to talk to", COMPANION), ("I'm so tired of all this", COMPANION),
+    ("I had a rough night and feel awful", COMPANION), ("can you help me feel better", COMPANION),
+    ("I'm worried about my family", COMPANION), ("I feel great today", COMPANION),
+    ("not much, just wanted to say hello", COMPANION), ("I'm stressed about work", COMPANION),
+    ("my blood sugar was 140 this morning", QUESTIONNAIRE), ("pain is about a 6", QUESTIONNAIRE),
+    ("yes I took my medication", QUESTIONNAIRE), ("no I skipped my pills today", QUESTIONNAIRE),
+    ("blood pressure 130 over 85", QUESTIONNAIRE), ("I slept 5 hours", QUESTIONNAIRE),
+    ("I have a headache and dizziness", QUESTIONNAIRE), ("my energy is low, maybe a 3", QUESTIONNAIRE),
+    ("I want to answer my daily questions", QUESTIONNAIRE), ("ready for the check-in questions", QUESTIONNAIRE),
+    ("symptoms today are nausea and fatigue", QUESTIONNAIRE), ("weight is 82 kg", QUESTIONNAIRE),
+    ("I rate my mood a 7", QUESTIONNAIRE), ("took insulin after breakfast", QUESTIONNAIRE),
+    ("heart rate was 72", QUESTIONNAIRE),
+    ("how has my blood pressure changed this month", TREND_MONITOR),
+    ("am I getting better overall", TREND_MONITOR), ("show me my progress", TREND_MONITOR),
+    ("what do my readings look like over time", TREND_MONITOR),
+    ("is my sugar going up lately", TREND_MONITOR), ("compare this week to last week", TREND_MONITOR),
+    ("has my pain improved since I started the medication", TREND_MONITOR),
+    ("any patterns in my sleep", TREND_MONITOR), ("summarize my recent results", TREND_MONITOR),
+    ("are my numbers improving", TREND_MONITOR), ("what's my average blood sugar", TREND_MONITOR),
+    ("analyze my health data", TREND_MONITOR), ("is anything unusual in my recent readings", TREND_MONITOR),
+    ("how am I doing compared to before", TREND_MONITOR), ("give me a report of my symptoms", TREND_MONITOR),
+]
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+class RouteDecision(NamedTuple):
+    intent: str
+    confidence: float
+    source: str  # rule, model, llm
+
+
+def _features(text: str) -> List[str]:
+    tokens = _TOKEN.findall(text.lower())
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class TfidfLogisticModel:
+    """TF-IDF features with multinomial logistic regression, in plain Python"""
+
+    def __init__(self, examples: Sequence[Tuple[str, str]], labels: Sequence[str] = INTENTS,
+                 epochs: int = 300, learning_rate: float = 0.5, l2: float = 1e-3):
+        self.labels = tuple(labels)
+        documents = [_features(text) for text, _ in examples]
+        document_frequency = Counter(term for terms in documents for term in set(terms))
+        self.idf = {term: math.log((1 + len(documents)) / (1 + df)) + 1
+                    for term, df in document_frequency.items()}
+        self.weights = {label: {} for label in self.labels}
+        self.bias = {label: 0.0 for label in self.labels}
+
+        vectors = [self.vectorize(text) for text, _ in examples]
+        targets = [label for _, label in examples]
+        for _ in range(epochs):
+            for vector, target in zip(vectors, targets):
+                probabilities = self._softmax(vector)
+                for label in self.labels:
+                    gradient = probabilities[label] - (1.0 if label == target else 0.0)
+                    weights = self.weights[label]
+                    for term, value in vector.items():
+                        weight = weights.get(term, 0.0)
+                        weights[term] = weight - learning_rate * (gradient * value + l2 * weight)
+                    self.bias[label] -= learning_rate * gradient
+
+    def vectorize(self, text: str) -> Dict[str, float]:
+        counts = Counter(term for term in _features(text) if term in self.idf)
+        vector = {term: count * self.idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+        return {term: value / norm for term, value in vector.items()}
+
+    def _softmax(self, vector: Dict[str, float]) -> Dict[str, float]:
+        scores = {
+            label: self.bias[label] + sum(self.weights[label].get(term, 0.0) * value
+                                          for term, value in vector.items())
+            for label in self.labels
+        }
+        peak = max(scores.values())
+        exps = {label: math.exp(score - peak) for label, score in scores.items()}
+        total = sum(exps.values())
+        return {label: value / total for label, value in exps.items()}
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        probabilities = self._softmax(self.vectorize(text))
+        label = max(probabilities, key=probabilities.get)
+        return label, probabilities[label]
+
+
+class IntentRouter:
+    """Routes free text locally; low-confidence messages are left to the LLM router"""
+
+    def __init__(self, model: Optional[TfidfLogisticModel] = None, min_confidence: float = MIN_CONFIDENCE):
+        self.model = model or TfidfLogisticModel(TRAINING_EXAMPLES)
+        self.min_confidence = min_confidence
+        self.decisions = Counter()
+        self.escalations = 0
+        self.local_seconds = 0.0
+        self.llm_seconds = 0.0
+        self.llm_agreements = 0
+
+    def classify(self, message: Optional[str]) -> RouteDecision:
+        """Local decision: rules first, then the model"""
+        started = time.perf_counter()
+        text = message or ""
+        decision = None
+        for intent, pattern in RULES:
+            if pattern.search(text):
+                decision = RouteDecision(intent, RULE_CONFIDENCE, "rule")
+                break
+        if decision is None:
+            intent, confidence = self.model.predict(text)
+            decision = RouteDecision(intent, confidence, "model")
+        self.local_seconds += time.perf_counter() - started
+        return decision
+
+    def needs_escalation(self, decision: RouteDecision) -> bool:
+        return decision.confidence < self.min_confidence
+
+    def record(self, decision: RouteDecision, local: Optional[RouteDecision] = None,
+               llm_seconds: float = 0.0):
+        """Count a final decision; ``local`` is the guess an LLM decision replaced"""
+        self.decisions[decision.source] += 1
+        if decision.source == "llm":
+            self.escalations += 1
+            self.llm_seconds += llm_seconds
+            if local is not None and local.intent == decision.intent:
+                self.llm_agreements += 1
+
+    def stats(self) -> Dict:
+        total = sum(self.decisions.values())
+        local = total - self.escalations
+        avg_llm = self.llm_seconds / self.escalations if self.escalations else None
+        return {
+            "decisions": dict(self.decisions),
+            "escalation_rate": round(self.escalations / total, 3) if total else 0.0,
+            "avg_local_us": round(self.local_seconds / total * 1e6, 1) if total else 0.0,
+            "avg_llm_ms": round(avg_llm * 1000, 1) if avg_llm is not None else None,
+            # Each local decision skips one LLM routing call
+            "latency_saved_seconds": round(local * avg_llm, 2) if avg_llm is not None else None,
+            "llm_agreement": round(self.llm_agreements / self.escalations, 3) if self.escalations else None,
+            "min_confidence": self.min_confidence
+        }
@@ -0,0 +1,141 @@
+# agents/micro_batcher.py
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Tuple, Union
+from dotenv import load_dotenv
+from google.adk.models import BaseLlm, LLMRegistry
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+load_dotenv()
+LLM_MICRO_BATCH = os.getenv("LLM_MICRO_BATCH", "false").lower() in ("1", "true", "yes")
+LLM_BATCH_MAX_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", "16"))
+LLM_BATCH_MAX_WAIT_MS = float(os.getenv("LLM_BATCH_MAX_WAIT_MS", "10"))
+
+
+class BatchModelClient(ABC):
+    """A model client that answers several requests in one call"""
+
+    @abstractmethod
+    async def generate_batch(self, requests: List[LlmRequest]) -> List[Union[LlmResponse, Exception]]:
+        """Return one response (or the exception for that item) per request, in order"""
+
+
+class ConcurrentBatchClient(BatchModelClient):
+    """Fallback for models without a batch endpoint: issue the calls concurrently.
+
+    This only saves the per-request scheduling; plug in a client for a
+    batch-capable serving endpoint to get the throughput gain.
+    """
+    def __init__(self, llm: BaseLlm):
+        self.llm = llm
+
+    async def _generate(self, request: LlmRequest) -> LlmResponse:
+        response = None
+        async for response in self.llm.generate_content_async(request, stream=False):
+            pass
+        if response is None:
+            raise RuntimeError(f"Model {self.llm.model} returned no response")
+        return response
+
+    async def generate_batch(self, requests: List[LlmRequest]) -> List[Union[LlmResponse, Exception]]:
+        return await asyncio.gather(*(self._generate(request) for request in requests),
+                                    return_exceptions=True)
+
+
+class MicroBatcher:
+    """Collects concurrent requests for up to ``max_wait_ms`` (or until
+    ``max_batch_size`` are waiting), submits them as one batch and hands each
+    result back to the coroutine that asked for it"""
+    def __init__(self, client: BatchModelClient, max_batch_size: int = LLM_BATCH_MAX_SIZE,
+                 max_wait_ms: float = LLM_BATCH_MAX_WAIT_MS):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer = None
+        self._tasks = set()
+        self.batches = 0
+        self.requests = 0
+        self.max_seen = 0
+
+    async def submit(self, request: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((request, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        # Callers cancelled while waiting don't need a model call
+        batch = [(request, future) for request, future in batch if not future.done()]
+        if not batch:
+            return
+        self.batches += 1
+        self.requests += len(batch)
+        self.max_seen = max(self.max_seen, len(batch))
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        try:
+            results = await self.client.generate_batch([request for request, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch client returned {len(results)} results for {len(batch)} requests")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size_seen": self.max_seen,
+            "pending": len(self._pending)
+        }
+
+
+class BatchingLlm(BaseLlm):
+    """Routes an agent's model calls through a MicroBatcher"""
+    batcher: Any
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False):
+        # Batched calls can't stream; the whole turn arrives as one response
+        yield await self.batcher.submit(llm_request)
+
+
+_batching_models: Dict[str, BatchingLlm] = {}
+
+
+def batching_model(model_name: str) -> Union[str, BaseLlm]:
+    """The agent model: the plain name, or a shared BatchingLlm when LLM_MICRO_BATCH is on"""
+    if not LLM_MICRO_BATCH or not model_name:
+        return model_name
+    if model_name not in _batching_models:
+        client = ConcurrentBatchClient(LLMRegistry.new_llm(model_name))
+        _batching_models[model_name] = BatchingLlm(model=model_name, batcher=MicroBatcher(client))
+    return _batching_models[model_name]
+
+
+def batching_stats() -> Dict[str, Dict]:
+    return {name: llm.batcher.stats() for name, llm in _batching_models.items()}
@@ -1,21 +1,69 @@
 # agents/orchestrator.py
+import asyncio
+import functools
+import logging
 import os
-from typing import List, Optional
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 from google.adk.agents import LlmAgent
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
 from app.agents.companion_agent import CompanionAgent
 from app.agents.adaptive_questionnaire_agent import AdaptiveQuestionnaireAgent
+from app.agents.trend_monitor_agent import TrendMonitorAgent
+from app.agents.pro_history import fetch_pro_history, fetch_recent_responses
+from app.agents.session_manager import AgentSessionManager
+from app.agents.database_session_service import build_session_service
+from app.agents.response_cache import ResponseCache
+from app.agents.context_compaction import ContextCompactor
+from app.agents.admission import ModelAdmission, PRIORITY_IN_PROGRESS, PRIORITY_NEW
+from app.agents.intent_router import IntentRouter, RouteDecision, INTENTS, COMPANION, QUESTIONNAIRE, TREND_MONITOR
+from app.agents.runner_utils import AGENT_TIMEOUT_SECONDS
+from app.database import AsyncSessionLocal
 
 
 load_dotenv()
 model_name = os.getenv("MODEL")
+# Offline model for tests and load runs; never registered in production
+ENABLE_FAKE_LLM = os.getenv("ENABLE_FAKE_LLM", "false").lower() == "true"
+if ENABLE_FAKE_LLM:
+    import app.agents.fake_llm  # noqa: F401  registers MODEL=fake-*
+logger = logging.getLogger(__name__)
+
+ROUTER_INSTRUCTION = """
+Classify the patient's message for a healthcare system. Reply with exactly one word:
+- companion: emotional support and general chat
+- questionnaire: answers to health questions, readings, symptoms or medication
+- trend_monitor: questions about trends, progress or history of their data
+"""
+
+# Interaction type handled for each routed intent
+INTENT_INTERACTIONS = {
+    COMPANION: "checkin",
+    QUESTIONNAIRE: "questionnaire",
+    TREND_MONITOR: "trend_monitor",
+}
+
+# Other names clients use for the same interactions
+INTERACTION_ALIASES = {
+    "trend_analysis": "trend_monitor",
+}
 
 
 class HealthcarePROOrchestrator:
     """Root orchestrator agent handles delegation"""
     def __init__(self):
-        self.companion = CompanionAgent()
-        self.questionnaire = AdaptiveQuestionnaireAgent()
+        # One session store for all agents so eviction sees the whole worker
+        self.session_manager = AgentSessionManager(build_session_service())
+        self.response_cache = ResponseCache()
+        self.context_compactor = ContextCompactor()
+        self.companion = CompanionAgent(self.session_manager, self.response_cache, self.context_compactor)
+        self.questionnaire = AdaptiveQuestionnaireAgent(self.session_manager, self.response_cache,
+                                                        self.context_compactor)
+        self.trend_monitor = TrendMonitorAgent(self.session_manager, self.context_compactor)
+        self.admission = ModelAdmission()
+        self.intent_router = IntentRouter()
 
         # Create agent team for coordination.
         self.agent_team = LlmAgent(
@@ -32,30 +80,127 @@ class HealthcarePROOrchestrator:
             sub_agents=[
                 self.companion.agent,
                 self.questionnaire.agent,
+                self.trend_monitor.agent,
             ]
         )
 
+    def _admit(self, agent, patient_data: dict):
+        """Admission slot for the agent's model; ongoing conversations go first"""
+        user_id = str(patient_data.get('id', 'user_123'))
+        in_progress = self.session_manager.has_history(agent.agent.name, user_id)
+        model = agent.agent.model
+        controller = self.admission.for_model(model if isinstance(model, str) else model.model)
+        return controller.admit(PRIORITY_IN_PROGRESS if in_progress else PRIORITY_NEW)
+
+    async def _route_with_llm(self, message: str) -> RouteDecision:
+        """One model call to classify a message the local router is unsure about"""
+        llm = self.agent_team.canonical_model
+        request = LlmRequest(
+            model=llm.model,
+            contents=[types.Content(role='user', parts=[types.Part(text=message)])],
+            config=types.GenerateContentConfig(system_instruction=ROUTER_INSTRUCTION)
+        )
+
+        async def _generate() -> str:
+            text = ""
+            async for response in llm.generate_content_async(request):
+                if response.content and response.content.parts:
+                    text = response.content.parts[0].text or ""
+            return text
+
+        async with self.admission.for_model(llm.model).admit(PRIORITY_IN_PROGRESS):
+            answer = (await asyncio.wait_for(_generate(), timeout=AGENT_TIMEOUT_SECONDS)).lower()
+        intent = next((intent for intent in INTENTS if intent in answer), COMPANION)
+        return RouteDecision(intent, 1.0, "llm")
+
+    async def route_message(self, message: Optional[str]) -> RouteDecision:
+        """Route free text locally, escalating to the LLM router when unsure"""
+        decision = self.intent_router.classify(message)
+        if not self.intent_router.needs_escalation(decision):
+            self.intent_router.record(decision)
+            return decision
+
+        started = time.perf_counter()
+        try:
+            routed = await self._route_with_llm(message or "")
+        except Exception as e:
+            logger.warning(f"LLM routing failed, using local decision: {e}")
+            self.intent_router.record(decision)
+            return decision
+        self.intent_router.record(routed, local=decision, llm_seconds=time.perf_counter() - started)
+        return routed
+
+    async def _resolve_interaction(self, interaction_type: str,
+                                   user_message: Optional[str]) -> Tuple[str, Optional[RouteDecision]]:
+        """Explicit interaction types are kept; anything else is routed on the message"""
+        interaction_type = INTERACTION_ALIASES.get(interaction_type, interaction_type)
+        if interaction_type in INTENT_INTERACTIONS.values():
+            return interaction_type, None
+        decision = await self.route_message(user_message)
+        return INTENT_INTERACTIONS[decision.intent], decision
+
     async def handle_patient_interaction(self, patient_data: dict,
                                          interaction_type: str, user_message: Optional[str]) -> dict:
         """Orchestrate multi-agent interaction based on type"""
+        interaction_type, decision = await self._resolve_interaction(interaction_type, user_message)
+        response = await self._dispatch(patient_data, interaction_type, user_message)
+        if decision is not None:
+            response["route"] = decision._asdict()
+        return response
+
+    async def _dispatch(self, patient_data: dict, interaction_type: str,
+                        user_message: Optional[str]) -> dict:
+        """Run the agent for an interaction type"""
+        if interaction_type == "questionnaire":
+            async with self._admit(self.questionnaire, patient_data):
+                return await self.questionnaire.generate_adaptive_questions(
+                    patient_data, user_message
+                )
 
-        if interaction_type == "checkin":
+        if interaction_type == "trend_monitor":
+            history, responses = await self._trend_inputs(patient_data)
+            async with self._admit(self.trend_monitor, patient_data):
+                return await self.trend_monitor.analyze_trends(
+                    patient_data, user_message, history, responses
+                )
+
+        async with self._admit(self.companion, patient_data):
             return await self.companion.initiate_checkin(patient_data, user_message)
 
+    async def stream_patient_interaction(self, patient_data: dict, interaction_type: str,
+                                         user_message: Optional[str]) -> AsyncIterator[dict]:
+        """Streaming counterpart of handle_patient_interaction"""
+        interaction_type, decision = await self._resolve_interaction(interaction_type, user_message)
         if interaction_type == "questionnaire":
-            return await self.questionnaire.generate_adaptive_questions(
-                patient_data, user_message
-            )
+            agent, stream = self.questionnaire, self.questionnaire.stream_adaptive_questions
+        elif interaction_type == "trend_monitor":
+            history, responses = await self._trend_inputs(patient_data)
+            agent = self.trend_monitor
+            stream = functools.partial(self.trend_monitor.stream_trend_analysis,
+                                       history=history, responses=responses)
+        else:
+            agent, stream = self.companion, self.companion.stream_checkin
+
+        async with self._admit(agent, patient_data):
+            async for item in stream(patient_data, user_message):
+                if decision is not None and "delta" not in item:
+                    item["route"] = decision._asdict()
+                yield item
 
-        # Default to companion agent
-        return await self.companion.initiate_checkin(patient_data, user_message)
+    async def _trend_inputs(self, patient_data: dict) -> Tuple[Dict[str, dict], List[dict]]:
+        """History and recent answers for the trend agent, fetched concurrently"""
+        patient_id = str(patient_data.get('id', 'user_123'))
+        return await asyncio.gather(
+            self._get_historical_data(patient_id),
+            self._get_patient_responses(patient_id)
+        )
 
     async def _get_patient_responses(self, patient_id: str) -> List[dict]:
-        """Fetch patient's previous responses from database"""
-        # Implementation depends on your SQLAlchemy models
-        pass
-
-    async def _get_historical_data(self, patient_id: str) -> List[dict]:
-        """Fetch historical PRO data for trend analysis"""
-        # Implementation depends on your SQLAlchemy models
-        pass
+        """Fetch patient's latest responses (TREND_RESPONSE_WINDOW) from database"""
+        async with AsyncSessionLocal() as db:
+            return await fetch_recent_responses(db, patient_id)
+
+    async def _get_historical_data(self, patient_id: str) -> Dict[str, dict]:
+        """PRO history of the last TREND_HISTORY_DAYS as compact per-metric arrays"""
+        async with AsyncSessionLocal() as db:
+            return await fetch_pro_history(db, patient_id)
@@ -0,0 +1,94 @@
+# agents/pro_history.py
+import os
+import time
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import PROMeasurement, PROResponse
+
+load_dotenv()
+RESPONSE_WINDOW = int(os.getenv("TREND_RESPONSE_WINDOW", "20"))
+HISTORY_WINDOW_DAYS = float(os.getenv("TREND_HISTORY_DAYS", "90"))
+HISTORY_MAX_POINTS = int(os.getenv("TREND_HISTORY_MAX_POINTS", "30"))
+
+SECONDS_PER_DAY = 86400
+
+
+async def fetch_recent_responses(db: AsyncSession, patient_id: str,
+                                 limit: int = RESPONSE_WINDOW) -> List[dict]:
+    """The patient's latest questionnaire answers, oldest first"""
+    result = await db.execute(
+        select(PROResponse.category, PROResponse.response_text,
+               PROResponse.numeric_value, PROResponse.recorded_at)
+        .where(PROResponse.patient_id == patient_id)
+        .order_by(PROResponse.recorded_at.desc())
+        .limit(limit)
+    )
+    return [
+        {"category": category, "response": text, "value": value, "recorded_at": recorded_at}
+        for category, text, value, recorded_at in reversed(result.all())
+    ]
+
+
+def _bucket(dialect: str, offset, bucket_seconds: float):
+    # PostgreSQL rounds float-to-integer casts, SQLite truncates
+    if dialect == "postgresql":
+        return cast(func.floor(offset / bucket_seconds), Integer)
+    return cast(offset / bucket_seconds, Integer)
+
+
+def _slope(xs: List[float], ys: List[float]) -> float:
+    """Least-squares slope of ys over xs"""
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if not variance:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+async def fetch_pro_history(db: AsyncSession, patient_id: str,
+                            days: float = HISTORY_WINDOW_DAYS,
+                            max_points: int = HISTORY_MAX_POINTS,
+                            now: Optional[float] = None) -> Dict[str, dict]:
+    """Windowed PRO history as compact per-metric arrays.
+
+    Readings are averaged into at most ``max_points`` time buckets by the
+    database, so the result (and the prompt built from it) has the same size
+    whether the patient has a thousand readings or a hundred thousand.
+    """
+    now = now if now is not None else time.time()
+    since = now - days * SECONDS_PER_DAY
+    bucket_seconds = days * SECONDS_PER_DAY / max_points
+    bucket = _bucket(db.bind.dialect.name, PROMeasurement.recorded_at - since, bucket_seconds).label("bucket")
+
+    result = await db.execute(
+        select(PROMeasurement.metric, bucket,
+               func.avg(PROMeasurement.value), func.min(PROMeasurement.value),
+               func.max(PROMeasurement.value), func.count(), func.max(PROMeasurement.unit))
+        .where(PROMeasurement.patient_id == patient_id, PROMeasurement.recorded_at >= since)
+        .group_by(PROMeasurement.metric, bucket)
+        .order_by(PROMeasurement.metric, bucket)
+    )
+
+    history: Dict[str, dict] = {}
+    for metric, index, mean, low, high, count, unit in result.all():
+        series = history.setdefault(metric, {"unit": unit, "count": 0, "day": [], "mean": [],
+                                             "min": float("inf"), "max": float("-inf")})
+        # Bucket midpoint, in days since the start of the window
+        series["day"].append(round((min(index, max_points - 1) + 0.5) * bucket_seconds / SECONDS_PER_DAY, 1))
+        series["mean"].append(round(float(mean), 2))
+        series["min"] = min(series["min"], float(low))
+        series["max"] = max(series["max"], float(high))
+        series["count"] += count
+
+    for series in history.values():
+        series["min"] = round(series["min"], 2)
+        series["max"] = round(series["max"], 2)
+        series["last"] = series["mean"][-1]
+        series["slope_per_day"] = round(_slope(series["day"], series["mean"]), 4)
+    return history
@@ -0,0 +1,110 @@
+# agents/response_cache.py
+import hashlib
+import hmac
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+CACHE_DISABLED_AGENTS = os.getenv("RESPONSE_CACHE_DISABLED_AGENTS", "")
+
+# Identifiers never take part in the context fingerprint, so patients with the
+# same condition and preferences share entries
+IDENTIFYING_FIELDS = frozenset({"id", "patient_id", "user_id", "username", "email",
+                                "name", "date_of_birth", "phone"})
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s!.?,]+$")
+
+
+def normalize_message(message: Optional[str]) -> str:
+    """Case- and whitespace-insensitive form of a message, e.g. "Hi!" == "hi" """
+    message = _WHITESPACE.sub(" ", (message or "").strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", message)
+
+
+@dataclass
+class CachedResponse:
+    text: str
+    expires_at: float
+    latency: float
+    tokens: int
+
+
+class ResponseCache:
+    """TTL/LRU cache of final agent responses for fresh sessions.
+
+    Keys are an HMAC of the agent name, the normalized message and a
+    fingerprint of the non-identifying patient context, so no message text
+    or patient data is kept in the key space. Without RESPONSE_CACHE_SECRET
+    a per-process secret is used.
+    """
+    def __init__(self, ttl_seconds: float = CACHE_TTL_SECONDS,
+                 max_entries: int = CACHE_MAX_ENTRIES,
+                 disabled_agents: Iterable[str] = (),
+                 secret: Optional[bytes] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.disabled_agents = set(disabled_agents) | {
+            name.strip() for name in CACHE_DISABLED_AGENTS.split(",") if name.strip()
+        }
+        env_secret = os.getenv("RESPONSE_CACHE_SECRET")
+        self._secret = secret or (env_secret.encode() if env_secret else os.urandom(32))
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+        self.tokens_saved = 0
+
+    def enabled_for(self, agent_name: str) -> bool:
+        return self.max_entries > 0 and agent_name not in self.disabled_agents
+
+    def make_key(self, agent_name: str, message: Optional[str], context: Optional[dict]) -> str:
+        fingerprint = json.dumps(
+            {key: value for key, value in (context or {}).items() if key not in IDENTIFYING_FIELDS},
+            sort_keys=True,
+            default=str
+        )
+        payload = "\x1f".join((agent_name, normalize_message(message), fingerprint))
+        return hmac.new(self._secret, payload.encode(), hashlib.sha256).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.latency_saved += entry.latency
+        self.tokens_saved += entry.tokens
+        return entry
+
+    def put(self, key: str, text: str, latency: float, tokens: int = 0):
+        self._entries[key] = CachedResponse(text, time.monotonic() + self.ttl_seconds, latency, tokens)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "latency_saved_seconds": round(self.latency_saved, 3),
+            "tokens_saved": self.tokens_saved,
+            "disabled_agents": sorted(self.disabled_agents)
+        }
@@ -0,0 +1,152 @@
+# agents/runner_utils.py
+import asyncio
+import os
+import time
+import uuid
+from contextlib import aclosing
+from typing import AsyncIterator, NamedTuple, Optional, Tuple
+from dotenv import load_dotenv
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.genai import types
+from app.agents.errors import AgentTimeoutError
+from app.agents.response_cache import ResponseCache
+
+load_dotenv()
+AGENT_TIMEOUT_SECONDS = float(os.getenv("AGENT_TIMEOUT_SECONDS", "60"))
+
+
+async def _final_response(runner: Runner, user_id: str, session_id: str,
+                          message: types.Content) -> Tuple[str, int]:
+    """Drain the async event stream until the final response and its token count"""
+    events = runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=message
+    )
+    # aclosing() stops the model call when we return early or are cancelled
+    async with aclosing(events):
+        async for event in events:
+            if event.is_final_response() and event.content and event.content.parts:
+                usage = event.usage_metadata
+                tokens = (usage.total_token_count or 0) if usage else 0
+                return event.content.parts[0].text, tokens
+    raise RuntimeError("Agent finished without a final response")
+
+
+async def _append_cached_turn(runner: Runner, user_id: str, session_id: str,
+                              message: types.Content, text: str):
+    """Record a cached exchange in the session so later turns see it"""
+    session = await runner.session_service.get_session(
+        app_name=runner.app_name,
+        user_id=user_id,
+        session_id=session_id
+    )
+    if session is None:
+        return
+    invocation_id = f"e-{uuid.uuid4()}"
+    await runner.session_service.append_event(
+        session, Event(author="user", invocation_id=invocation_id, content=message)
+    )
+    await runner.session_service.append_event(session, Event(
+        author=runner.agent.name,
+        invocation_id=invocation_id,
+        content=types.Content(role='model', parts=[types.Part(text=text)])
+    ))
+
+
+async def run_agent(runner: Runner, user_id: str, session_id: str, text: str,
+                    timeout: float = AGENT_TIMEOUT_SECONDS,
+                    cache: Optional[ResponseCache] = None,
+                    context: Optional[dict] = None) -> str:
+    """Run one agent turn on the event loop without blocking other requests.
+
+    Pass ``cache`` only for turns that don't depend on earlier session
+    history, e.g. the opening turn of a fresh session.
+    """
+    message = types.Content(role='user', parts=[types.Part(text=text)])
+
+    key = None
+    if cache is not None and cache.enabled_for(runner.agent.name):
+        key = cache.make_key(runner.agent.name, text, context)
+        cached = cache.get(key)
+        if cached is not None:
+            await _append_cached_turn(runner, user_id, session_id, message, cached.text)
+            return cached.text
+
+    start = time.perf_counter()
+    try:
+        response, tokens = await asyncio.wait_for(
+            _final_response(runner, user_id, session_id, message),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError as e:
+        raise AgentTimeoutError(
+            f"Agent {runner.agent.name} timed out after {timeout}s"
+        ) from e
+
+    if key is not None:
+        cache.put(key, response, time.perf_counter() - start, tokens)
+    return response
+
+
+class StreamChunk(NamedTuple):
+    """Text of a partial event, or the full response when ``final``"""
+    text: str
+    final: bool
+
+
+async def stream_agent(runner: Runner, user_id: str, session_id: str, text: str,
+                       timeout: float = AGENT_TIMEOUT_SECONDS) -> AsyncIterator[StreamChunk]:
+    """Run one agent turn, yielding partial text as the model produces it.
+
+    The runner is driven by its own task so the timeout never cancels the
+    caller while it is writing a chunk to the client; closing this generator
+    (e.g. on client disconnect) cancels the model call.
+    """
+    message = types.Content(role='user', parts=[types.Part(text=text)])
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump() -> bool:
+        """Queue the chunks; False if the stream ended without a final response"""
+        events = runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=message,
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE)
+        )
+        async with aclosing(events):
+            async for event in events:
+                if not (event.content and event.content.parts):
+                    continue
+                chunk = "".join(part.text or "" for part in event.content.parts)
+                if event.partial:
+                    await queue.put(StreamChunk(chunk, False))
+                elif event.is_final_response():
+                    await queue.put(StreamChunk(chunk, True))
+                    return True
+        return False
+
+    async def produce():
+        try:
+            if not await asyncio.wait_for(pump(), timeout=timeout):
+                await queue.put(RuntimeError("Agent finished without a final response"))
+        except asyncio.TimeoutError:
+            await queue.put(AgentTimeoutError(
+                f"Agent {runner.agent.name} timed out after {timeout}s"
+            ))
+        except Exception as e:
+            await queue.put(e)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if isinstance(item, Exception):
+                raise item
+            yield item
+            if item.final:
+                return
+    finally:
+        producer.cancel()
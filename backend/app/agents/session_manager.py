@@ -0,0 +1,183 @@
+# agents/session_manager.py
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+
+load_dotenv()
+SESSION_TTL_SECONDS = float(os.getenv("AGENT_SESSION_TTL_SECONDS", "1800"))
+MAX_SESSIONS = int(os.getenv("AGENT_SESSION_MAX", "5000"))
+LOCK_STRIPES = int(os.getenv("AGENT_SESSION_LOCK_STRIPES", "64"))
+
+# Rough per-session overhead of an ADK session object and its state
+SESSION_BASE_BYTES = 2048
+
+
+@dataclass
+class _Entry:
+    session_id: str
+    last_used: float
+    turns: int = 0
+    approx_bytes: int = SESSION_BASE_BYTES
+
+
+class AgentSessionManager:
+    """Reuses one ADK session per (agent, patient) and evicts idle ones.
+
+    Entries are kept in least-recently-used order, so expired sessions are
+    always at the front. Evicted in-memory sessions are deleted from the
+    session service, which keeps memory flat under sustained traffic; durable
+    sessions are only dropped from this worker's cache. Session ids are
+    derived from the key, so any worker can pick up a durable session.
+
+    The cache itself is only touched between awaits, so it needs no lock.
+    Session service calls hold a lock striped by key instead: two requests
+    for the same patient don't both create a session, while requests for
+    other patients carry on.
+    """
+    def __init__(self, session_service: Optional[BaseSessionService] = None,
+                 app_name: str = "healthcare_companion",
+                 ttl_seconds: float = SESSION_TTL_SECONDS,
+                 max_sessions: int = MAX_SESSIONS):
+        self.session_service = session_service or InMemorySessionService()
+        self.persistent = not isinstance(self.session_service, InMemorySessionService)
+        self.app_name = app_name
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._locks = [asyncio.Lock() for _ in range(LOCK_STRIPES)]
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    async def get_session_id(self, agent_name: str, user_id: str) -> str:
+        """Return the patient's session for this agent, creating it if needed"""
+        key = (agent_name, str(user_id))
+        for victim in self._pop_expired(time.monotonic()):
+            await self._delete_evicted(*victim)
+
+        entry = self._touch(key)
+        if entry is not None:
+            return entry.session_id
+
+        evicted = []
+        async with self._lock_for(key):
+            # Another request may have opened it while we waited
+            entry = self._touch(key)
+            if entry is not None:
+                return entry.session_id
+
+            session_id = f"{agent_name}:{user_id}"
+            session = None
+            if self.persistent:
+                session = await self.session_service.get_session(
+                    app_name=self.app_name,
+                    user_id=str(user_id),
+                    session_id=session_id,
+                    config=GetSessionConfig(num_recent_events=1)
+                )
+            if session is None:
+                session = await self.session_service.create_session(
+                    app_name=self.app_name,
+                    user_id=str(user_id),
+                    session_id=session_id
+                )
+                self.created += 1
+            else:
+                self.reused += 1
+
+            while len(self._entries) >= self.max_sessions:
+                evicted.append(self._pop_oldest())
+            self._entries[key] = _Entry(session.id, time.monotonic(), turns=1 if session.events else 0)
+
+        for victim in evicted:
+            await self._delete_evicted(*victim)
+        return session.id
+
+    def is_fresh(self, agent_name: str, user_id: str) -> bool:
+        """Whether the patient's session has no turns yet"""
+        entry = self._entries.get((agent_name, str(user_id)))
+        return entry is not None and entry.turns == 0
+
+    def has_history(self, agent_name: str, user_id: str) -> bool:
+        """Whether the patient is part-way through a conversation with this agent"""
+        entry = self._entries.get((agent_name, str(user_id)))
+        return entry is not None and entry.turns > 0
+
+    def record_turn(self, agent_name: str, user_id: str, message: str, response: str):
+        """Account for the events a turn added to the session"""
+        entry = self._entries.get((agent_name, str(user_id)))
+        if entry is not None:
+            entry.turns += 1
+            entry.approx_bytes += len(message.encode()) + len(response.encode())
+
+    async def end_session(self, agent_name: str, user_id: str):
+        """Drop a patient's session, e.g. once a check-in is complete"""
+        key = (agent_name, str(user_id))
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            async with self._lock_for(key):
+                await self._delete(str(user_id), entry)
+
+    def _lock_for(self, key: Tuple[str, str]) -> asyncio.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+    def _touch(self, key: Tuple[str, str]) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(key)
+            self.reused += 1
+        return entry
+
+    def _pop_expired(self, now: float) -> List[Tuple[Tuple[str, str], _Entry]]:
+        evicted = []
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if now - entry.last_used <= self.ttl_seconds:
+                break
+            evicted.append(self._pop_oldest())
+        return evicted
+
+    def _pop_oldest(self) -> Tuple[Tuple[str, str], _Entry]:
+        self.evicted += 1
+        return self._entries.popitem(last=False)
+
+    async def _delete_evicted(self, key: Tuple[str, str], entry: _Entry):
+        if self.persistent:
+            return
+        async with self._lock_for(key):
+            # Skip it if the patient came back and reopened the session meanwhile
+            if key not in self._entries:
+                await self._delete(key[1], entry)
+
+    async def _delete(self, user_id: str, entry: _Entry):
+        await self.session_service.delete_session(
+            app_name=self.app_name,
+            user_id=user_id,
+            session_id=entry.session_id
+        )
+
+    def stats(self) -> Dict:
+        """Live session counts and estimated memory per agent"""
+        agents: Dict[str, Dict[str, int]] = {}
+        for (agent_name, _), entry in self._entries.items():
+            summary = agents.setdefault(agent_name, {"sessions": 0, "approx_bytes": 0})
+            summary["sessions"] += 1
+            summary["approx_bytes"] += entry.approx_bytes
+        return {
+            "live_sessions": len(self._entries),
+            "approx_bytes": sum(a["approx_bytes"] for a in agents.values()),
+            "agents": agents,
+            "created": self.created,
+            "reused": self.reused,
+            "evicted": self.evicted,
+            "persistent": self.persistent,
+            "ttl_seconds": self.ttl_seconds,
+            "max_sessions": self.max_sessions
+        }
@@ -0,0 +1,107 @@
+# agents/trend_monitor_agent.py
+import json
+import os
+from typing import AsyncIterator, Dict, List, Optional
+from dotenv import load_dotenv
+from google.adk import Agent
+from google.adk.runners import Runner
+from app.agents.runner_utils import run_agent, stream_agent
+from app.agents.session_manager import AgentSessionManager
+from app.agents.context_compaction import ContextCompactor
+from app.agents.micro_batcher import batching_model
+
+load_dotenv()
+model_name = os.getenv("MODEL")
+
+
+def trend_prompt(message: Optional[str], history: Dict[str, dict], responses: List[dict]) -> str:
+    """Patient message plus the compact PRO arrays the agent reasons over"""
+    data = {
+        "history": history,
+        "recent_responses": [
+            {key: response[key] for key in ("category", "response", "value")}
+            for response in responses
+        ]
+    }
+    return f"{message or 'How am I doing?'}\n\nPRO data:\n{json.dumps(data, separators=(',', ':'))}"
+
+
+def trend_summary(history: Dict[str, dict]) -> Dict[str, dict]:
+    """Per-metric headline numbers returned alongside the agent's reply"""
+    return {metric: {key: series[key] for key in ("last", "min", "max", "slope_per_day", "count")}
+            for metric, series in history.items()}
+
+
+class TrendMonitorAgent:
+    """Explains trends in the patient's PRO history"""
+    def __init__(self, session_manager: Optional[AgentSessionManager] = None,
+                 context_compactor: Optional[ContextCompactor] = None):
+        self.context_compactor = context_compactor or ContextCompactor()
+        self.agent = Agent(
+            name="TrendMonitor",
+            model=batching_model(model_name),
+            instruction="""
+            You are a trend monitoring agent for chronic care patients.
+            You receive the patient's PRO history as compact arrays per metric:
+            "day" (days since the start of the window), "mean" (average per
+            period), overall "min", "max", "last" and "slope_per_day".
+
+            Your role:
+            - Describe how each metric is changing in plain language
+            - Point out worsening trends and values outside healthy ranges
+            - Encourage the patient about improvements
+            - Suggest contacting their care team when a trend is concerning
+
+            Never invent readings that are not in the data.
+            """,
+            before_model_callback=self.context_compactor.before_model
+        )
+        self.session_manager = session_manager or AgentSessionManager()
+        self.runner = Runner(
+            agent=self.agent,
+            app_name=self.session_manager.app_name,
+            session_service=self.session_manager.session_service
+        )
+
+    async def analyze_trends(self, patient_data: dict, message: Optional[str],
+                             history: Dict[str, dict], responses: List[dict]) -> dict:
+        """Summarize the patient's trends; never cached, the data changes every reading"""
+        user_id = str(patient_data.get('id', 'user_123'))
+        session_id = await self.session_manager.get_session_id(self.agent.name, user_id)
+
+        final_response = await run_agent(
+            self.runner,
+            user_id=user_id,
+            session_id=session_id,
+            text=trend_prompt(message, history, responses)
+        )
+        self.session_manager.record_turn(self.agent.name, user_id, message or "", final_response)
+
+        return {
+            "message": final_response,
+            "next_action": "checkin",
+            "patient_id": patient_data.get('id'),
+            "trends": trend_summary(history)
+        }
+
+    async def stream_trend_analysis(self, patient_data: dict, message: Optional[str],
+                                    history: Dict[str, dict], responses: List[dict]) -> AsyncIterator[dict]:
+        """Stream the reply: ``delta`` chunks, then the same dict as the non-streaming call"""
+        user_id = str(patient_data.get('id', 'user_123'))
+        session_id = await self.session_manager.get_session_id(self.agent.name, user_id)
+
+        final_response = ""
+        async for chunk in stream_agent(self.runner, user_id, session_id,
+                                        trend_prompt(message, history, responses)):
+            if chunk.final:
+                final_response = chunk.text
+            else:
+                yield {"delta": chunk.text}
+        self.session_manager.record_turn(self.agent.name, user_id, message or "", final_response)
+
+        yield {
+            "message": final_response,
+            "next_action": "checkin",
+            "patient_id": patient_data.get('id'),
+            "trends": trend_summary(history)
+        }
@@ -0,0 +1,91 @@
+# agents/warmup.py
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LazyComponent(Generic[T]):
+    """Builds an expensive object (and imports its modules) on first use.
+
+    ``get`` builds synchronously; ``aget`` builds in a worker thread so the
+    event loop keeps serving health checks while the SDKs import.
+    """
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self.factory = factory
+        self.build_seconds: Optional[float] = None
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> T:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    start = time.perf_counter()
+                    self._instance = self.factory()
+                    self.build_seconds = time.perf_counter() - start
+                    logger.info(f"Built {self.name} in {self.build_seconds:.2f}s")
+        return self._instance
+
+    async def aget(self) -> T:
+        if self._instance is not None:
+            return self._instance
+        return await asyncio.to_thread(self.get)
+
+
+class WarmUp:
+    """Named start-up steps run in the background, with per-step timings.
+
+    Synchronous steps run in a worker thread. ``ready`` turns true once every
+    step has finished; a failed step is reported and leaves it false.
+    """
+    def __init__(self):
+        self.steps: List[Tuple[str, Callable[[], Any]]] = []
+        self.timings: Dict[str, float] = {}
+        self.ready = False
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, name: str, step: Callable[[], Any]):
+        self.steps.append((name, step))
+
+    def start(self):
+        """Run the steps in a background task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def run(self):
+        started = time.perf_counter()
+        for name, step in self.steps:
+            step_started = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(step):
+                    await step()
+                else:
+                    await asyncio.to_thread(step)
+            except Exception as e:
+                self.error = f"{name}: {e}"
+                logger.error(f"Warm-up step {name} failed: {e}")
+                return
+            self.timings[name] = round(time.perf_counter() - step_started, 4)
+        self.timings["total"] = round(time.perf_counter() - started, 4)
+        self.ready = True
+        logger.info(f"Warm-up finished: {self.timings}")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else ("failed" if self.error else "warming_up"),
+            "timings": self.timings,
+            "error": self.error
+        }
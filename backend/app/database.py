@@ -1,52 +1,132 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import QueuePool
-from typing import Generator
+from sqlalchemy.schema import CreateColumn
+from typing import AsyncGenerator, Dict
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
+# Connection pool, per worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# asyncio driver used for each database backend
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """The same database through its asyncio driver, e.g. postgresql+psycopg2 -> postgresql+asyncpg"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver and parsed.drivername not in ASYNC_DRIVERS.values():
+        parsed = parsed.set(drivername=driver)
+    return parsed.render_as_string(hide_password=False)
+
+
+def _pool_options(url: str) -> Dict:
+    if make_url(url).database in (None, "", ":memory:"):
+        return {}  # in-memory SQLite uses a single static connection
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+ASYNC_DATABASE_URL = async_database_url(DATABASE_URL)
+engine = create_async_engine(
+    ASYNC_DATABASE_URL,
     pool_pre_ping=True,  # Validates connections before use
-    echo=False  # Set to True for SQL debugging
+    echo=False,  # Set to True for SQL debugging
+    **_pool_options(ASYNC_DATABASE_URL)
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+_pool_counters = {"connects": 0, "checkouts": 0, "invalidated": 0}
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    _pool_counters["connects"] += 1
 
-def get_db() -> Generator:
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    _pool_counters["checkouts"] += 1
+
+
+@event.listens_for(engine.sync_engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    _pool_counters["invalidated"] += 1
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency function to get database session"""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def create_tables():
+async def create_tables():
     """Create all tables defined in models"""
-    Base.metadata.create_all(bind=engine)
+    def _create(connection):
+        Base.metadata.create_all(connection)
+        # create_all skips existing tables, so add nullable columns and
+        # indexes introduced since
+        inspector = inspect(connection)
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    ddl = CreateColumn(column).compile(dialect=connection.dialect)
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(_create)
 
 
-def drop_tables():
+async def drop_tables():
     """Drop all tables - USE WITH CAUTION!"""
-    Base.metadata.drop_all(bind=engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
 
 
-def check_database_connection():
+async def check_database_connection():
     """Check if database connection is working"""
     try:
-        with engine.connect() as connection:
-            connection.execute("SELECT 1")
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
         return True
     except Exception as e:
         print(f"Database connection failed: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def pool_stats() -> Dict:
+    """Connection pool occupancy and lifetime counters"""
+    pool = engine.pool
+    stats = {
+        "pool": type(pool).__name__,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        **_pool_counters
+    }
+    # Static and null pools don't track occupancy
+    if hasattr(pool, "checkedout"):
+        stats.update({
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),  # negative while below pool_size
+        })
+    return stats
@@ -1,17 +1,28 @@
 # main.py
 import datetime
+import json
+import logging
+import os
+import time
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from app.agents.orchestrator import HealthcarePROOrchestrator
-from app.database import SessionLocal, engine, Base
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.agents.errors import AgentTimeoutError
+from app.agents.admission import AdmissionRejected
+from app.agents.warmup import LazyComponent, WarmUp
+from app.database import create_tables, get_db, pool_stats
 from app.models.models import User
 from app.schemas.schemas import UserLogin, UserResponse
 from pydantic import BaseModel
 from typing import Optional
 
 
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
+# Build the agents in the background at startup instead of on first request
+AGENT_WARMUP = os.getenv("AGENT_WARMUP", "true").lower() == "true"
+
 app = FastAPI(title="Healthcare PRO Multi-Agent System")
 
 # CORS configuration
@@ -23,14 +34,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize orchestrator
-orchestrator = HealthcarePROOrchestrator()
+
+
+def _build_orchestrator():
+    # Deferred: importing the agents pulls in google.adk and google.genai
+    from app.agents.orchestrator import HealthcarePROOrchestrator
+    return HealthcarePROOrchestrator()
+
+
+# Orchestrator is built by the warm-up task, or on first use
+orchestrator = LazyComponent("orchestrator", _build_orchestrator)
+warmup = WarmUp()
+warmup.add("create_tables", create_tables)
+if AGENT_WARMUP:
+    warmup.add("orchestrator", orchestrator.get)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Create tables and build the agents without delaying startup"""
+    warmup.start()
 
 
 class PatientInteractionRequest(BaseModel):
     """Schema of patient request body"""
     patient_id: str
-    interaction_type: str  # "checkin", "questionnaire", "trend_analysis"
+    interaction_type: str  # "checkin", "questionnaire", "trend_monitor" (or "trend_analysis"); anything else is routed on the message
     patient_data: dict
     user_message: Optional[str] = None
 
@@ -42,21 +71,14 @@ class PatientInteractionResponse(BaseModel):
     metadata: Optional[dict] = None
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @app.post("/login", response_model=UserResponse)
-def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
     """Login endpoint"""
-    existing_user = db.query(User).filter_by(
-        username=user.username,
-        date_of_birth=user.date_of_birth
-    ).first()
+    # Served by the (username, date_of_birth) index
+    existing_user = await db.scalar(select(User).where(
+        User.username == user.username,
+        User.date_of_birth == user.date_of_birth
+    ).limit(1))
 
     if existing_user:
         return UserResponse(
@@ -69,8 +91,8 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
 
     new_user = User(username=user.username, date_of_birth=user.date_of_birth)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return UserResponse(
         id=new_user.id,
@@ -85,8 +107,9 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
 async def interact_with_agent(request: PatientInteractionRequest):
     """Main endpoint for agent interactions"""
     try:
-        print("Received request:", request.model_dump_json)
-        response = await orchestrator.handle_patient_interaction(
+        logger.debug(f"Agent interaction {request.interaction_type} for patient {request.patient_id}")
+        agents = await orchestrator.aget()
+        response = await agents.handle_patient_interaction(
             request.patient_data,
             request.interaction_type,
             request.user_message
@@ -97,14 +120,126 @@ async def interact_with_agent(request: PatientInteractionRequest):
             metadata={"timestamp": datetime.datetime.now().isoformat()}
         )
 
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=503, detail=str(e),
+                            headers={"Retry-After": str(int(e.retry_after))})
+    except AgentTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/api/agent/interact/stream")
+async def interact_with_agent_stream(request: PatientInteractionRequest):
+    """Agent interaction streamed as Server-Sent Events.
+
+    Emits ``token`` events as the model generates, then one ``done`` event
+    with the same payload as /api/agent/interact plus time to first token
+    and total latency.
+    """
+    async def events():
+        started = time.perf_counter()
+        first_token = None
+        try:
+            agents = await orchestrator.aget()
+            async for item in agents.stream_patient_interaction(
+                request.patient_data,
+                request.interaction_type,
+                request.user_message
+            ):
+                if "delta" in item:
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    yield _sse_event("token", {"text": item["delta"]})
+                    continue
+
+                total_ms = (time.perf_counter() - started) * 1000
+                # Without partial events the whole reply is the first token
+                ttft_ms = ((first_token or time.perf_counter()) - started) * 1000
+                logger.info(f"Streamed {request.interaction_type} reply: "
+                            f"ttft {ttft_ms:.0f}ms, total {total_ms:.0f}ms")
+                yield _sse_event("done", {
+                    "agent_response": item,
+                    "next_action": item.get("next_action"),
+                    "metadata": {
+                        "timestamp": datetime.datetime.now().isoformat(),
+                        "ttft_ms": round(ttft_ms, 2),
+                        "total_ms": round(total_ms, 2)
+                    }
+                })
+
+        except AdmissionRejected as e:
+            yield _sse_event("error", {"status_code": 503, "detail": str(e),
+                                       "retry_after": int(e.retry_after)})
+        except AgentTimeoutError as e:
+            yield _sse_event("error", {"status_code": 504, "detail": str(e)})
+        except Exception as e:
+            yield _sse_event("error", {"status_code": 500, "detail": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/api/agent/admission")
+async def admission_stats():
+    """Per-model in-flight calls, queue depth, wait times and shed requests"""
+    return (await orchestrator.aget()).admission.stats()
+
+
+@app.get("/api/agent/batching")
+async def micro_batching_stats():
+    """Batch sizes of micro-batched model calls (LLM_MICRO_BATCH)"""
+    await orchestrator.aget()
+    from app.agents.micro_batcher import batching_stats
+    return batching_stats()
+
+
+@app.get("/api/agent/routing")
+async def routing_stats():
+    """Local intent routing: escalation rate, latency and LLM agreement"""
+    return (await orchestrator.aget()).intent_router.stats()
+
+
+@app.get("/api/agent/sessions")
+async def session_stats():
+    """Live agent sessions and their estimated memory"""
+    return (await orchestrator.aget()).session_manager.stats()
+
+
+@app.get("/api/agent/cache")
+async def cache_stats():
+    """Response cache hit rate and the model latency and tokens it saved"""
+    return (await orchestrator.aget()).response_cache.stats()
+
+
+@app.get("/api/agent/context")
+async def context_stats():
+    """Prompt tokens before and after compacting long agent sessions"""
+    return (await orchestrator.aget()).context_compactor.stats()
+
+
+@app.get("/api/db/pool")
+async def database_pool_stats():
+    """Database connection pool occupancy and connection counts"""
+    return pool_stats()
+
+
 @app.get("/api/agent/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "agents": "ready"}
+    """Liveness: the process is serving, whether or not the agents are built"""
+    return {"status": "healthy", "agents": "ready" if orchestrator.built else "not_built"}
+
+
+@app.get("/api/agent/ready")
+async def readiness_check():
+    """Readiness: 200 once warm-up (tables, agents) has finished, 503 before"""
+    status = warmup.status()
+    status["build_seconds"] = orchestrator.build_seconds
+    return JSONResponse(status, status_code=200 if warmup.ready else 503)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date
+from sqlalchemy import Column, Integer, String, Date, Float, Text, ForeignKey, Index, UniqueConstraint
 
 from app.database import Base
 
@@ -6,6 +6,61 @@ from app.database import Base
 class User(Base):
     """User Model"""
     __tablename__ = "users"
+    # Login looks users up by both columns; also serves username-only lookups
+    __table_args__ = (Index("ix_users_username_date_of_birth", "username", "date_of_birth"),)
     id = Column(Integer, primary_key=True, index=True)
-    username = Column(String, index=True)
+    username = Column(String)
     date_of_birth = Column(Date)
+
+
+class AgentSession(Base):
+    """Persisted ADK session: merged state, a snapshot of recent events and a summary of older ones"""
+    __tablename__ = "agent_sessions"
+    id = Column(String, primary_key=True)
+    app_name = Column(String, nullable=False, index=True)
+    user_id = Column(String, nullable=False, index=True)
+    state = Column(Text, nullable=False, default="{}")
+    snapshot_events = Column(Text, nullable=False, default="[]")
+    summary = Column(Text)
+    compacted_through = Column(Integer, nullable=False, default=0)
+    next_seq = Column(Integer, nullable=False, default=1)
+    last_update_time = Column(Float, nullable=False, default=0.0)
+
+
+class AgentSessionEvent(Base):
+    """Event appended to a session since its last compaction"""
+    __tablename__ = "agent_session_events"
+    __table_args__ = (UniqueConstraint("session_id", "seq"),)
+    id = Column(Integer, primary_key=True)
+    session_id = Column(String, ForeignKey("agent_sessions.id", ondelete="CASCADE"),
+                        nullable=False, index=True)
+    seq = Column(Integer, nullable=False)
+    timestamp = Column(Float, nullable=False)
+    data = Column(Text, nullable=False)
+
+
+class PROResponse(Base):
+    """A patient's answer to a questionnaire item"""
+    __tablename__ = "pro_responses"
+    # Latest-N lookups per patient walk this index backwards
+    __table_args__ = (Index("ix_pro_responses_patient_recorded", "patient_id", "recorded_at"),)
+    id = Column(Integer, primary_key=True)
+    patient_id = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    response_text = Column(Text, nullable=False, default="")
+    numeric_value = Column(Float)
+    recorded_at = Column(Float, nullable=False)
+
+
+class PROMeasurement(Base):
+    """One numeric PRO value (blood sugar, pain level, ...) over time"""
+    __tablename__ = "pro_measurements"
+    # Windowed reads per patient and metric are range scans on this index
+    __table_args__ = (Index("ix_pro_measurements_patient_metric_recorded",
+                            "patient_id", "metric", "recorded_at"),)
+    id = Column(Integer, primary_key=True)
+    patient_id = Column(String, nullable=False)
+    metric = Column(String, nullable=False)
+    value = Column(Float, nullable=False)
+    unit = Column(String)
+    recorded_at = Column(Float, nullable=False)
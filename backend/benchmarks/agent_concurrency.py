@@ -0,0 +1,81 @@
+"""Concurrency benchmark for /api/agent/interact with a simulated model.
+
+The agents' runners are replaced by a fake that takes ``--latency`` seconds
+per turn, so N concurrent requests should finish in roughly the time of one.
+``--blocking`` simulates the old synchronous ``Runner.run`` for comparison.
+
+Run from ``backend`` (needs DATABASE_URL, e.g. sqlite:///./bench.db)::
+
+    python -m benchmarks.agent_concurrency [--requests 20] [--latency 1.0]
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from app.main import app, orchestrator as lazy_orchestrator
+
+
+class FakeRunner:
+    """Stands in for an ADK Runner; yields one final response after a delay"""
+
+    def __init__(self, name: str, latency: float, blocking: bool = False):
+        self.agent = SimpleNamespace(name=name)
+        self.latency = latency
+        self.blocking = blocking
+
+    async def run_async(self, user_id, session_id, new_message):
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+        text = f"Echo: {new_message.parts[0].text}"
+        yield SimpleNamespace(
+            is_final_response=lambda: True,
+            content=SimpleNamespace(parts=[SimpleNamespace(text=text)]),
+            usage_metadata=None
+        )
+
+
+async def _interact(client: httpx.AsyncClient, index: int) -> float:
+    start = time.perf_counter()
+    response = await client.post("/api/agent/interact", json={
+        "patient_id": str(index),
+        "interaction_type": "checkin" if index % 2 else "questionnaire",
+        "patient_data": {"id": str(index)},
+        "user_message": "How am I doing?"
+    })
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def main(requests: int, latency: float, blocking: bool):
+    orchestrator = lazy_orchestrator.get()
+    orchestrator.companion.runner = FakeRunner("HealthcareCompanion", latency, blocking)
+    orchestrator.questionnaire.runner = FakeRunner("AdaptiveQuestionnaire", latency, blocking)
+    # Every request shares the same context; measure the runner, not the cache
+    orchestrator.response_cache.max_entries = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        single = await _interact(client, 0)
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(_interact(client, i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    print(f"Single request: {single:.2f}s")
+    print(f"{requests} concurrent requests: {elapsed:.2f}s wall, "
+          f"max {max(latencies):.2f}s, {elapsed / single:.1f}x a single request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--blocking", action="store_true",
+                        help="block the event loop like the synchronous runner")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency, args.blocking))
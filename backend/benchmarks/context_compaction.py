@@ -0,0 +1,65 @@
+"""Prompt tokens per turn as a check-in session grows, with and without compaction.
+
+Replays a long simulated session through ``ContextCompactor`` the way the
+agent ``before_model_callback`` sees it (the full history on every model
+call) and reports estimated prompt tokens and the cost of compacting.
+
+Run from ``backend``::
+
+    python -m benchmarks.context_compaction [--turns 500] [--recent-turns 6]
+"""
+import argparse
+import time
+
+from google.adk.events import Event
+from google.genai import types
+
+from app.agents.context_compaction import ContextCompactor, estimate_tokens
+
+PATIENT_MESSAGES = [
+    "My blood sugar was {sugar} this morning and I feel a bit tired",
+    "Pain is about {pain}/10 today, I'm worried it's getting worse",
+    "Slept {sleep} hours, mood 6/10, feeling better than yesterday",
+    "I missed my meds yesterday but took my insulin today",
+]
+
+
+def _content(role: str, text: str) -> types.Content:
+    return types.Content(role=role, parts=[types.Part(text=text)])
+
+
+def main(turns: int, recent_turns: int):
+    compactor = ContextCompactor(recent_turns=recent_turns)
+    contents = []
+    events = []
+    checkpoints = {10, 50, 100, 250, 500, 1000, turns}
+    compact_seconds = 0.0
+
+    print(f"{'turn':>6} {'full tokens':>12} {'compacted':>10} {'compact us':>11}")
+    for turn in range(1, turns + 1):
+        message = PATIENT_MESSAGES[turn % len(PATIENT_MESSAGES)].format(
+            sugar=120 + turn % 60, pain=turn % 10, sleep=5 + turn % 4
+        )
+        contents.append(_content("user", message))
+        events.append(Event(author="user", content=contents[-1], timestamp=float(turn)))
+
+        start = time.perf_counter()
+        prompt = compactor.compact(("HealthcareCompanion", "patient-1"), contents, events)
+        elapsed = time.perf_counter() - start
+        compact_seconds += elapsed
+
+        if turn in checkpoints:
+            print(f"{turn:>6} {estimate_tokens(contents):>12} {estimate_tokens(prompt):>10} {elapsed * 1e6:>11.0f}")
+        contents.append(_content("model", "Thank you for sharing that with me. How are you feeling otherwise? " * 2))
+        events.append(Event(author="HealthcareCompanion", content=contents[-1], timestamp=turn + 0.5))
+
+    print(f"Average compaction cost: {compact_seconds / turns * 1e6:.0f}us per model call")
+    print(f"Summary after {turns} turns:\n{prompt[0].parts[0].text}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--recent-turns", type=int, default=6)
+    args = parser.parse_args()
+    main(args.turns, args.recent_turns)
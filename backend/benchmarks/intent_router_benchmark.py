@@ -0,0 +1,67 @@
+"""Accuracy, escalation rate and latency of the local intent router.
+
+Evaluates the rules + TF-IDF/logistic regression router on a labelled corpus
+the model was not trained on. Accuracy is reported for the messages the
+router keeps local; the rest would be escalated to the LLM router.
+
+Run from ``backend``::
+
+    python -m benchmarks.intent_router_benchmark [--min-confidence 0.7] [--llm-ms 900]
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+
+from app.agents.intent_router import IntentRouter
+
+CORPUS = os.path.join(os.path.dirname(__file__), "intent_corpus.json")
+
+
+def main(min_confidence: float, llm_ms: float, repeat: int):
+    with open(CORPUS) as corpus_file:
+        corpus = json.load(corpus_file)
+
+    started = time.perf_counter()
+    router = IntentRouter(min_confidence=min_confidence)
+    training_ms = (time.perf_counter() - started) * 1000
+
+    correct = local = local_correct = 0
+    sources = Counter()
+    misses = []
+    for example in corpus:
+        decision = router.classify(example["message"])
+        escalate = router.needs_escalation(decision)
+        sources["escalated" if escalate else decision.source] += 1
+        correct += decision.intent == example["intent"]
+        if not escalate:
+            local += 1
+            local_correct += decision.intent == example["intent"]
+            if decision.intent != example["intent"]:
+                misses.append((example["message"], example["intent"], decision.intent))
+
+    messages = [example["message"] for example in corpus] * repeat
+    started = time.perf_counter()
+    for message in messages:
+        router.classify(message)
+    per_message_us = (time.perf_counter() - started) / len(messages) * 1e6
+
+    print(f"Model trained in {training_ms:.0f}ms on seed examples")
+    print(f"{len(corpus)} messages: {dict(sources)}")
+    print(f"Top-1 accuracy (all): {correct / len(corpus):.1%}")
+    print(f"Accuracy of local decisions: {local_correct / local:.1%} ({local} kept local)")
+    print(f"Escalation rate: {(len(corpus) - local) / len(corpus):.1%} at min confidence {min_confidence}")
+    print(f"Local routing: {per_message_us:.0f}us/message; "
+          f"saves ~{local * llm_ms / 1000:.1f}s of LLM routing over this corpus at {llm_ms:.0f}ms/call")
+    for message, expected, got in misses:
+        print(f"  miss: {message!r} expected {expected}, got {got}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-confidence", type=float, default=0.7)
+    parser.add_argument("--llm-ms", type=float, default=900, help="assumed latency of an LLM routing call")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.min_confidence, args.llm_ms, args.repeat)
@@ -0,0 +1,138 @@
+"""End-to-end load harness for the backend orchestrator.
+
+Virtual patients log in, open a check-in and answer a few questionnaire
+turns, with think time between requests. Reports throughput, latency
+percentiles per step and errors by status code.
+
+Against a running server (start it with ENABLE_FAKE_LLM=true MODEL=fake-llm
+for offline runs)::
+
+    python -m benchmarks.load_harness --url http://localhost:8000 --users 50 --duration 60
+
+Or in-process, without a server::
+
+    ENABLE_FAKE_LLM=true MODEL=fake-llm DATABASE_URL=sqlite:///./load.db python -m benchmarks.load_harness --in-process
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+import httpx
+
+CHECKIN_MESSAGES = ["Hi", "Hello", "Good morning", "Hi, I'm feeling a bit tired today"]
+ANSWERS = [
+    "About a 6 today",
+    "Yes, I took it this morning",
+    "135 over 85",
+    "A little headache and some fatigue",
+    "I slept about 7 hours",
+]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.flows = 0
+
+    def record(self, step: str, elapsed: float, status: int):
+        if status >= 400:
+            self.errors[f"{step} {status}"] += 1
+        else:
+            self.latencies[step].append(elapsed)
+
+    def report(self, wall: float):
+        total = sum(len(values) for values in self.latencies.values())
+        print(f"{self.flows} flows, {total} successful requests in {wall:.1f}s "
+              f"({total / wall:.1f} req/s, {self.flows / wall:.2f} flows/s)")
+        print(f"{'step':<16}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for step, values in sorted(self.latencies.items()):
+            values.sort()
+            pick = lambda q: values[min(int(len(values) * q), len(values) - 1)] * 1000
+            print(f"{step:<16}{len(values):>7}{pick(0.5):>10.0f}{pick(0.95):>10.0f}"
+                  f"{pick(0.99):>10.0f}{values[-1] * 1000:>10.0f}")
+        if self.errors:
+            print(f"Errors: {dict(self.errors)}")
+
+
+async def _call(client: httpx.AsyncClient, stats: Stats, step: str, path: str, body: dict):
+    start = time.perf_counter()
+    try:
+        response = await client.post(path, json=body)
+        status = response.status_code
+    except httpx.HTTPError:
+        response, status = None, 599
+    stats.record(step, time.perf_counter() - start, status)
+    return response.json() if response is not None and status < 400 else None
+
+
+async def _patient_flow(client: httpx.AsyncClient, stats: Stats, user_index: int,
+                        questions: int, think_time: float):
+    user = await _call(client, stats, "login", "/login", {
+        "username": f"load-patient-{user_index}",
+        "date_of_birth": f"19{50 + user_index % 50}-01-01"
+    })
+    if user is None:
+        return
+    patient_data = {"id": str(user["id"]), "condition": user["condition"], "language": user["language"]}
+
+    def interaction(interaction_type: str, message: str) -> dict:
+        return {
+            "patient_id": patient_data["id"],
+            "interaction_type": interaction_type,
+            "patient_data": patient_data,
+            "user_message": message
+        }
+
+    await _call(client, stats, "checkin", "/api/agent/interact",
+                interaction("checkin", random.choice(CHECKIN_MESSAGES)))
+    for _ in range(questions):
+        await asyncio.sleep(random.expovariate(1 / think_time) if think_time > 0 else 0)
+        await _call(client, stats, "questionnaire", "/api/agent/interact",
+                    interaction("questionnaire", random.choice(ANSWERS)))
+    stats.flows += 1
+
+
+async def _virtual_user(client: httpx.AsyncClient, stats: Stats, index: int, users: int,
+                        deadline: float, questions: int, think_time: float):
+    flow = 0
+    while time.perf_counter() < deadline:
+        await _patient_flow(client, stats, index + flow * users, questions, think_time)
+        flow += 1
+
+
+async def main(args):
+    if args.in_process:
+        from app.main import app, warmup
+        # ASGITransport doesn't send startup events
+        await warmup.run()
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://load", timeout=args.timeout)
+    else:
+        limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits)
+
+    stats = Stats()
+    start = time.perf_counter()
+    deadline = start + args.duration
+    async with client:
+        await asyncio.gather(*(
+            _virtual_user(client, stats, index, args.users, deadline, args.questions, args.think_time)
+            for index in range(args.users)
+        ))
+    stats.report(time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true", help="drive the app without a server")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual patients")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to keep starting flows")
+    parser.add_argument("--questions", type=int, default=3, help="questionnaire turns per flow")
+    parser.add_argument("--think-time", type=float, default=1.0, help="mean seconds between turns")
+    parser.add_argument("--timeout", type=float, default=60)
+    asyncio.run(main(parser.parse_args()))
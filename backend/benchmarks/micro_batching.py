@@ -0,0 +1,80 @@
+"""Offline throughput benchmark for micro-batched model calls.
+
+A fake batch client models a serving endpoint with a fixed number of
+parallel slots, a per-call overhead and a per-item generation cost. The same
+burst of requests is sent one call per request and through MicroBatcher.
+
+Run from ``backend``::
+
+    python -m benchmarks.micro_batching [--requests 500] [--batch-size 16]
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from app.agents.micro_batcher import BatchModelClient, MicroBatcher
+
+
+class FakeBatchClient(BatchModelClient):
+    """Serving endpoint with ``slots`` parallel workers; a call costs
+    ``overhead`` plus ``per_item`` for each request in it"""
+
+    def __init__(self, slots: int, overhead: float, per_item: float):
+        self.slots = asyncio.Semaphore(slots)
+        self.overhead = overhead
+        self.per_item = per_item
+        self.calls = 0
+
+    async def generate_batch(self, requests: List[LlmRequest]) -> List[LlmResponse]:
+        async with self.slots:
+            self.calls += 1
+            await asyncio.sleep(self.overhead + self.per_item * len(requests))
+        return [
+            LlmResponse(content=types.Content(role="model", parts=[types.Part(text=f"reply {i}")]))
+            for i in range(len(requests))
+        ]
+
+
+def _request(index: int) -> LlmRequest:
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=f"check-in {index}")])])
+
+
+async def _burst(submit, count: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(submit(_request(i)) for i in range(count)))
+    return time.perf_counter() - start
+
+
+async def main(requests: int, batch_size: int, wait_ms: float, slots: int, overhead: float, per_item: float):
+    single = FakeBatchClient(slots, overhead, per_item)
+
+    async def one_by_one(request):
+        return (await single.generate_batch([request]))[0]
+
+    unbatched = await _burst(one_by_one, requests)
+
+    batched_client = FakeBatchClient(slots, overhead, per_item)
+    batcher = MicroBatcher(batched_client, max_batch_size=batch_size, max_wait_ms=wait_ms)
+    batched = await _burst(batcher.submit, requests)
+
+    print(f"{requests} requests, {slots} slots, {overhead * 1000:.0f}ms/call + {per_item * 1000:.0f}ms/item")
+    print(f"Unbatched: {unbatched:.2f}s ({requests / unbatched:,.0f} req/s, {single.calls} calls)")
+    print(f"Batched:   {batched:.2f}s ({requests / batched:,.0f} req/s, {batched_client.calls} calls, {batcher.stats()})")
+    print(f"Speed-up:  {unbatched / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--wait-ms", type=float, default=10)
+    parser.add_argument("--slots", type=int, default=8)
+    parser.add_argument("--overhead", type=float, default=0.2, help="seconds per call")
+    parser.add_argument("--per-item", type=float, default=0.01, help="seconds per request in a call")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.batch_size, args.wait_ms, args.slots, args.overhead, args.per_item))
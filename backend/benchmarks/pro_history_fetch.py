@@ -0,0 +1,100 @@
+"""Trend-agent data fetch at 1k and 100k PRO rows per patient.
+
+Seeds a year of readings (five metrics) for one patient per size, then times
+the windowed, bucketed history query and the latest-responses query against
+loading every row of the patient, and compares the JSON sent to the model.
+
+Run from ``backend`` (DATABASE_URL selects the database, e.g. sqlite:///./bench.db)::
+
+    python -m benchmarks.pro_history_fetch [--sizes 1000 100000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import delete, insert, select
+
+from app.database import AsyncSessionLocal, create_tables
+from app.models.models import PROMeasurement, PROResponse
+from app.agents.pro_history import SECONDS_PER_DAY, fetch_pro_history, fetch_recent_responses
+
+METRICS = {"blood_sugar": ("mg/dL", 140, 25), "systolic_bp": ("mmHg", 130, 12),
+           "pain_level": ("/10", 4, 2), "sleep_hours": ("hours", 7, 1), "weight": ("kg", 82, 2)}
+NOW = time.time()
+
+
+async def _seed(patient_id: str, rows: int):
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(PROMeasurement).where(PROMeasurement.patient_id == patient_id))
+        await db.execute(delete(PROResponse).where(PROResponse.patient_id == patient_id))
+        step = 365 * SECONDS_PER_DAY / rows
+        names = list(METRICS)
+        measurements = []
+        for index in range(rows):
+            metric = names[index % len(names)]
+            unit, mean, spread = METRICS[metric]
+            measurements.append({"patient_id": patient_id, "metric": metric, "unit": unit,
+                                 "value": random.gauss(mean, spread),
+                                 "recorded_at": NOW - 365 * SECONDS_PER_DAY + index * step})
+        await db.execute(insert(PROMeasurement), measurements)
+        await db.execute(insert(PROResponse), [
+            {"patient_id": patient_id, "category": "symptoms", "response_text": "a bit tired",
+             "numeric_value": None, "recorded_at": row["recorded_at"]}
+            for row in measurements[::5]
+        ])
+        await db.commit()
+
+
+async def _load_everything(patient_id: str) -> list:
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(select(PROMeasurement).where(PROMeasurement.patient_id == patient_id))
+        return [{"metric": row.metric, "value": row.value, "unit": row.unit, "recorded_at": row.recorded_at}
+                for row in rows.scalars()]
+
+
+async def _history(patient_id: str):
+    async with AsyncSessionLocal() as db:
+        return await fetch_pro_history(db, patient_id, now=NOW)
+
+
+async def _responses(patient_id: str):
+    async with AsyncSessionLocal() as db:
+        return await fetch_recent_responses(db, patient_id)
+
+
+async def _fetch_windowed(patient_id: str):
+    # One session per query, as in the orchestrator; a session can't run them concurrently
+    return await asyncio.gather(_history(patient_id), _responses(patient_id))
+
+
+async def _median_ms(fetch, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await fetch()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+async def main(sizes, repeat: int):
+    await create_tables()
+    print(f"{'rows':>8} {'windowed ms':>12} {'load-all ms':>12} {'prompt bytes':>13} {'raw bytes':>10}")
+    for rows in sizes:
+        patient_id = f"bench-{rows}"
+        await _seed(patient_id, rows)
+
+        windowed_ms, (history, _) = await _median_ms(lambda: _fetch_windowed(patient_id), repeat)
+        everything_ms, raw = await _median_ms(lambda: _load_everything(patient_id), repeat)
+        prompt_bytes = len(json.dumps(history, separators=(",", ":")))
+        print(f"{rows:>8} {windowed_ms:>12.1f} {everything_ms:>12.1f} {prompt_bytes:>13} {len(json.dumps(raw)):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.repeat))
@@ -0,0 +1,54 @@
+"""Session load time as conversations grow, for the database session service.
+
+Appends simulated turns (user message + final model response) to one session
+and times ``get_session`` at each checkpoint. With compaction, load time stays
+flat instead of growing with the number of turns.
+
+Run from ``backend`` (DATABASE_URL selects the database, e.g. sqlite:///./bench.db)::
+
+    python -m benchmarks.session_load [--turns 1000] [--no-compaction]
+"""
+import argparse
+import asyncio
+import time
+
+from google.adk.events import Event
+from google.genai import types
+
+from app.database import create_tables
+from app.agents.database_session_service import SqlAlchemySessionService
+
+
+def _event(author: str, text: str, invocation_id: str) -> Event:
+    role = "user" if author == "user" else "model"
+    return Event(author=author, invocation_id=invocation_id,
+                 content=types.Content(role=role, parts=[types.Part(text=text)]))
+
+
+async def main(turns: int, compaction: bool):
+    await create_tables()
+    service = SqlAlchemySessionService(compact_after=40 if compaction else 10 ** 9)
+    session = await service.create_session(app_name="bench", user_id="patient-1")
+
+    checkpoints = {10, 100, 1000, turns}
+    for turn in range(1, turns + 1):
+        invocation_id = f"turn-{turn}"
+        await service.append_event(session, _event("user", f"My pain is {turn % 10} today", invocation_id))
+        await service.append_event(session, _event("HealthcareCompanion", "Thanks for sharing. " * 20, invocation_id))
+
+        if turn in checkpoints:
+            start = time.perf_counter()
+            for _ in range(20):
+                loaded = await service.get_session(app_name="bench", user_id="patient-1", session_id=session.id)
+            elapsed = (time.perf_counter() - start) / 20 * 1000
+            print(f"{turn:>6} turns: get_session {elapsed:6.2f} ms, {len(loaded.events)} events loaded")
+
+    await service.delete_session(app_name="bench", user_id="patient-1", session_id=session.id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--no-compaction", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, not args.no_compaction))
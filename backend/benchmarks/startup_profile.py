@@ -0,0 +1,73 @@
+"""Cold-start profile of the backend: time per import and per initialization step.
+
+Imports ``app.main`` in a fresh interpreter with ``-X importtime`` to show
+which packages it pulls in, then times each start-up step in this process:
+the import the server needs before it accepts requests, and the warm-up
+steps that run in the background until /api/agent/ready turns green.
+
+Run from ``backend`` (DATABASE_URL selects the database, e.g. sqlite:///./bench.db)::
+
+    python -m benchmarks.startup_profile
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+WATCHED_MODULES = ("fastapi", "pydantic", "sqlalchemy", "app.database", "app.main",
+                   "google.genai", "google.adk", "app.agents.orchestrator")
+
+
+def import_times(module: str) -> dict:
+    """Cumulative import time (ms) of the watched modules when importing ``module``"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if name in WATCHED_MODULES and cumulative.strip().isdigit():
+            times[name] = int(cumulative) / 1000
+    return times
+
+
+def _timed(label: str, step, timings: dict):
+    start = time.perf_counter()
+    result = step()
+    timings[label] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def main(show_imports: bool):
+    if show_imports:
+        print("Cumulative import time when importing app.main (fresh interpreter):")
+        times = import_times("app.main")
+        for name in WATCHED_MODULES:
+            print(f"  {name:<26} {times[name]:>8.0f}ms" if name in times else f"  {name:<26} {'deferred':>10}")
+        print()
+
+    timings = {}
+    _timed("import app.main", lambda: __import__("app.main"), timings)
+    from app.database import create_tables
+    _timed("warm-up: create_tables", lambda: asyncio.run(create_tables()), timings)
+    module = _timed("warm-up: import agents + SDKs",
+                    lambda: __import__("app.agents.orchestrator", fromlist=["HealthcarePROOrchestrator"]),
+                    timings)
+    _timed("warm-up: build orchestrator", module.HealthcarePROOrchestrator, timings)
+
+    print("Start-up steps (this process):")
+    for label, elapsed in timings.items():
+        print(f"  {label:<34} {elapsed:>8.0f}ms")
+    serving = timings["import app.main"]
+    print(f"Accepting requests after {serving:.0f}ms; ready after {sum(timings.values()):.0f}ms "
+          f"(everything was on the import path before warm-up)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--no-imports", action="store_true", help="skip the -X importtime breakdown")
+    args = parser.parse_args()
+    main(not args.no_imports)
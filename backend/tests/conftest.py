@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# The app reads its configuration at import time
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("ENABLE_FAKE_LLM", "true")
+os.environ.setdefault("MODEL", "fake-llm")
+os.environ.setdefault("AGENT_WARMUP", "false")
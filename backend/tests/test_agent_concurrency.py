@@ -0,0 +1,79 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.agents.admission import ModelAdmission
+from app.agents.errors import AgentTimeoutError
+from app.agents.runner_utils import run_agent, stream_agent
+from app.database import create_tables
+from app.main import app, orchestrator as lazy_orchestrator
+
+LATENCY = 0.3
+
+
+class FakeRunner:
+    """Stands in for an ADK Runner; yields one final response after a delay"""
+
+    def __init__(self, name: str, latency: float):
+        self.agent = SimpleNamespace(name=name)
+        self.latency = latency
+
+    async def run_async(self, user_id, session_id, new_message, run_config=None):
+        await asyncio.sleep(self.latency)
+        yield SimpleNamespace(
+            is_final_response=lambda: True,
+            partial=False,
+            content=SimpleNamespace(parts=[SimpleNamespace(text=f"Echo: {new_message.parts[0].text}")]),
+            usage_metadata=None
+        )
+
+
+@pytest.fixture
+async def client():
+    await create_tables()
+    orchestrator = lazy_orchestrator.get()
+    orchestrator.companion.runner = FakeRunner("HealthcareCompanion", LATENCY)
+    orchestrator.questionnaire.runner = FakeRunner("AdaptiveQuestionnaire", LATENCY)
+    orchestrator.response_cache.max_entries = 0
+    # Measure the runners overlapping, not the configured model limits
+    orchestrator.admission = ModelAdmission(max_concurrency=1000, rate_per_second=1e6, burst=1000)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def _interact(client: httpx.AsyncClient, index: int):
+    return await client.post("/api/agent/interact", json={
+        "patient_id": str(index),
+        "interaction_type": "checkin" if index % 2 else "questionnaire",
+        "patient_data": {"id": str(index)},
+        "user_message": "How am I doing?"
+    })
+
+
+async def test_simultaneous_interactions_run_concurrently(client):
+    requests = 20
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(_interact(client, index) for index in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    assert all(response.status_code == 200 for response in responses)
+    # Serialized turns would take requests * LATENCY
+    assert elapsed < requests * LATENCY / 4
+
+
+async def test_run_agent_times_out():
+    runner = FakeRunner("Slow", latency=5)
+    with pytest.raises(AgentTimeoutError):
+        await run_agent(runner, "user", "session", "hello", timeout=0.05)
+
+
+async def test_stream_agent_times_out():
+    runner = FakeRunner("Slow", latency=5)
+    with pytest.raises(AgentTimeoutError):
+        async for _ in stream_agent(runner, "user", "session", "hello", timeout=0.05):
+            pass
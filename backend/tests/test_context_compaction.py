@@ -0,0 +1,70 @@
+from google.adk.events import Event
+from google.genai import types
+
+from app.agents.context_compaction import ContextCompactor, ConversationSummary
+
+KEY = ("HealthcareCompanion", "patient-1")
+
+
+def _session(turns: int, start: int = 1):
+    contents, events = [], []
+    for turn in range(start, start + turns):
+        for author, role, text in (("user", "user", f"My blood sugar was {100 + turn}"),
+                                   ("HealthcareCompanion", "model", "Thanks for sharing")):
+            content = types.Content(role=role, parts=[types.Part(text=text)])
+            contents.append(content)
+            events.append(Event(author=author, content=content, timestamp=float(turn)))
+    return contents, events
+
+
+def _summary_text(prompt):
+    return prompt[0].parts[0].text
+
+
+def test_keeps_recent_turns_and_summarizes_the_rest():
+    compactor = ContextCompactor(recent_turns=3)
+    contents, events = _session(10)
+
+    prompt = compactor.compact(KEY, contents, events)
+
+    assert len(prompt) == 6
+    assert "Summary of 7 earlier turns" in _summary_text(prompt)
+    assert "latest 107, first 101" in _summary_text(prompt)
+
+
+def test_summary_survives_deleted_events():
+    compactor = ContextCompactor(recent_turns=3)
+    contents, events = _session(10)
+    compactor.compact(KEY, contents, events)
+
+    # The session service deleted the first five turns; indexes shift, timestamps don't
+    more_contents, more_events = _session(2, start=11)
+    prompt = compactor.compact(KEY, contents[10:] + more_contents, events[10:] + more_events)
+
+    assert "Summary of 9 earlier turns" in _summary_text(prompt)
+    assert "first 101" in _summary_text(prompt)
+    assert compactor.turns_folded == 9
+
+
+def test_new_worker_resumes_from_persisted_summary():
+    persisted = ConversationSummary()
+    _, deleted = _session(5)
+    persisted.add_events(deleted)
+
+    contents, events = _session(5, start=6)
+    prompt = ContextCompactor(recent_turns=3).compact(KEY, contents, events, persisted.to_dict())
+
+    assert "Summary of 7 earlier turns" in _summary_text(prompt)
+    assert "first 101" in _summary_text(prompt)
+
+
+def test_reset_session_starts_a_new_summary():
+    compactor = ContextCompactor(recent_turns=3)
+    contents, events = _session(10)
+    compactor.compact(KEY, contents, events)
+
+    # Same session id, recreated after the old one was deleted
+    contents, events = _session(5, start=100)
+    prompt = compactor.compact(KEY, contents, events)
+
+    assert "Summary of 2 earlier turns" in _summary_text(prompt)
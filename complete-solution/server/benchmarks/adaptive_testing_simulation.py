@@ -0,0 +1,68 @@
+"""Compare adaptive (IRT) item selection with the category rotation it replaced.
+
+Simulated patients answer according to the 2PL model of the item bank. Both
+strategies use the same ability update and standard-error stopping rule;
+only the order in which items are asked differs, which is generous to the
+rotation: the agent used to keep cycling without any stopping rule.
+
+Each category is one item, so the banks hold only three or four items and
+the stopping rule rarely fires before the bank runs out. Adaptive ordering
+then saves at most about half a turn per questionnaire, and none for most
+conditions; the gain over the old agent is mainly the stopping rule itself.
+Run from ``complete-solution/server``::
+
+    python -m benchmarks.adaptive_testing_simulation [--se-target 0.65]
+"""
+import argparse
+import math
+import random
+import statistics
+
+from utils.adaptive_testing import ITEM_CALIBRATION as ITEM_BANK, AdaptiveTestingEngine
+
+
+def rotation_order(items):
+    """Items in the order the previous category rotation would ask them"""
+    return [(category, params.response_types[0]) for category, params in items.items()]
+
+
+def simulate(engine, condition, theta, rng, adaptive):
+    session = engine.start_session(condition)
+    order = iter(rotation_order(ITEM_BANK[condition]))
+    while True:
+        if adaptive:
+            item_id = engine.select_next_item(session)
+        else:
+            item_id = None if engine.should_stop(session) else next(order, None)
+        if item_id is None:
+            break
+        params = ITEM_BANK[condition][item_id[0]]
+        p = 1.0 / (1.0 + math.exp(-params.discrimination * (theta - params.difficulty)))
+        engine.record_response(session, item_id, 1 if rng.random() < p else 0)
+    return session
+
+
+def main(patients: int = 2000, seed: int = 7, se_target: float = None):
+    engine = AdaptiveTestingEngine(ITEM_BANK) if se_target is None else AdaptiveTestingEngine(ITEM_BANK, se_target=se_target)
+    print(f"{'condition':<14}{'bank':>6}{'rotation':>10}{'adaptive':>10}{'saved':>8}{'rmse rot':>10}{'rmse cat':>10}")
+    for condition in ITEM_BANK:
+        rng = random.Random(seed)
+        thetas = [rng.gauss(0.0, 1.0) for _ in range(patients)]
+        results = {}
+        for adaptive in (False, True):
+            run_rng = random.Random(seed + 1)
+            sessions = [simulate(engine, condition, theta, run_rng, adaptive) for theta in thetas]
+            turns = statistics.mean(s.items_answered for s in sessions)
+            rmse = math.sqrt(statistics.mean((s.theta - t) ** 2 for s, t in zip(sessions, thetas)))
+            results[adaptive] = (turns, rmse)
+        (rot_turns, rot_rmse), (cat_turns, cat_rmse) = results[False], results[True]
+        print(f"{condition:<14}{len(ITEM_BANK[condition]):>6}{rot_turns:>10.2f}{cat_turns:>10.2f}"
+              f"{rot_turns - cat_turns:>8.2f}{rot_rmse:>10.3f}{cat_rmse:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=2000)
+    parser.add_argument("--se-target", type=float, default=None)
+    args = parser.parse_args()
+    main(patients=args.patients, se_target=args.se_target)
@@ -0,0 +1,86 @@
+"""Kiosk burst: per-message /conversation/continue calls against one batch.
+
+Starts one session for each of ``--patients`` patients, then submits
+``--messages`` answers per patient, first as individual requests and then
+(on fresh sessions) as a single /conversation/batch call authenticated with
+an integration API key. Requests go through the in-process ASGI client, so
+the numbers leave out network round-trips and measure the server-side work:
+wall time and SQLite connections opened (one per query or commit).
+
+Run from ``complete-solution/server`` (uses a throwaway database)::
+
+    python -m benchmarks.batch_conversation [--patients 50] [--messages 4]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+API_KEY = "benchmark-key"
+ANSWERS = ["I'm tired but improving", "My blood sugar was 180 this morning", "About 7 hours",
+           "Yes, I took my medication", "Pain is around 4 out of 10"]
+
+
+def main(patients: int, messages: int):
+    os.environ["INTEGRATION_API_KEYS"] = API_KEY
+    os.chdir(tempfile.mkdtemp())
+    logging.disable(logging.INFO)
+
+    from fastapi.testclient import TestClient
+    import main as app_module
+
+    connections = {"count": 0}
+    open_connection = app_module.db_manager._get_connection
+
+    def counting_connection():
+        connections["count"] += 1
+        return open_connection()
+    app_module.db_manager._get_connection = counting_connection
+
+    with TestClient(app_module.app) as client:
+        tokens = []
+        for index in range(patients):
+            login = client.post("/auth/login", json={"email": f"kiosk{index}@example.com", "date_of_birth": "1980-01-01"})
+            tokens.append(login.json()["token"])
+
+        def start_sessions():
+            return [client.post("/conversation/start", params={"token": token}).json()["session_id"] for token in tokens]
+
+        items = lambda sessions: [(token, session_id, ANSWERS[turn % len(ANSWERS)])
+                                  for turn in range(messages) for token, session_id in zip(tokens, sessions)]
+
+        work = items(start_sessions())
+        connections["count"] = 0
+        start = time.perf_counter()
+        for token, session_id, message in work:
+            response = client.post("/conversation/continue", params={"token": token},
+                                   json={"session_id": session_id, "message": message})
+            assert response.status_code == 200, response.text
+        single_seconds = time.perf_counter() - start
+        single_connections = connections["count"]
+
+        work = items(start_sessions())
+        connections["count"] = 0
+        start = time.perf_counter()
+        response = client.post("/conversation/batch", headers={"X-API-Key": API_KEY},
+                               json={"items": [{"session_id": session_id, "message": message}
+                                               for _, session_id, message in work]})
+        batch_seconds = time.perf_counter() - start
+        batch_connections = connections["count"]
+        body = response.json()
+        assert response.status_code == 200 and body["failed"] == 0, body
+
+    count = len(work)
+    print(f"{patients} patients x {messages} messages = {count} items")
+    print(f"{'':<22} {'requests':>8} {'wall ms':>9} {'items/s':>8} {'db connections':>15}")
+    print(f"{'/conversation/continue':<22} {count:>8} {single_seconds * 1000:>9.0f} {count / single_seconds:>8.0f} {single_connections:>15}")
+    print(f"{'/conversation/batch':<22} {1:>8} {batch_seconds * 1000:>9.0f} {count / batch_seconds:>8.0f} {batch_connections:>15}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=4)
+    args = parser.parse_args()
+    main(args.patients, args.messages)
@@ -0,0 +1,44 @@
+"""Throughput benchmark for batch emotional-state classification.
+
+Run from ``complete-solution/server``::
+
+    python -m benchmarks.emotion_classifier_benchmark [--messages 50000]
+"""
+import argparse
+import random
+import time
+
+from utils.emotion_classifier import default_classifier
+
+SAMPLE_MESSAGES = [
+    "I'm tired but improving",
+    "Feeling really anxious about my blood sugar readings this week",
+    "not good at all, I feel hopeless",
+    "ok",
+    "Great, my pain is much better since I started the new medication",
+    "I am not worried, just a bit drained after work",
+    "My blood pressure was 135/85 this morning and I feel fine",
+    "I've been sad and lonely since my diagnosis",
+]
+
+
+def main(count: int, seed: int = 3):
+    rng = random.Random(seed)
+    messages = [rng.choice(SAMPLE_MESSAGES) for _ in range(count)]
+
+    start = time.perf_counter()
+    states = default_classifier.classify_batch(messages)
+    elapsed = time.perf_counter() - start
+
+    labels = {}
+    for state in states:
+        labels[state["emotional_state"]] = labels.get(state["emotional_state"], 0) + 1
+
+    print(f"Classified {count:,} messages in {elapsed:.3f}s ({count / elapsed:,.0f} messages/sec)")
+    print(f"Label counts: {labels}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50000)
+    main(parser.parse_args().messages)
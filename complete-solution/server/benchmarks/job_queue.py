@@ -0,0 +1,96 @@
+"""Background job queue: request latency against analysis cost, and drain throughput.
+
+For each simulated trend-analysis cost, completes sessions through
+/conversation/complete and reports how long the request took and how long
+the job took to finish. Then enqueues ``--jobs`` no-op jobs and times how
+fast ``--workers`` drain them.
+
+Run from ``complete-solution/server`` (uses a throwaway database)::
+
+    python -m benchmarks.job_queue [--costs 0 250 1000] [--sessions 5] [--jobs 2000]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+
+def _latency(client, token: str, sessions: int):
+    request_ms, finished_ms = [], []
+    for _ in range(sessions):
+        session_id = client.post("/conversation/start", params={"token": token}).json()["session_id"]
+        start = time.perf_counter()
+        accepted = client.post("/conversation/complete", params={"token": token, "session_id": session_id})
+        request_ms.append((time.perf_counter() - start) * 1000)
+        with client.stream("GET", accepted.json()["events_url"], params={"token": token}) as events:
+            for _ in events.iter_lines():
+                pass
+        finished_ms.append((time.perf_counter() - start) * 1000)
+    return statistics.median(request_ms), statistics.median(finished_ms)
+
+
+async def _drain(jobs: int, workers: int) -> float:
+    from utils.database import DatabaseManager
+    from utils.job_queue import JobQueue
+
+    db_manager = DatabaseManager("drain.db")
+    await db_manager.initialize()
+    queue = JobQueue(db_manager, workers=workers, poll_seconds=0.05)
+    done = asyncio.Event()
+    finished = {"count": 0}
+
+    async def noop(payload):
+        finished["count"] += 1
+        if finished["count"] == jobs:
+            done.set()
+    queue.register("noop", noop)
+
+    for index in range(jobs):
+        await queue.enqueue("noop", {"n": index}, priority=index % 3)
+    start = time.perf_counter()
+    await queue.start()
+    await done.wait()
+    elapsed = time.perf_counter() - start
+    await queue.stop()
+    return elapsed
+
+
+def main(costs, sessions: int, jobs: int, workers: int):
+    os.chdir(tempfile.mkdtemp())
+    logging.disable(logging.WARNING)
+
+    from fastapi.testclient import TestClient
+    import main as app_module
+
+    analyze = app_module.trend_monitoring_agent.analyze_patient_trends
+    cost = {"seconds": 0.0}
+
+    async def slow_analysis(**kwargs):
+        # Stand-in for a real model call or a large history
+        await asyncio.sleep(cost["seconds"])
+        return await analyze(**kwargs)
+    app_module.trend_monitoring_agent.analyze_patient_trends = slow_analysis
+
+    print(f"{'analysis ms':>11} {'request ms':>11} {'result ms':>10}")
+    with TestClient(app_module.app) as client:
+        token = client.post("/auth/login", json={"email": "jobs@example.com", "date_of_birth": "1980-01-01"}).json()["token"]
+        for analysis_ms in costs:
+            cost["seconds"] = analysis_ms / 1000
+            request_ms, finished_ms = _latency(client, token, sessions)
+            print(f"{analysis_ms:>11} {request_ms:>11.1f} {finished_ms:>10.1f}")
+
+    elapsed = asyncio.run(_drain(jobs, workers))
+    print(f"Drained {jobs} jobs with {workers} workers in {elapsed:.2f}s ({jobs / elapsed:,.0f} jobs/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--costs", type=int, nargs="+", default=[0, 250, 1000])
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    main(args.costs, args.sessions, args.jobs, args.workers)
@@ -0,0 +1,84 @@
+"""Metrics recording overhead per call, and /metrics render time.
+
+Times ``--calls`` calls of a no-op coroutine method, bare and wrapped by
+``utils.metrics.instrumented``, then the end-to-end overhead of the route
+wrapper on /health, and finally how long ``MetricsRegistry.render`` takes
+once the app's histograms are populated.
+
+Run from ``complete-solution/server`` (uses a throwaway database)::
+
+    python -m benchmarks.metrics_overhead [--calls 200000] [--requests 2000]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+
+async def _per_call(calls: int):
+    from utils.metrics import MetricsRegistry, instrumented
+
+    class Probe:
+        async def call(self):
+            return None
+
+    bare = Probe()
+
+    @instrumented("probe", "Probe method", registry=MetricsRegistry())
+    class TimedProbe(Probe):
+        async def call(self):
+            return None
+    timed = TimedProbe()
+
+    results = {}
+    for name, probe in (("bare", bare), ("instrumented", timed)):
+        start = time.perf_counter()
+        for _ in range(calls):
+            await probe.call()
+        results[name] = (time.perf_counter() - start) / calls * 1e9
+    return results
+
+
+def main(calls: int, requests: int):
+    os.chdir(tempfile.mkdtemp())
+    logging.disable(logging.WARNING)
+
+    results = asyncio.run(_per_call(calls))
+    print(f"{'coroutine call':<16} {'ns/call':>8}")
+    for name, ns in results.items():
+        print(f"{name:<16} {ns:>8.0f}")
+    print(f"{'overhead':<16} {results['instrumented'] - results['bare']:>8.0f}")
+
+    from fastapi.testclient import TestClient
+    import main as app_module
+
+    with TestClient(app_module.app) as client:
+        token = client.post("/auth/login", json={"email": "metrics@example.com", "date_of_birth": "1980-01-01"}).json()["token"]
+        session_id = client.post("/conversation/start", params={"token": token}).json()["session_id"]
+        for message in ("I'm tired today", "My blood sugar was 150", "About 6 hours"):
+            client.post("/conversation/continue", params={"token": token},
+                        json={"session_id": session_id, "message": message})
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get("/health")
+        request_us = (time.perf_counter() - start) / requests * 1e6
+
+        start = time.perf_counter()
+        for _ in range(100):
+            body = app_module.metrics.render()
+        render_us = (time.perf_counter() - start) / 100 * 1e6
+
+    series = sum(1 for line in body.splitlines() if not line.startswith("#"))
+    print(f"GET /health through the timed route: {request_us:.0f}us/request")
+    print(f"render: {render_us:.0f}us for {series} series ({len(body) / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.calls, args.requests)
@@ -0,0 +1,35 @@
+"""Throughput benchmark for the PRO extraction engine.
+
+Runs the extractor over the regression corpus that ``tests/test_pro_extraction.py``
+checks. Run from ``complete-solution/server``::
+
+    python -m benchmarks.pro_extraction_benchmark
+"""
+import json
+import os
+import time
+
+from utils.pro_extraction import default_extractor
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "tests", "pro_extraction_corpus.json")
+
+
+def load_corpus():
+    with open(CORPUS_PATH, encoding="utf-8") as corpus_file:
+        return json.load(corpus_file)
+
+
+def measure_throughput(corpus, rounds: int = 2000) -> float:
+    """Return extracted messages per second over the corpus"""
+    messages = [example["message"] for example in corpus]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            default_extractor.extract(message)
+    elapsed = time.perf_counter() - start
+    return rounds * len(messages) / elapsed
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    print(f"Throughput over {len(corpus)} corpus messages: {measure_throughput(corpus):,.0f} messages/sec")
@@ -0,0 +1,129 @@
+"""Per-endpoint cost of turning a handler's return value into response bytes.
+
+Runs FastAPI's own response path for each route (``serialize_response`` with
+the route's response model, then its response class) on payloads shaped like
+what the handlers return, so the numbers compare the encoder and response
+class the app is configured with, without the database or the agents.
+
+Run from ``complete-solution/server``::
+
+    python -m benchmarks.response_serialization [--repeat 2000] [--anomalies 200]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute, serialize_response
+
+from main import app
+
+NOW = datetime(2025, 3, 1, 9, 30)
+
+
+def _analysis(patient_id: int, anomalies: int) -> dict:
+    trend = {
+        "question_id": "blood_sugar", "trend_direction": "increasing", "rate_of_change": 15.5,
+        "mean_value": 165.0, "std_value": 25.0, "min_value": 140.0, "max_value": 200.0, "data_points": 120,
+        "clinical_significance": {"significance": "high", "clinical_impact": "Blood sugar levels are trending upward",
+                                  "urgency": "medium", "recommendation": "Consider medication adjustment"},
+        "slope": 0.8
+    }
+    return {
+        "patient_id": patient_id,
+        "analysis_date": NOW,
+        "trends": [trend] * 3,
+        "anomalies": [{"question_id": "blood_sugar", "timestamp": NOW - timedelta(hours=index), "value": "220",
+                       "z_score": 2.5, "severity": "medium"} for index in range(anomalies)],
+        "risk_assessment": {"overall_risk": "medium", "risk_factors": {"blood_sugar": "high"},
+                            "condition": "diabetes", "assessment_date": NOW},
+        "alerts": [{"type": "trend_deterioration", "severity": "medium",
+                    "description": "Concerning trend in blood_sugar: Blood sugar levels are trending upward"}],
+        "recommendations": ["Monitor blood sugar levels closely", "Take medications as prescribed"],
+        "risk_score": 0.5,
+        "data_points": 120
+    }
+
+
+def payloads(anomalies: int) -> dict:
+    """Return values of each handler, keyed by (method, path)"""
+    turn = {
+        "session_id": "6f1c2f9e-8d7a-4a61-9a55-0c1d2e3f4a5b",
+        "response": "Thanks for sharing. On a scale of 1 to 10, how would you rate your pain today?",
+        "agent_type": "adaptive_questionnaire",
+        "next_action": "continue_questionnaire",
+        "emotional_state": {"emotional_state": "tired", "confidence_score": 0.82, "key_emotions": ["tired"],
+                            "urgency_level": "low", "suggested_response_tone": "supportive"}
+    }
+    return {
+        ("POST", "/auth/login"): {"token": "c29tZS10b2tlbg==", "patient_id": 7, "email": "pat@example.com",
+                                  "condition": "diabetes"},
+        ("GET", "/patients/{patient_id}"): {
+            "id": 7, "email": "pat@example.com", "date_of_birth": "1980-01-01", "condition": "diabetes",
+            "medical_history": "Type 2 diabetes since 2015", "preferred_language": "en",
+            "accessibility_needs": None, "created_at": "2025-01-01 12:00:00"
+        },
+        ("POST", "/conversation/start"): {key: turn[key] for key in ("session_id", "response", "agent_type", "next_action")},
+        ("POST", "/conversation/continue"): turn,
+        ("POST", "/conversation/analyze"): {"patient_id": 7, "analysis": _analysis(7, anomalies), "timestamp": NOW},
+        ("POST", "/conversation/complete"): {
+            "job_id": "0b9e7c52-3f0e-4d4b-9a57-6f1a2b3c4d5e", "status": "queued", "session_id": turn["session_id"],
+            "status_url": "/jobs/0b9e7c52-3f0e-4d4b-9a57-6f1a2b3c4d5e",
+            "events_url": "/jobs/0b9e7c52-3f0e-4d4b-9a57-6f1a2b3c4d5e/events"
+        },
+        ("GET", "/jobs/{job_id}"): {
+            "id": "0b9e7c52-3f0e-4d4b-9a57-6f1a2b3c4d5e", "kind": "session_completion", "status": "succeeded",
+            "priority": 10, "attempts": 1, "max_attempts": 5, "run_at": "2025-03-01T09:30:00.000",
+            "created_at": "2025-03-01T09:30:00.000", "updated_at": "2025-03-01T09:30:00.412",
+            "finished_at": "2025-03-01T09:30:00.412", "error": None,
+            "result": {
+                "session_id": turn["session_id"],
+                "completion_message": "Thank you for completing today's check-in!",
+                "insights": _analysis(7, anomalies),
+                "session_summary": {"total_interactions": 12, "session_duration": 431.5,
+                                    "key_findings": ["Monitor blood sugar levels closely"]}
+            }
+        },
+        ("POST", "/checkins/schedule"): {"patient_id": 7, "frequency": "daily", "preferred_time": "09:00",
+                                         "active": True, "next_run_at": NOW},
+        ("GET", "/health"): {"status": "healthy", "timestamp": NOW,
+                             "agents": {"companion": "active", "adaptive_questionnaire": "active",
+                                        "trend_monitoring": "active"}},
+    }
+
+
+def _response_class(route: APIRoute):
+    response_class = route.response_class
+    return response_class.value if isinstance(response_class, DefaultPlaceholder) else response_class
+
+
+async def _render(route: APIRoute, content) -> bytes:
+    serialized = await serialize_response(field=route.response_field, response_content=content, is_coroutine=True)
+    return _response_class(route)(serialized).body
+
+
+async def main(repeat: int, anomalies: int):
+    routes = {(method, route.path): route for route in app.routes if isinstance(route, APIRoute)
+              for method in route.methods}
+    print(f"{'endpoint':<32} {'model':<24} {'response class':<16} {'µs/response':>11} {'bytes':>7}")
+    total = 0.0
+    for key, content in payloads(anomalies).items():
+        route = routes[key]
+        body = await _render(route, content)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            await _render(route, content)
+        micros = (time.perf_counter() - start) / repeat * 1e6
+        total += micros
+        model = route.response_model.__name__ if isinstance(route.response_model, type) else str(route.response_model or "-")
+        print(f"{key[0] + ' ' + key[1]:<32} {model:<24} {_response_class(route).__name__:<16} {micros:>11.1f} {len(body):>7}")
+    print(f"{'total':<74} {total:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--anomalies", type=int, default=200, help="anomalies in each trend analysis")
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat, args.anomalies))
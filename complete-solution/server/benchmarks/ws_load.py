@@ -0,0 +1,121 @@
+"""Load test for /ws/conversation with thousands of concurrent sockets.
+
+Logs one patient in over HTTP, then opens ``--sockets`` conversations (each
+its own session) at ``--ramp`` connections per second. Every socket sends
+``--turns`` messages with a think time in between and then stays open until
+all sockets have finished, so the server holds every connection at once.
+
+Start the server first (``uvicorn main:app``), then from ``complete-solution/server``::
+
+    python -m benchmarks.ws_load [--sockets 2000] [--turns 3] [--url ws://localhost:8000]
+
+Raise the open-file limit (``ulimit -n``) on both sides for large runs.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import urllib.request
+
+import websockets
+
+
+def _login(http_url: str, email: str) -> str:
+    request = urllib.request.Request(
+        f"{http_url}/auth/login",
+        data=json.dumps({"email": email, "date_of_birth": "1980-01-01"}).encode(),
+        headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)["token"]
+
+
+async def _conversation(url: str, token: str, turns: int, think_time: float,
+                        results: dict, all_open: asyncio.Event, done: asyncio.Event):
+    start = time.perf_counter()
+    try:
+        async with websockets.connect(f"{url}/ws/conversation?token={token}", open_timeout=60) as socket:
+            while json.loads(await socket.recv())["type"] != "turn":
+                pass  # ready, then the replayed greeting
+            results["connect"].append(time.perf_counter() - start)
+            results["open"] += 1
+            results["peak_open"] = max(results["peak_open"], results["open"])
+            if results["open"] == results["target"]:
+                all_open.set()
+
+            for turn in range(turns):
+                await asyncio.sleep(think_time)
+                sent = time.perf_counter()
+                await socket.send(json.dumps({"type": "message", "id": turn, "text": "My pain is 4/10 today"}))
+                while True:
+                    frame = json.loads(await socket.recv())
+                    if frame["type"] == "ping":
+                        await socket.send(json.dumps({"type": "pong"}))
+                    elif frame.get("id") == turn:
+                        break
+                if frame["type"] == "turn":
+                    results["turn"].append(time.perf_counter() - sent)
+                else:
+                    results["errors"] += 1
+
+            await done.wait()
+            results["open"] -= 1
+    except Exception as e:
+        results["failed"] += 1
+        results["last_error"] = repr(e)
+
+
+def _percentiles(values):
+    if not values:
+        return "n/a"
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return f"p50 {pick(0.5):.0f}ms, p95 {pick(0.95):.0f}ms, p99 {pick(0.99):.0f}ms, max {ordered[-1] * 1000:.0f}ms"
+
+
+async def main(args):
+    http_url = args.url.replace("ws://", "http://").replace("wss://", "https://")
+    token = await asyncio.to_thread(_login, http_url, args.email)
+
+    results = {"connect": [], "turn": [], "open": 0, "peak_open": 0, "errors": 0, "failed": 0,
+               "target": args.sockets, "last_error": None}
+    all_open = asyncio.Event()
+    done = asyncio.Event()
+    started = time.perf_counter()
+
+    tasks = []
+    for index in range(args.sockets):
+        tasks.append(asyncio.create_task(
+            _conversation(args.url, token, args.turns, args.think_time, results, all_open, done)
+        ))
+        await asyncio.sleep(1 / args.ramp)
+
+    # Release the sockets once every conversation has finished its turns
+    while sum(1 for task in tasks if not task.done()) > 0 and \
+            len(results["turn"]) + results["errors"] + results["failed"] * args.turns < args.sockets * args.turns:
+        await asyncio.sleep(0.2)
+    done.set()
+    await asyncio.gather(*tasks)
+
+    elapsed = time.perf_counter() - started
+    print(f"{args.sockets} sockets, {args.turns} turns each, {elapsed:.1f}s")
+    print(f"Peak concurrently open: {results['peak_open']}, failed connections: {results['failed']}, "
+          f"error frames: {results['errors']}")
+    print(f"Connect to first frame: {_percentiles(results['connect'])}")
+    print(f"Turn latency:           {_percentiles(results['turn'])}")
+    if results["turn"]:
+        print(f"Turns per second: {len(results['turn']) / elapsed:.0f} (mean {statistics.mean(results['turn']) * 1000:.0f}ms)")
+    if results["last_error"]:
+        print(f"Last connection error: {results['last_error']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="ws://localhost:8000")
+    parser.add_argument("--email", default="ws-load@example.com")
+    parser.add_argument("--sockets", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--think-time", type=float, default=1.0)
+    parser.add_argument("--ramp", type=float, default=500, help="new connections per second")
+    asyncio.run(main(parser.parse_args()))
@@ -32,7 +32,7 @@ import {
   SmartToy,
 } from "@mui/icons-material";
 import { useAuth } from "../contexts/AuthContext";
-import { conversationAPI } from "../services/api";
+import { conversationAPI, jobsAPI } from "../services/api";
 
 interface Message {
   id: string;
@@ -175,7 +175,8 @@ const ConversationPage: React.FC = () => {
     try {
       setLoading(true);
       const response = await conversationAPI.complete(sessionId);
-      const { completion_message } = response.data;
+      // Insights are generated in the background
+      const { completion_message } = await jobsAPI.wait(response.data.job_id);
 
       const completionMessage: Message = {
         id: Date.now().toString(),
@@ -188,7 +189,7 @@ const ConversationPage: React.FC = () => {
       setMessages((prev) => [...prev, completionMessage]);
       setShowSummary(false);
     } catch (err: any) {
-      setError(err.response?.data?.detail || "Failed to complete conversation");
+      setError(err.response?.data?.detail || err.message || "Failed to complete conversation");
     } finally {
       setLoading(false);
     }
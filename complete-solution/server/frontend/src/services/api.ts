@@ -60,6 +60,23 @@ export const conversationAPI = {
     api.post('/conversations/complete', { session_id: sessionId }),
 };
 
+export const jobsAPI = {
+  // The job endpoints take the patient's token as a query parameter, not a Bearer header
+  get: (jobId: string) =>
+    api.get(`/jobs/${jobId}`, { params: { token: localStorage.getItem('token') } }),
+  // Poll a background job until it finishes and return its result
+  wait: async (jobId: string, intervalMs = 500, timeoutMs = 60000) => {
+    const deadline = Date.now() + timeoutMs;
+    for (;;) {
+      const { data } = await jobsAPI.get(jobId);
+      if (data.status === 'succeeded') return data.result;
+      if (data.status === 'failed') throw new Error(data.error || 'Job failed');
+      if (Date.now() + intervalMs > deadline) throw new Error(`Job ${jobId} did not finish in ${timeoutMs / 1000}s`);
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  },
+};
+
 export const clinicianAPI = {
   getPatients: () => api.get('/clinicians/patients'),
   getPatientDetails: (patientId: string) => api.get(`/clinicians/patients/${patientId}`),
@@ -1,6 +1,6 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Header, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import asyncio
@@ -13,8 +13,23 @@ from utils.database import DatabaseManager
 from utils.companion_agent import CompanionAgent
 from utils.adaptive_questionnaire_agent import AdaptiveQuestionnaireAgent
 from utils.trend_monitoring_agent import TrendMonitoringAgent
-from utils.auth import create_simple_token, get_current_user
-from utils.models import Patient, PROResponse, ConversationSession
+from utils.auth import create_simple_token, get_current_user, verify_api_key
+from utils.models import (
+    Patient, PROResponse, ConversationSession, SessionPhase, LoginResponse, PatientProfileResponse,
+    ConversationRequest, ConversationResponse, AnalysisResponse, CompletionResponse,
+    CheckInScheduleResponse, HealthResponse, BatchConversationRequest, BatchConversationResponse,
+    JobAccepted, JobStatus
+)
+from utils.agent_pipeline import AgentPipeline, PipelineStep, PipelineResult, PipelineStepError
+from utils.session_phases import InvalidPhaseTransition, path_to_completion
+from utils.checkin_scheduler import CheckInScheduler
+from utils.streaming import StreamTimer, sse_event, stream_text
+from utils.conversation_context import ConversationContextManager
+from utils.warmup import LazyAgent, WarmUp
+from utils.conversation_socket import ConversationSocket, SocketStats, CLOSE_POLICY_VIOLATION
+from utils.conversation_batch import ConversationBatchProcessor, BATCH_MAX_ITEMS
+from utils.job_queue import JobQueue, PermanentJobError
+from utils.metrics import TimedRoute, metrics
 
 # Load environment variables
 load_dotenv()
@@ -26,8 +41,13 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Patient Reported Outcomes Multi-Agent System",
     description="A multi-agent system for collecting and analyzing patient reported outcomes using email and date of birth authentication",
-    version="1.0.0"
+    version="1.0.0",
+    # Responses go through their response_model (validated and dumped by
+    # pydantic-core) and are written with orjson instead of jsonable_encoder
+    default_response_class=ORJSONResponse
 )
+# Per-route latency, status and in-flight metrics; set before any route is declared
+app.router.route_class = TimedRoute
 
 # CORS middleware
 app.add_middleware(
@@ -38,11 +58,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database and agents
+# Initialize database; agents are built by the warm-up task or on first use
 db_manager = DatabaseManager()
-companion_agent = CompanionAgent()
-adaptive_questionnaire_agent = AdaptiveQuestionnaireAgent()
-trend_monitoring_agent = TrendMonitoringAgent()
+companion_agent = LazyAgent("companion_agent", CompanionAgent)
+adaptive_questionnaire_agent = LazyAgent("adaptive_questionnaire_agent", AdaptiveQuestionnaireAgent)
+trend_monitoring_agent = LazyAgent("trend_monitoring_agent", TrendMonitoringAgent)
+warmup = WarmUp()
+for lazy_agent in (companion_agent, adaptive_questionnaire_agent, trend_monitoring_agent):
+    warmup.add(lazy_agent.name, lazy_agent.load)
+agent_pipeline = AgentPipeline()
+conversation_context = ConversationContextManager()
+history_cache = metrics.cache("session_history")
+socket_stats = SocketStats()
+EMOTION_STEP_TIMEOUT = float(os.getenv("EMOTION_STEP_TIMEOUT_SECONDS", "2"))
+
+async def _dispatch_check_in(patient_id: int):
+    """Open a companion session for a scheduled check-in"""
+    patient = await db_manager.get_patient(patient_id)
+    if not patient:
+        logger.warning(f"Skipping check-in for unknown patient {patient_id}")
+        return
+
+    session_id = await db_manager.create_conversation_session(patient_id)
+    await companion_agent.load()
+    initial_message = await companion_agent.get_initial_message(patient)
+    await db_manager.store_conversation_interaction(
+        session_id=session_id,
+        patient_id=patient_id,
+        message="",
+        response=initial_message,
+        agent_type="companion"
+    )
+
+checkin_scheduler = CheckInScheduler(
+    db_manager,
+    _dispatch_check_in,
+    workers=int(os.getenv("CHECKIN_WORKERS", "8")),
+    jitter_seconds=float(os.getenv("CHECKIN_JITTER_SECONDS", "60"))
+)
 
 # Pydantic models for API
 class PatientCreate(BaseModel):
@@ -57,25 +110,31 @@ class PatientLogin(BaseModel):
     email: str
     date_of_birth: str
 
-class ConversationRequest(BaseModel):
-    message: str
-    session_id: Optional[str] = None
+class CheckInScheduleRequest(BaseModel):
+    frequency: str = "daily"  # daily, weekly, monthly
+    preferred_time: str = "09:00"  # HH:MM, UTC
+    active: bool = True
 
-class ConversationResponse(BaseModel):
-    session_id: str
-    response: str
-    agent_type: str
-    next_action: Optional[str] = None
+job_queue = JobQueue(db_manager)
 
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and agents on startup"""
     await db_manager.initialize()
+    await checkin_scheduler.start()
+    await job_queue.start()
+    warmup.start()
     logger.info("Multi-agent system initialized successfully")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers"""
+    await checkin_scheduler.stop()
+    await job_queue.stop()
+
 # Authentication endpoints
-@app.post("/auth/login")
+@app.post("/auth/login", response_model=LoginResponse)
 async def login_patient(patient_data: PatientLogin):
     """Login patient using email and date of birth"""
     try:
@@ -111,7 +170,7 @@ async def login_patient(patient_data: PatientLogin):
         raise HTTPException(status_code=400, detail=str(e))
 
 # Patient management endpoints
-@app.post("/patients")
+@app.post("/patients", response_model=PatientProfileResponse)
 async def create_patient_profile(patient_data: PatientCreate):
     """Create or update patient profile"""
     try:
@@ -142,7 +201,7 @@ async def create_patient_profile(patient_data: PatientCreate):
         logger.error(f"Error creating patient profile: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/patients/{patient_id}")
+@app.get("/patients/{patient_id}", response_model=Patient)
 async def get_patient_profile(patient_id: int, token: str = Query(...)):
     """Get patient information"""
     try:
@@ -160,7 +219,31 @@ async def get_patient_profile(patient_id: int, token: str = Query(...)):
         raise HTTPException(status_code=400, detail=str(e))
 
 # Multi-agent conversation endpoints
-@app.post("/conversation/start")
+async def _start_session(patient: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a session and store the companion's opening message"""
+    session_id = await db_manager.create_conversation_session(patient["id"])
+
+    # Get initial message from companion agent
+    await companion_agent.load()
+    initial_message = await companion_agent.get_initial_message(patient)
+
+    # Store the interaction
+    await db_manager.store_conversation_interaction(
+        session_id=session_id,
+        patient_id=patient["id"],
+        message="",
+        response=initial_message,
+        agent_type="companion"
+    )
+
+    return {
+        "session_id": session_id,
+        "response": initial_message,
+        "agent_type": "companion",
+        "next_action": "wait_for_response"
+    }
+
+@app.post("/conversation/start", response_model=ConversationResponse)
 async def start_conversation(token: str = Query(...)):
     """Start a new conversation session with the companion agent"""
     try:
@@ -171,109 +254,377 @@ async def start_conversation(token: str = Query(...)):
         if not patient:
             raise HTTPException(status_code=404, detail="Patient not found")
 
-        # Create new session
-        session_id = await db_manager.create_conversation_session(patient["id"])
-
-        # Get initial message from companion agent
-        initial_message = await companion_agent.get_initial_message(patient)
-
-        # Store the interaction
-        await db_manager.store_conversation_interaction(
-            session_id=session_id,
-            patient_id=patient["id"],
-            message="",
-            response=initial_message,
-            agent_type="companion"
-        )
-
-        return {
-            "session_id": session_id,
-            "response": initial_message,
-            "agent_type": "companion",
-            "next_action": "wait_for_response"
-        }
+        return await _start_session(patient)
 
     except Exception as e:
         logger.error(f"Error starting conversation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/conversation/continue")
+NEUTRAL_EMOTIONAL_STATE = {
+    "emotional_state": "neutral",
+    "confidence_score": 0.0,
+    "key_emotions": [],
+    "urgency_level": "low",
+    "suggested_response_tone": "supportive"
+}
+QUESTIONNAIRE_FALLBACK = "I understand. Could you tell me more about how you're feeling today?"
+
+async def _run_questionnaire(patient: Dict[str, Any], session: Dict[str, Any], message: str) -> str:
+    """Get the next questionnaire response; socket sessions carry their history, others read it"""
+    session_id = session["id"]
+    history = session.get("history")
+    if history is None:
+        history_cache.miss()
+        history = await db_manager.get_conversation_history(session_id)
+    else:
+        history_cache.hit()
+    # Older turns reach the agent as a summary so the prompt stays bounded
+    context = conversation_context.build(session_id, history)
+    if context.summary:
+        logger.debug(f"Compacted history of session {session_id}: {context.tokens_before} -> {context.tokens_after} tokens")
+    await adaptive_questionnaire_agent.load()
+    return await adaptive_questionnaire_agent.process_message(
+        patient=patient,
+        message=message,
+        session_id=session_id,
+        history=context.history,
+        writes=session.get("writes")
+    )
+
+async def _store_interaction(patient: Dict[str, Any], session: Dict[str, Any], message: str, response: str, agent_type: str):
+    """Store a turn, or queue it when the session's writes are batched"""
+    writes = session.get("writes")
+    if writes is not None:
+        writes.append(("interaction", patient["id"], message, response, agent_type))
+        return
+    await db_manager.store_conversation_interaction(
+        session_id=session["id"],
+        patient_id=patient["id"],
+        message=message,
+        response=response,
+        agent_type=agent_type
+    )
+
+async def _transition_phase(session: Dict[str, Any], from_phase: SessionPhase, to_phase: SessionPhase):
+    """Move the session to its next phase, or queue the move when writes are batched"""
+    writes = session.get("writes")
+    if writes is not None:
+        writes.append(("transition", from_phase, to_phase))
+        return
+    await db_manager.transition_session_phase(session["id"], from_phase, to_phase)
+
+async def _write_turn(patient: Dict[str, Any], session: Dict[str, Any], message: str, response: str, agent_type: str, transition: Optional[tuple]):
+    """Store the turn and its phase transition in one commit, or queue both when writes are batched"""
+    turn_writes = [("interaction", patient["id"], message, response, agent_type)]
+    if transition:
+        turn_writes.append(("transition", *transition))
+
+    writes = session.get("writes")
+    if writes is not None:
+        writes.extend(turn_writes)
+        return
+    conflicts = await db_manager.store_conversation_writes({session["id"]: turn_writes})
+    if session["id"] in conflicts:
+        raise conflicts[session["id"]]
+
+async def _record_turn(patient: Dict[str, Any], session: Dict[str, Any], message: str, response: str, agent_type: str, transition: Optional[tuple] = None) -> PipelineResult:
+    """Store the turn and apply any phase transition atomically"""
+    return await agent_pipeline.run([PipelineStep(
+        "record_turn",
+        lambda: _write_turn(patient, session, message, response, agent_type, transition),
+        required=True
+    )])
+
+def _log_turn_timings(session_id: str, *results: PipelineResult):
+    """Log per-step timings and the critical path of a turn"""
+    timings = {}
+    for result in results:
+        timings.update(result.timings)
+    critical_path = sum(result.results[result.critical_step].elapsed_ms for result in results if result.critical_step)
+    logger.info(f"Turn timings for session {session_id}: {timings}, critical path {critical_path:.1f}ms")
+
+async def _reply_to_greeting(patient: Dict[str, Any], session: Dict[str, Any], message: str) -> Dict[str, Any]:
+    """First reply after the greeting: emotional triage alongside the first questionnaire question"""
+    session_id = session["id"]
+    await _transition_phase(session, SessionPhase.GREETING, SessionPhase.EMOTIONAL_TRIAGE)
+
+    # Emotional triage and the questionnaire don't depend on each other
+    await companion_agent.load()
+    agents = await agent_pipeline.run([
+        PipelineStep(
+            "detect_emotional_state",
+            lambda: companion_agent.detect_emotional_state(message),
+            timeout=EMOTION_STEP_TIMEOUT,
+            fallback=NEUTRAL_EMOTIONAL_STATE
+        ),
+        PipelineStep(
+            "adaptive_questionnaire",
+            lambda: _run_questionnaire(patient, session, message),
+            fallback=QUESTIONNAIRE_FALLBACK
+        ),
+    ])
+    questionnaire_response = agents["adaptive_questionnaire"]
+
+    writes = await _record_turn(
+        patient, session, message, questionnaire_response, "adaptive_questionnaire",
+        transition=(SessionPhase.EMOTIONAL_TRIAGE, SessionPhase.QUESTIONNAIRE)
+    )
+    session["phase"] = SessionPhase.QUESTIONNAIRE.value
+    _log_turn_timings(session_id, agents, writes)
+
+    return {
+        "session_id": session_id,
+        "response": questionnaire_response,
+        "agent_type": "adaptive_questionnaire",
+        "next_action": "continue_questionnaire",
+        "emotional_state": agents["detect_emotional_state"]
+    }
+
+async def _continue_questionnaire(patient: Dict[str, Any], session: Dict[str, Any], message: str) -> Dict[str, Any]:
+    """Answer within the questionnaire phase, wrapping up once it is complete"""
+    session_id = session["id"]
+    if session["phase"] == SessionPhase.EMOTIONAL_TRIAGE.value:
+        # Resume a session interrupted between triage and the questionnaire
+        await _transition_phase(session, SessionPhase.EMOTIONAL_TRIAGE, SessionPhase.QUESTIONNAIRE)
+
+    agents = await agent_pipeline.run([
+        PipelineStep(
+            "adaptive_questionnaire",
+            lambda: _run_questionnaire(patient, session, message),
+            fallback=QUESTIONNAIRE_FALLBACK
+        ),
+    ])
+    response = agents["adaptive_questionnaire"]
+
+    next_action = "continue_questionnaire"
+    transition = None
+    if adaptive_questionnaire_agent.is_complete(patient["id"]):
+        transition = (SessionPhase.QUESTIONNAIRE, SessionPhase.WRAP_UP)
+        next_action = "complete_session"
+
+    writes = await _record_turn(patient, session, message, response, "adaptive_questionnaire", transition)
+    session["phase"] = (transition[1] if transition else SessionPhase.QUESTIONNAIRE).value
+    _log_turn_timings(session_id, agents, writes)
+
+    return {
+        "session_id": session_id,
+        "response": response,
+        "agent_type": "adaptive_questionnaire",
+        "next_action": next_action
+    }
+
+async def _reply_in_wrap_up(patient: Dict[str, Any], session: Dict[str, Any], message: str) -> Dict[str, Any]:
+    """Companion follow-up for messages sent after the questionnaire finished"""
+    await companion_agent.load()
+    emotional_analysis = await companion_agent.detect_emotional_state(message)
+    response = await companion_agent.generate_follow_up(patient, emotional_analysis)
+
+    await _store_interaction(patient, session, message, response, "companion")
+
+    return {
+        "session_id": session["id"],
+        "response": response,
+        "agent_type": "companion",
+        "next_action": "complete_session",
+        "emotional_state": emotional_analysis
+    }
+
+# Which handler answers a patient message in each session phase
+PHASE_HANDLERS = {
+    SessionPhase.GREETING: _reply_to_greeting,
+    SessionPhase.EMOTIONAL_TRIAGE: _continue_questionnaire,
+    SessionPhase.QUESTIONNAIRE: _continue_questionnaire,
+    SessionPhase.WRAP_UP: _reply_in_wrap_up,
+}
+
+async def _answer_in_phase(patient: Dict[str, Any], session: Dict[str, Any], message: str) -> Dict[str, Any]:
+    """Answer with the handler for the session's current phase"""
+    handler = PHASE_HANDLERS.get(SessionPhase(session["phase"]))
+    if handler is None:
+        raise HTTPException(status_code=409, detail="Conversation session is already completed")
+    return await handler(patient, session, message)
+
+async def _resolve_turn(request: ConversationRequest, token: str):
+    """Authenticate the patient and pick the handler for the session's phase"""
+    user_data = get_current_user(token)
+    patient = await db_manager.get_patient_by_email(user_data["email"])
+
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+
+    session = await db_manager.get_conversation_session(request.session_id)
+    if not session or session["patient_id"] != patient["id"]:
+        raise HTTPException(status_code=404, detail="Conversation session not found")
+
+    # Route on the persisted session phase
+    handler = PHASE_HANDLERS.get(SessionPhase(session["phase"]))
+    if handler is None:
+        raise HTTPException(status_code=409, detail="Conversation session is already completed")
+
+    return patient, session, handler
+
+def _conversation_error(e: Exception) -> HTTPException:
+    """Map a failed conversation turn to an HTTP error"""
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, InvalidPhaseTransition):
+        logger.error(f"Conflicting conversation update: {e}")
+        return HTTPException(status_code=409, detail=str(e))
+    if isinstance(e, PipelineStepError) and isinstance(e.result.error, InvalidPhaseTransition):
+        return HTTPException(status_code=409, detail=str(e.result.error))
+    logger.error(f"Error continuing conversation: {e}")
+    return HTTPException(status_code=500, detail=str(e))
+
+@app.post("/conversation/continue", response_model=ConversationResponse)
 async def continue_conversation(
     request: ConversationRequest,
     token: str = Query(...)
 ):
     """Continue conversation with adaptive agents"""
     try:
-        # Verify token and get patient
-        user_data = get_current_user(token)
-        patient = await db_manager.get_patient_by_email(user_data["email"])
+        patient, session, handler = await _resolve_turn(request, token)
+        return await handler(patient, session, request.message)
 
-        if not patient:
-            raise HTTPException(status_code=404, detail="Patient not found")
+    except Exception as e:
+        raise _conversation_error(e)
 
-        # Get conversation history
-        history = await db_manager.get_conversation_history(request.session_id)
-
-        # Determine which agent should respond based on conversation flow
-        if len(history) == 1:  # First response after initial greeting
-            # Use companion agent to analyze emotional state and transition to questionnaire
-            emotional_analysis = await companion_agent.detect_emotional_state(request.message)
-
-            # Store the patient's response
-            await db_manager.store_conversation_interaction(
-                session_id=request.session_id,
-                patient_id=patient["id"],
-                message=request.message,
-                response="",
-                agent_type="patient"
-            )
+@app.post("/conversation/continue/stream")
+async def continue_conversation_stream(
+    request: ConversationRequest,
+    token: str = Query(...)
+):
+    """Continue the conversation, streaming the reply as Server-Sent Events.
 
-            # Generate adaptive questionnaire based on emotional state and medical history
-            questionnaire_response = await adaptive_questionnaire_agent.process_message(
-                patient=patient,
-                message=request.message,
-                session_id=request.session_id,
-                history=history
-            )
+    Emits ``token`` events with text chunks, then one ``done`` event with the
+    full turn (stored once, as with /conversation/continue) and its time to
+    first token and total latency.
+    """
+    try:
+        patient, session, handler = await _resolve_turn(request, token)
+    except Exception as e:
+        raise _conversation_error(e)
 
-            return {
-                "session_id": request.session_id,
-                "response": questionnaire_response,
-                "agent_type": "adaptive_questionnaire",
-                "next_action": "continue_questionnaire",
-                "emotional_state": emotional_analysis
-            }
+    async def events():
+        timer = StreamTimer()
+        try:
+            result = await handler(patient, session, request.message)
+            async for event in stream_text(result["response"], timer):
+                yield event
 
-        else:
-            # Continue with adaptive questionnaire
-            response = await adaptive_questionnaire_agent.process_message(
-                patient=patient,
-                message=request.message,
-                session_id=request.session_id,
-                history=history
-            )
+            metrics = timer.metrics()
+            logger.info(f"Streamed turn for session {session['id']}: {metrics}")
+            yield sse_event("done", {**result, "metrics": metrics})
 
-            # Store the interaction
-            await db_manager.store_conversation_interaction(
-                session_id=request.session_id,
-                patient_id=patient["id"],
-                message=request.message,
-                response=response,
-                agent_type="adaptive_questionnaire"
-            )
+        except Exception as e:
+            error = _conversation_error(e)
+            yield sse_event("error", {"status_code": error.status_code, "detail": error.detail})
 
-            return {
-                "session_id": request.session_id,
-                "response": response,
-                "agent_type": "adaptive_questionnaire",
-                "next_action": "continue_questionnaire"
-            }
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
+batch_processor = ConversationBatchProcessor(
+    db_manager, _answer_in_phase, _conversation_error,
+    checkpoint=lambda patient: adaptive_questionnaire_agent.checkpoint(patient["id"])
+)
+
+@app.post("/conversation/batch", response_model=BatchConversationResponse)
+async def continue_conversation_batch(
+    request: BatchConversationRequest,
+    token: Optional[str] = Query(None),
+    x_api_key: Optional[str] = Header(None)
+):
+    """Answer many (session_id, message) items in one request.
+
+    Kiosks and integrations authenticate with an ``X-API-Key`` and may send
+    items for any patient; with a patient ``token`` only that patient's
+    sessions are accepted. Each item gets its own result or error. The
+    turns, phase moves and PRO answers of the batch are committed in one
+    transaction, except for sessions changed by another request meanwhile:
+    those are rolled back and their items answered with 409.
+    """
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_ITEMS} items per batch")
+    try:
+        patient_id = None
+        if not verify_api_key(x_api_key):
+            user_data = get_current_user(token or "")
+            patient = await db_manager.get_patient_by_email(user_data["email"])
+            if not patient:
+                raise HTTPException(status_code=404, detail="Patient not found")
+            patient_id = patient["id"]
+
+        # Checkpoints are taken synchronously, so the agent must already exist
+        await adaptive_questionnaire_agent.load()
+        return await batch_processor.run(request.items, patient_id=patient_id)
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error continuing conversation: {e}")
+        logger.error(f"Error processing conversation batch: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/conversation/analyze")
+@app.websocket("/ws/conversation")
+async def conversation_socket(websocket: WebSocket, token: str = Query(...), session_id: Optional[str] = None, last_seq: Optional[int] = None):
+    """Conversation over one socket: authenticated once, one frame per turn.
+
+    Without ``session_id`` a new session is started. To resume after a
+    disconnect, reconnect with the ``session_id`` and the last ``seq``
+    received; turns stored since then are replayed before new ones.
+    """
+    try:
+        user_data = get_current_user(token)
+    except HTTPException:
+        await websocket.close(code=CLOSE_POLICY_VIOLATION)
+        return
+    patient = await db_manager.get_patient_by_email(user_data["email"])
+    if not patient:
+        await websocket.close(code=CLOSE_POLICY_VIOLATION)
+        return
+
+    if session_id is None:
+        session_id = (await _start_session(patient))["session_id"]
+        last_seq = 0
+    session = await db_manager.get_conversation_session(session_id)
+    if not session or session["patient_id"] != patient["id"]:
+        await websocket.close(code=CLOSE_POLICY_VIOLATION)
+        return
+
+    # Kept for the life of the connection; turns only append to it
+    history = await db_manager.get_conversation_history(session_id)
+    session["history"] = history
+
+    async def reload_session():
+        """Another request moved the session on: pick up its phase and turns"""
+        stored = await db_manager.get_conversation_session(session_id)
+        if stored:
+            session.update(stored)
+        history[:] = await db_manager.get_conversation_history(session_id)
+        session["history"] = history
+
+    async def take_turn(message: str) -> Dict[str, Any]:
+        try:
+            result = await _answer_in_phase(patient, session, message)
+        except Exception as e:
+            error = _conversation_error(e)
+            if error.status_code == 409:
+                await reload_session()
+            return {"type": "error", "status_code": error.status_code, "detail": error.detail}
+        history.append({"message": message, "response": result["response"], "agent_type": result["agent_type"], "timestamp": datetime.utcnow().isoformat()})
+        return {"type": "turn", "seq": len(history), **result}
+
+    await websocket.accept()
+    socket = ConversationSocket(websocket, take_turn, socket_stats)
+    frames = [{"type": "ready", "session_id": session_id, "seq": len(history), "phase": session["phase"]}]
+    if last_seq is not None:
+        frames += [{"type": "turn", "seq": seq, "session_id": session_id, "response": turn["response"], "agent_type": turn["agent_type"], "message": turn["message"], "replayed": True}
+                   for seq, turn in enumerate(history[last_seq:], start=last_seq + 1)]
+    await socket.run(frames)
+
+@app.get("/ws/stats", response_model=Dict[str, Any])
+async def conversation_socket_stats():
+    """Open conversation sockets and their turn, backpressure and heartbeat counters"""
+    return socket_stats.as_dict()
+
+@app.post("/conversation/analyze", response_model=AnalysisResponse)
 async def analyze_trends(token: str = Query(...)):
     """Analyze patient trends and generate insights"""
     try:
@@ -288,6 +639,7 @@ async def analyze_trends(token: str = Query(...)):
         pro_data = await db_manager.get_patient_pro_data(patient["id"])
 
         # Analyze with trend monitoring agent
+        await trend_monitoring_agent.load()
         analysis = await trend_monitoring_agent.analyze_patient_trends(
             patient=patient,
             pro_data=pro_data
@@ -303,9 +655,13 @@ async def analyze_trends(token: str = Query(...)):
         logger.error(f"Error analyzing trends: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/conversation/complete")
+@app.post("/conversation/complete", response_model=JobAccepted, status_code=202)
 async def complete_conversation(session_id: str, token: str = Query(...)):
-    """Complete a conversation session and generate final insights"""
+    """Complete a conversation session; the final insights are generated by a background job.
+
+    Poll ``/jobs/{job_id}`` or subscribe to ``/jobs/{job_id}/events``; the
+    job's result has the completion message, insights and session summary.
+    """
     try:
         # Verify token and get patient
         user_data = get_current_user(token)
@@ -314,38 +670,197 @@ async def complete_conversation(session_id: str, token: str = Query(...)):
         if not patient:
             raise HTTPException(status_code=404, detail="Patient not found")
 
-        # Get conversation history
-        history = await db_manager.get_conversation_history(session_id)
+        session = await db_manager.get_conversation_session(session_id)
+        if not session or session["patient_id"] != patient["id"]:
+            raise HTTPException(status_code=404, detail="Conversation session not found")
 
-        # Generate final summary and insights
-        final_insights = await trend_monitoring_agent.analyze_patient_trends(
-            patient=patient,
-            pro_data=await db_manager.get_patient_pro_data(patient["id"])
+        # Walk the session through wrap-up to completion
+        phase = SessionPhase(session["phase"])
+        for next_phase in path_to_completion(phase):
+            await db_manager.transition_session_phase(session_id, phase, next_phase)
+            phase = next_phase
+        conversation_context.end_session(session_id)
+
+        job_id = await job_queue.enqueue(
+            "session_completion",
+            {"session_id": session_id, "patient_id": patient["id"], "session_duration": _session_duration_seconds(session)},
+            patient_id=patient["id"],
+            priority=10  # a patient is waiting for it
         )
+        return _job_accepted(job_id, session_id)
 
-        # Generate completion message
-        completion_message = await companion_agent.generate_completion_message(
-            patient=patient,
-            insights=final_insights
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error completing conversation: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _complete_session_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Trend analysis and completion message for a completed session"""
+    patient = await db_manager.get_patient(payload["patient_id"])
+    if not patient:
+        raise PermanentJobError(f"Patient {payload['patient_id']} not found")
+
+    history = await db_manager.get_conversation_history(payload["session_id"])
+
+    # Generate final summary and insights
+    await asyncio.gather(trend_monitoring_agent.load(), companion_agent.load())
+    final_insights = await trend_monitoring_agent.analyze_patient_trends(
+        patient=patient,
+        pro_data=await db_manager.get_patient_pro_data(patient["id"])
+    )
+
+    # Generate completion message
+    completion_message = await companion_agent.generate_completion_message(
+        patient=patient,
+        insights=final_insights
+    )
+
+    return CompletionResponse(
+        session_id=payload["session_id"],
+        completion_message=completion_message,
+        insights=final_insights,
+        session_summary={
+            "total_interactions": len(history),
+            "session_duration": payload.get("session_duration"),
+            "key_findings": final_insights.get("recommendations", [])
+        }
+    ).model_dump(mode="json")
+
+job_queue.register("session_completion", _complete_session_job)
+
+@app.post("/emotions/backfill", response_model=JobAccepted, status_code=202)
+async def backfill_emotional_states(batch_size: int = Query(5000, ge=1, le=50000), x_api_key: Optional[str] = Header(None)):
+    """Classify stored patient messages that have no emotional state yet, in a background job.
+
+    Integrations only; follow the job at ``/jobs/{job_id}``. Its result has
+    the number of messages classified.
+    """
+    if not verify_api_key(x_api_key):
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    job_id = await job_queue.enqueue("emotion_backfill", {"batch_size": batch_size})
+    return _job_accepted(job_id)
+
+async def _backfill_emotional_states_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Already classified messages are skipped, so a retried run picks up where it stopped"""
+    await companion_agent.load()
+    classified = await companion_agent.backfill_emotional_states(payload.get("batch_size", 5000))
+    return {"classified": classified}
+
+job_queue.register("emotion_backfill", _backfill_emotional_states_job)
+
+def _session_duration_seconds(session: Dict[str, Any]) -> Optional[float]:
+    """Seconds between session start and now"""
+    try:
+        started_at = datetime.fromisoformat(str(session["started_at"]))
+        return round((datetime.utcnow() - started_at).total_seconds(), 1)
+    except (TypeError, ValueError):
+        return None
+
+def _job_accepted(job_id: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "session_id": session_id,
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events"
+    }
+
+async def _authorized_job(job_id: str, token: Optional[str], api_key: Optional[str]) -> Dict[str, Any]:
+    """The job, if the caller is an integration or the patient it belongs to"""
+    job = await job_queue.get(job_id)
+    if job and not verify_api_key(api_key):
+        user_data = get_current_user(token or "")
+        patient = await db_manager.get_patient_by_email(user_data["email"])
+        if not patient or job["patient_id"] != patient["id"]:
+            job = None
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/stats", response_model=Dict[str, Any])
+async def job_queue_stats():
+    """Jobs per status and this process's worker counters"""
+    return await job_queue.stats()
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, token: Optional[str] = Query(None), x_api_key: Optional[str] = Header(None)):
+    """Status of a background job, with its result once it has succeeded"""
+    return await _authorized_job(job_id, token, x_api_key)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, token: Optional[str] = Query(None), x_api_key: Optional[str] = Header(None)):
+    """Server-Sent Events: one ``job`` event per status change, the last one when it finishes"""
+    await _authorized_job(job_id, token, x_api_key)
+
+    async def events():
+        async for job in job_queue.watch(job_id):
+            yield sse_event("job", JobStatus(**job).model_dump(mode="json"))
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.post("/checkins/schedule", response_model=CheckInScheduleResponse)
+async def schedule_check_in(request: CheckInScheduleRequest, token: str = Query(...)):
+    """Create or update the patient's recurring check-in schedule"""
+    try:
+        user_data = get_current_user(token)
+        patient = await db_manager.get_patient_by_email(user_data["email"])
+
+        if not patient:
+            raise HTTPException(status_code=404, detail="Patient not found")
+
+        await companion_agent.load()
+        next_run_at = await companion_agent.schedule_check_in(
+            patient["id"],
+            frequency=request.frequency,
+            preferred_time=request.preferred_time,
+            active=request.active
         )
+        checkin_scheduler.notify(patient["id"], next_run_at)
 
         return {
-            "session_id": session_id,
-            "completion_message": completion_message,
-            "insights": final_insights,
-            "session_summary": {
-                "total_interactions": len(history),
-                "session_duration": "calculated_duration",
-                "key_findings": final_insights.get("recommendations", [])
-            }
+            "patient_id": patient["id"],
+            "frequency": request.frequency,
+            "preferred_time": request.preferred_time,
+            "active": request.active,
+            "next_run_at": next_run_at
         }
 
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error completing conversation: {e}")
+        logger.error(f"Error scheduling check-in: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/checkins/stats", response_model=Dict[str, Any])
+async def check_in_stats():
+    """Scheduler queue depth and dispatch counts"""
+    return checkin_scheduler.stats()
+
+@app.get("/conversation/context/stats", response_model=Dict[str, Any])
+async def conversation_context_stats():
+    """Prompt tokens before and after compacting long conversation histories"""
+    return conversation_context.stats()
+
+@app.get("/sessions/phase-stats", response_model=Dict[str, Any])
+async def session_phase_stats():
+    """Latency per session phase and where open sessions are waiting"""
+    try:
+        return await db_manager.get_phase_statistics()
+
+    except Exception as e:
+        logger.error(f"Error getting session phase statistics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 200 once the agents are built, 503 while warming up"""
+    return ORJSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+
 # Health check endpoint
-@app.get("/health")
+@app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
     return {
@@ -358,6 +873,11 @@ async def health_check():
         }
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Latency histograms, in-flight gauges and cache hit ratios in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,76 @@
+import pytest
+
+from utils.adaptive_testing import AdaptiveTestingEngine, ITEM_CALIBRATION, build_item_bank
+from utils.pro_extraction import default_extractor
+from utils.question_catalog import QuestionCatalog
+
+ENGINE = AdaptiveTestingEngine(ITEM_CALIBRATION)
+
+
+def _score(condition, item_id, message):
+    extracted = default_extractor.extract(message).as_dict()
+    return ENGINE.score_response(condition, item_id, message, extracted)
+
+
+@pytest.mark.parametrize("message, score", [
+    ("Yes, I did not miss any", 0),
+    ("I never forgot a dose", 0),
+    ("Yes", 0),
+    ("Yes, I took my medication", 0),
+    ("No", 1),
+    ("No, I missed my meds yesterday", 1),
+    ("I don't take my pills anymore", 1),
+])
+def test_adherence_polarity(message, score):
+    assert _score("diabetes", ("medication", "boolean"), message) == score
+
+
+@pytest.mark.parametrize("message, score", [
+    ("No", 0),
+    ("Nope, I'm fine", 0),
+    ("None", 0),
+    ("No symptoms today", 0),
+    ("Yes, headaches", 1),
+    ("No, but I have a headache", 1),
+    ("Dizziness and blurred vision", 1),
+])
+def test_symptom_polarity(message, score):
+    assert _score("hypertension", ("symptoms", "multiple_choice"), message) == score
+
+
+def test_item_bank_follows_the_catalog():
+    catalog = QuestionCatalog({
+        "diabetes": {
+            "blood_sugar": {"numeric": "Blood sugar?"},
+            "medication": {"boolean": "Did you take it?"},
+            "exercise": {"text": "Did you exercise?"},
+        }
+    })
+    item_bank = build_item_bank(catalog)
+    assert set(item_bank) == {"diabetes"}
+    # Calibrated items the catalog lacks are dropped; uncalibrated items
+    # get category defaults or are left out
+    assert set(item_bank["diabetes"]) == {"blood_sugar", "medication"}
+    assert item_bank["diabetes"]["blood_sugar"].response_types == ("numeric",)
+    assert item_bank["diabetes"]["medication"].response_types == ("boolean",)
+
+
+@pytest.mark.parametrize("condition", sorted(ITEM_CALIBRATION))
+def test_each_category_is_asked_once(condition):
+    session = ENGINE.start_session(condition)
+    asked = []
+    while (item_id := ENGINE.select_next_item(session)) is not None:
+        asked.append(item_id)
+        ENGINE.record_response(session, item_id, 1)
+    categories = [category for category, _ in asked]
+    assert len(categories) == len(set(categories))
+
+
+def test_low_comprehension_gets_the_text_form():
+    session = ENGINE.start_session("diabetes")
+    asked = set()
+    while (item_id := ENGINE.select_next_item(session, ("text", "boolean"))) is not None:
+        asked.add(item_id)
+        ENGINE.record_response(session, item_id, 0)
+    assert ("blood_sugar", "text") in asked
+    assert ("blood_sugar", "numeric") not in asked
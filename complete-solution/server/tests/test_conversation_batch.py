@@ -0,0 +1,64 @@
+import asyncio
+
+from fastapi import HTTPException
+
+from utils.conversation_batch import ConversationBatchProcessor
+from utils.models import BatchConversationItem
+
+
+class FakeDatabase:
+    """Two sessions of one patient; writes to ``conflicting`` are rejected"""
+
+    def __init__(self, conflicting=()):
+        self.conflicting = set(conflicting)
+        self.stored = {}
+
+    async def get_conversation_sessions(self, session_ids):
+        return {session_id: {"id": session_id, "patient_id": 1} for session_id in session_ids}
+
+    async def get_patients(self, patient_ids):
+        return {patient_id: {"id": patient_id} for patient_id in patient_ids}
+
+    async def get_conversation_histories(self, session_ids):
+        return {session_id: [] for session_id in session_ids}
+
+    async def store_conversation_writes(self, writes):
+        self.stored = {session_id: w for session_id, w in writes.items() if session_id not in self.conflicting}
+        return {session_id: "Session phase changed" for session_id in writes if session_id in self.conflicting}
+
+
+def _run(db, messages):
+    """Answer (session_id, message) pairs; each turn appends to the patient's state"""
+    state = {1: []}
+    checkpoints = []
+
+    async def take_turn(patient, session, message):
+        state[patient["id"]].append(message)
+        session["writes"].append(("interaction", patient["id"], message, "ok", "companion"))
+        return {"response": "ok", "agent_type": "companion"}
+
+    def checkpoint(patient):
+        checkpoints.append(patient["id"])
+        saved = list(state[patient["id"]])
+        return lambda: state.__setitem__(patient["id"], saved)
+
+    processor = ConversationBatchProcessor(db, take_turn, lambda e: HTTPException(500, str(e)),
+                                           checkpoint=checkpoint)
+    items = [BatchConversationItem(session_id=session_id, message=message) for session_id, message in messages]
+    return asyncio.run(processor.run(items)), state, checkpoints
+
+
+MESSAGES = [("a", "first"), ("b", "second"), ("a", "third")]
+
+
+def test_patient_is_checkpointed_once_across_sessions():
+    result, state, checkpoints = _run(FakeDatabase(), MESSAGES)
+    assert result["succeeded"] == 3
+    assert checkpoints == [1]
+    assert state[1] == ["first", "second", "third"]
+
+
+def test_conflict_in_second_session_restores_state_from_before_the_batch():
+    result, state, _ = _run(FakeDatabase(conflicting={"b"}), MESSAGES)
+    assert [r["status_code"] for r in result["results"]] == [200, 409, 200]
+    assert state[1] == []
@@ -0,0 +1,53 @@
+import pytest
+
+from utils.emotion_classifier import default_classifier
+
+
+@pytest.mark.parametrize("message, emotional_state, urgency_level", [
+    ("I can't sleep, so anxious", "anxious", "medium"),
+    ("No, I feel tired", "fatigued", "medium"),
+    ("No I feel tired", "fatigued", "medium"),
+    ("I'm not tired. Anxious though", "anxious", "medium"),
+    ("not tired but worried", "anxious", "medium"),
+    ("I am so anxious", "anxious", "medium"),
+    ("I feel hopeless", "depressed", "high"),
+])
+def test_negation_stops_at_clause_breaks(message, emotional_state, urgency_level):
+    state = default_classifier.classify(message)
+    assert (state["emotional_state"], state["urgency_level"]) == (emotional_state, urgency_level)
+
+
+@pytest.mark.parametrize("message", ["I am not anxious", "I have no anxiety", "never tired"])
+def test_negated_cue_counts_against_its_emotion(message):
+    distribution = default_classifier.score(message)
+    assert distribution["positive"] > 0
+    assert distribution["anxious"] == distribution["fatigued"] == 0
+
+
+def test_so_after_negator_intensifies():
+    distribution = default_classifier.score("not so good")
+    assert distribution["depressed"] > 0 and distribution["positive"] == 0
+
+
+
+@pytest.mark.parametrize("message", ["not good", "I'm not feeling well", "not great today", "not so good"])
+def test_negated_positive_is_low(message):
+    assert default_classifier.classify(message)["emotional_state"] == "depressed"
+
+
+def test_trend_word_after_symptom_does_not_outweigh_it():
+    state = default_classifier.classify("tired but improving")
+    assert state["emotional_state"] == "fatigued"
+    assert state["key_emotions"] == ["fatigued", "positive"]
+
+
+@pytest.mark.parametrize("message", [
+    "I want to die",
+    "I feel fine but I want to die",
+    "sometimes I think about killing myself",
+    "I don't want to live like this anymore",
+])
+def test_self_harm_is_high_urgency(message):
+    state = default_classifier.classify(message)
+    assert (state["urgency_level"], state["suggested_response_tone"]) == ("high", "gentle")
+    assert default_classifier.classify_batch([message])[0]["urgency_level"] == "high"
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+from utils.pro_extraction import default_extractor
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "pro_extraction_corpus.json")
+
+with open(CORPUS_PATH, encoding="utf-8") as corpus_file:
+    CORPUS = json.load(corpus_file)
+
+
+def _measurements(message):
+    return [[m.name, m.value, m.unit] for m in default_extractor.extract(message).measurements]
+
+
+@pytest.mark.parametrize("example", CORPUS, ids=[example["message"] for example in CORPUS])
+def test_corpus(example):
+    assert _measurements(example["message"]) == example["expected"]
+
+
+@pytest.mark.parametrize("message", [
+    "I don't take my meds anymore",
+    "I never take my pills",
+    "I never really take my pills",
+    "I stopped taking my insulin",
+    "I do not take the tablets",
+])
+def test_negated_adherence_is_missed(message):
+    assert default_extractor.extract(message).as_dict()["medication_adherence"]["value"] == "missed"
+
+
+@pytest.mark.parametrize("message", [
+    "I have not missed my meds",
+    "I haven't missed any doses",
+    "I did not miss my pills",
+    "I never forget to take my insulin",
+])
+def test_negated_missed_dose_is_taken(message):
+    assert default_extractor.extract(message).as_dict()["medication_adherence"]["value"] == "taken"
+
+
+def test_negator_elsewhere_in_clause_keeps_missed():
+    message = "I didn't feel well so I skipped my meds"
+    assert default_extractor.extract(message).as_dict()["medication_adherence"]["value"] == "missed"
+
+
+def test_adherence_without_negator_is_taken():
+    assert default_extractor.extract("Yes, I took my medication").as_dict()["medication_adherence"]["value"] == "taken"
+
+
+@pytest.mark.parametrize("message", [
+    "I ate 2 sugar cookies at 3 pm",
+    "my sugar was 0",
+    "blood sugar 900",
+    "glucose 700 mg/dL",
+    "blood sugar 0.5 mmol/L",
+])
+def test_implausible_blood_sugar_is_ignored(message):
+    assert "blood_sugar" not in default_extractor.extract(message).as_dict()
+
+
+@pytest.mark.parametrize("message, value, unit", [
+    ("Sugar is 95", "95", "mg/dL"),
+    ("my sugar levels were around 6.2 mmol/l", "6.2", "mmol/L"),
+    ("blood glucose 5.4", "5.4", "mmol/L"),
+    ("sugar 180 mg/dL", "180", "mg/dL"),
+])
+def test_blood_sugar_readings(message, value, unit):
+    reading = default_extractor.extract(message).as_dict()["blood_sugar"]
+    assert (reading["value"], reading["unit"]) == (value, unit)
+
+
+@pytest.mark.parametrize("message, value", [
+    ("pain is about 7/10 today", "7"),
+    ("my pain is 3 out of 10", "3"),
+    ("Back pain level 4", "4"),
+    ("the pain is a 6 this morning", "6"),
+    ("pain score: 5", "5"),
+])
+def test_pain_scores(message, value):
+    assert default_extractor.extract(message).as_dict()["pain_level"]["value"] == value
+
+
+@pytest.mark.parametrize("message", [
+    "pain in my 2 knees",
+    "I was in pain since 3 days",
+    "the pain started 2 weeks ago",
+])
+def test_pain_without_scale_cue_is_ignored(message):
+    assert "pain_level" not in default_extractor.extract(message).as_dict()
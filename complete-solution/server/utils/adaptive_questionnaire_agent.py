@@ -1,6 +1,7 @@
 import asyncio
+import copy
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Callable, Optional, List, Tuple
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -9,11 +10,16 @@ import random
 
 from .models import Patient, AgentResponse, ResponseType
 from .database import DatabaseManager
+from .pro_extraction import default_extractor
+from .adaptive_testing import AdaptiveTestingEngine, build_item_bank
+from .question_catalog import QuestionCatalog, QuestionCatalogError, BUILTIN_TRANSLATIONS
+from .metrics import instrumented
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+@instrumented("agent_call", "Agent method", agent="adaptive_questionnaire")
 class AdaptiveQuestionnaireAgent:
     def __init__(self):
         """Initialize the Adaptive Questionnaire Agent with mock responses for testing"""
@@ -100,11 +106,25 @@ class AdaptiveQuestionnaireAgent:
             }
         }
 
+        # Compile the question bank into an immutable pre-rendered index and
+        # the item response theory engine used for adaptive question selection
+        self.reload_question_catalog()
+        catalog_path = os.getenv("QUESTION_CATALOG_PATH")
+        if catalog_path:
+            try:
+                self.reload_question_catalog(catalog_path)
+            except QuestionCatalogError as e:
+                logger.error(f"Error loading question catalog, using built-in questions: {e}")
+
         # Patient comprehension and engagement tracking
         self.patient_states = {}
 
-    async def process_message(self, patient: Dict[str, Any], message: str, session_id: str, history: List[Dict[str, Any]]) -> str:
-        """Process patient message and generate appropriate response"""
+    async def process_message(self, patient: Dict[str, Any], message: str, session_id: str, history: List[Dict[str, Any]], writes: Optional[List[tuple]] = None) -> str:
+        """Process patient message and generate appropriate response.
+
+        With ``writes`` the extracted PRO answers are queued there as
+        ``("pro", ...)`` writes instead of being stored straight away.
+        """
         try:
             # Analyze patient message for comprehension and engagement
             analysis = await self._analyze_patient_response(message, history)
@@ -120,6 +140,9 @@ class AdaptiveQuestionnaireAgent:
                     "last_response_time": datetime.now()
                 }
 
+            # Score the answer to the previous adaptive-testing item
+            self._record_item_response(patient_id, patient, session_id, message, analysis)
+
             # Update state based on analysis
             self._update_patient_state(patient_id, analysis)
 
@@ -127,7 +150,7 @@ class AdaptiveQuestionnaireAgent:
             response = await self._generate_adaptive_response(patient, analysis, history)
 
             # Store PRO data if applicable
-            await self._extract_and_store_pro_data(patient_id, session_id, message, analysis)
+            await self._extract_and_store_pro_data(patient_id, session_id, message, analysis, writes)
 
             return response
 
@@ -138,8 +161,8 @@ class AdaptiveQuestionnaireAgent:
     async def _analyze_patient_response(self, message: str, history: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze patient response for comprehension and engagement"""
         try:
-            # Simple analysis based on message length and keywords
-            message_lower = message.lower()
+            # Single pass over the message for measurements and engagement cues
+            extraction = default_extractor.extract(message)
             message_length = len(message)
 
             # Determine comprehension level
@@ -151,9 +174,9 @@ class AdaptiveQuestionnaireAgent:
                 comprehension_level = "medium"
 
             # Determine engagement level
-            if any(word in message_lower for word in ['yes', 'no', 'ok', 'fine']):
+            if extraction.low_engagement_cues:
                 engagement_level = "low"
-            elif any(word in message_lower for word in ['because', 'since', 'when', 'how']):
+            elif extraction.high_engagement_cues:
                 engagement_level = "high"
             else:
                 engagement_level = "medium"
@@ -166,14 +189,8 @@ class AdaptiveQuestionnaireAgent:
             else:
                 response_quality = "fair"
 
-            # Extract simple data
-            extracted_data = {}
-            if "blood sugar" in message_lower or "glucose" in message_lower:
-                # Try to extract numbers
-                import re
-                numbers = re.findall(r'\d+', message)
-                if numbers:
-                    extracted_data["blood_sugar"] = numbers[0]
+            # Structured PRO values with units
+            extracted_data = extraction.as_dict()
 
             return {
                 "comprehension_level": comprehension_level,
@@ -234,11 +251,14 @@ class AdaptiveQuestionnaireAgent:
             condition = patient.get("condition", "").lower()
 
             # Determine next question based on condition and patient state
-            next_question = await self._select_next_question(condition, state, analysis, history)
+            next_item = await self._select_next_question(condition, state, analysis, history)
+            if next_item is None:
+                return "Thank you, that's all the questions I have for today. Is there anything else you'd like to share?"
+            category, response_type = next_item
 
-            # Adapt question complexity
+            # Look up the question pre-rendered for the patient's complexity and language
             adapted_question = await self._adapt_question_complexity(
-                next_question, state.get("response_complexity", "medium"), patient
+                condition, category, response_type, state.get("response_complexity", "medium"), patient
             )
 
             # Add clarification if needed
@@ -252,72 +272,114 @@ class AdaptiveQuestionnaireAgent:
             logger.error(f"Error generating adaptive response: {e}")
             return "How are you feeling today? Is there anything specific you'd like to share?"
 
-    async def _select_next_question(self, condition: str, state: Dict[str, Any], analysis: Dict[str, Any], history: List[Dict[str, Any]]) -> str:
-        """Select the next appropriate question based on condition and patient state"""
+    async def _select_next_question(self, condition: str, state: Dict[str, Any], analysis: Dict[str, Any], history: List[Dict[str, Any]]) -> Optional[Tuple[str, str]]:
+        """Select the next question category and response type, or None when the questionnaire is done"""
         try:
-            # Get question templates for the condition
-            templates = self.question_templates.get(condition, self.question_templates.get("diabetes"))
+            catalog = self.question_catalog
+
+            # Conditions with an item bank use maximum-information selection
+            cat_session = state.get("cat_session")
+            if cat_session is not None:
+                allowed = ("text", "boolean") if state.get("comprehension_level") == "low" else None
+                item_id = self.testing_engine.select_next_item(cat_session, allowed)
+                state["last_item"] = item_id
+                return item_id
 
             # Determine question category based on history and state
-            question_categories = list(templates.keys())
+            question_categories = catalog.categories(condition)
 
             # Simple logic: cycle through categories
             question_count = state.get("question_count", 0)
-            category_index = question_count % len(question_categories)
-            category = question_categories[category_index]
-
-            # Get question template for this category
-            category_templates = templates[category]
+            category = question_categories[question_count % len(question_categories)]
 
             # Select response type based on patient state
             if state.get("comprehension_level") == "low":
                 response_type = "text"  # Simple text response
             elif state.get("engagement_level") == "high":
-                response_type = random.choice(["scale", "multiple_choice"])  # More engaging
+                response_type = random.choice(("scale", "multiple_choice"))  # More engaging
             else:
-                response_type = random.choice(["text", "numeric", "scale"])
+                response_type = random.choice(("text", "numeric", "scale"))
 
-            # Get the question template
-            if response_type in category_templates:
-                question_template = category_templates[response_type]
-            else:
-                # Fallback to text
-                question_template = category_templates.get("text", "How are you feeling today?")
+            # Fallback to text
+            if response_type not in catalog.response_types(condition, category):
+                response_type = "text"
 
-            return question_template
+            return category, response_type
 
         except Exception as e:
             logger.error(f"Error selecting next question: {e}")
-            return "How are you feeling today?"
+            return "", "text"
 
-    async def _adapt_question_complexity(self, question: str, complexity: str, patient: Dict[str, Any]) -> str:
-        """Adapt question complexity based on patient needs"""
+    async def _adapt_question_complexity(self, condition: str, category: str, response_type: str, complexity: str, patient: Dict[str, Any]) -> str:
+        """Return the question rendered for the patient's complexity level and language"""
         try:
-            accessibility_needs = patient.get('accessibility_needs', '')
-            language = patient.get('preferred_language', 'en')
-
-            if complexity == "simple":
-                # Simplify the question
-                if "scale of 1-10" in question:
-                    return question.replace("scale of 1-10", "scale from 1 to 10")
-                elif "mg/dL" in question:
-                    return question.replace("mg/dL", "milligrams per deciliter")
-                else:
-                    return question
+            language = patient.get('preferred_language') or 'en'
+            question = self.question_catalog.render(condition, category, response_type, language, complexity)
+            return question or "How are you feeling today?"
 
-            elif complexity == "complex":
-                # Add more context
-                if "blood sugar" in question.lower():
-                    return f"{question} (Normal range is typically 80-120 mg/dL)"
-                else:
-                    return question
+        except Exception as e:
+            logger.error(f"Error adapting question complexity: {e}")
+            return "How are you feeling today?"
 
-            else:
-                return question
+    def _record_item_response(self, patient_id: int, patient: Dict[str, Any], session_id: str, message: str, analysis: Dict[str, Any]):
+        """Update the patient's ability estimate with the answer to the last item"""
+        try:
+            state = self.patient_states[patient_id]
+            condition = self.question_catalog.resolve_condition(patient.get("condition", ""))
+
+            # Each conversation session gets a fresh adaptive test
+            if state.get("session_id") != session_id:
+                state["session_id"] = session_id
+                state["last_item"] = None
+                state["cat_session"] = (
+                    self.testing_engine.start_session(condition)
+                    if self.testing_engine.supports(condition) else None
+                )
+                return
+
+            cat_session = state.get("cat_session")
+            item_id = state.get("last_item")
+            if cat_session is None or item_id is None:
+                return
+
+            score = self.testing_engine.score_response(
+                condition, item_id, message, analysis.get("extracted_data", {})
+            )
+            self.testing_engine.record_response(cat_session, item_id, score)
+            state["last_item"] = None
 
         except Exception as e:
-            logger.error(f"Error adapting question complexity: {e}")
-            return question
+            logger.error(f"Error recording item response: {e}")
+
+    def checkpoint(self, patient_id: int) -> Callable[[], None]:
+        """Snapshot a patient's questionnaire state; calling the result restores it"""
+        saved = copy.deepcopy(self.patient_states.get(patient_id))
+
+        def restore():
+            if saved is None:
+                self.patient_states.pop(patient_id, None)
+            else:
+                self.patient_states[patient_id] = saved
+        return restore
+
+    def is_complete(self, patient_id: int) -> bool:
+        """Whether the patient's adaptive questionnaire has reached its stopping rule"""
+        cat_session = self.patient_states.get(patient_id, {}).get("cat_session")
+        return bool(cat_session and cat_session.complete)
+
+    def reload_question_catalog(self, path: Optional[str] = None) -> QuestionCatalog:
+        """Rebuild the question catalog and its item bank and swap them in"""
+        if path:
+            catalog = QuestionCatalog.from_file(path)
+        else:
+            catalog = QuestionCatalog(self.question_templates, translations=BUILTIN_TRANSLATIONS)
+        testing_engine = AdaptiveTestingEngine(build_item_bank(catalog))
+
+        # Readers hold their own reference, so single assignments are the swap
+        self.testing_engine = testing_engine
+        self.question_catalog = catalog
+        logger.info(f"Loaded question catalog {catalog.version} ({len(catalog)} rendered questions)")
+        return catalog
 
     async def _generate_clarification(self, analysis: Dict[str, Any]) -> str:
         """Generate clarification for misunderstood questions"""
@@ -337,19 +399,25 @@ class AdaptiveQuestionnaireAgent:
             logger.error(f"Error generating clarification: {e}")
             return "Let me clarify:"
 
-    async def _extract_and_store_pro_data(self, patient_id: int, session_id: str, message: str, analysis: Dict[str, Any]):
-        """Extract PRO data from patient response and store it"""
+    async def _extract_and_store_pro_data(self, patient_id: int, session_id: str, message: str, analysis: Dict[str, Any], writes: Optional[List[tuple]] = None):
+        """Extract PRO data from patient response and store (or queue) it"""
         try:
             extracted_data = analysis.get("extracted_data", {})
 
-            for key, value in extracted_data.items():
-                if value:  # Only store non-empty values
+            for key, measurement in extracted_data.items():
+                if not measurement.get("value"):  # Only store non-empty values
+                    continue
+                if writes is not None:
+                    writes.append(("pro", patient_id, key, str(measurement["value"]),
+                                   measurement.get("response_type", "text"), measurement.get("unit")))
+                else:
                     await self.db_manager.store_pro_response(
                         patient_id=patient_id,
                         session_id=session_id,
                         question_id=key,
-                        response_value=str(value),
-                        response_type="text"
+                        response_value=str(measurement["value"]),
+                        response_type=measurement.get("response_type", "text"),
+                        unit=measurement.get("unit")
                     )
 
         except Exception as e:
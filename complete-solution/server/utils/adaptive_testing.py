@@ -0,0 +1,301 @@
+import math
+import re
+import logging
+from typing import Dict, Any, Optional, List, NamedTuple, Tuple, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Quadrature grid for the latent symptom burden (higher theta = worse)
+THETA_GRID = tuple(round(-4.0 + 0.1 * i, 1) for i in range(81))
+_LOG_PRIOR = tuple(-0.5 * theta * theta for theta in THETA_GRID)  # standard normal, unnormalised
+
+DEFAULT_SE_TARGET = 0.65
+DEFAULT_MAX_ITEMS = 8
+DEFAULT_MIN_ITEMS = 2
+
+_NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+_YES_PATTERN = re.compile(r"\b(?:yes|yeah|yep|sure|did|took|taken)\b", re.IGNORECASE)
+_NO_PATTERN = re.compile(r"\b(?:no|nope|not|never|didn'?t|missed|forgot|skipped)\b", re.IGNORECASE)
+# "didn't miss any", "never forgot": a negated lapse is an adherent answer
+_NEGATED_LAPSE_PATTERN = re.compile(
+    r"\b(?:not|never|didn'?t|haven'?t|hasn'?t|wasn'?t)\s+(?:\w+\s+)?(?:miss(?:ed)?|forg[eo]t(?:ten)?|skip(?:ped)?)\b",
+    re.IGNORECASE
+)
+_NONE_PATTERN = re.compile(r"\b(?:none|nothing|no\s+(?:new\s+)?symptoms)\b", re.IGNORECASE)
+# A plain negative answer with nothing else in it: "No", "Not really, I'm fine"
+_NEGATIVE_ONLY_PATTERN = re.compile(
+    r"^\W*(?:no|nope|nah|not\s+really|not\s+today|not\s+at\s+all|i\s+don'?t|i\s+do\s+not)\b"
+    r"(?:\W+(?:thanks?|thank\s+you|i'?m\s+(?:fine|good|ok(?:ay)?)|(?:have|feel)\s+any))*\W*$",
+    re.IGNORECASE
+)
+
+
+class ItemParameters(NamedTuple):
+    """2PL parameters and scoring rule for one question category.
+
+    A response is scored 1 when it indicates a problem: a measurement at or
+    beyond ``cutoff`` in the direction given by ``higher_is_worse``, a
+    reported symptom, or a "no" to an adherence question. An item is asked
+    once, in the first of ``response_types`` the patient can handle; every
+    form listed must be scoreable with the same rule.
+    """
+    discrimination: float
+    difficulty: float
+    measure: Optional[str] = None
+    cutoff: Optional[float] = None
+    higher_is_worse: bool = True
+    response_types: Tuple[str, ...] = ("text",)
+
+
+# Item parameters keyed by condition -> category. They are initial expert
+# estimates until they can be calibrated against stored pro_responses;
+# cut-offs follow common clinical thresholds and the 1-10 scales used by the
+# questions. The item bank itself is built from the active question catalog
+# with ``build_item_bank``.
+ITEM_CALIBRATION = {
+    "diabetes": {
+        "blood_sugar": ItemParameters(1.6, 0.4, "blood_sugar", 180, response_types=("numeric", "text")),
+        "symptoms": ItemParameters(1.8, 0.0, "symptoms", response_types=("multiple_choice", "text")),
+        "medication": ItemParameters(1.1, 0.9, "medication_adherence", response_types=("boolean", "text")),
+    },
+    "hypertension": {
+        "blood_pressure": ItemParameters(1.7, 0.3, "systolic_bp", 140, response_types=("numeric", "text")),
+        "symptoms": ItemParameters(1.6, 0.5, "symptoms", response_types=("multiple_choice", "text")),
+        "stress": ItemParameters(1.2, -0.1, "scale_score", 7, response_types=("scale",)),
+    },
+    "depression": {
+        "mood": ItemParameters(2.0, 0.0, "scale_score", 4, higher_is_worse=False, response_types=("scale",)),
+        "energy": ItemParameters(1.5, 0.2, "scale_score", 3, higher_is_worse=False, response_types=("scale",)),
+        "sleep": ItemParameters(1.0, 0.4, "sleep_hours", 5, higher_is_worse=False, response_types=("numeric", "text")),
+        "symptoms": ItemParameters(1.9, -0.3, "symptoms", response_types=("multiple_choice", "text")),
+    },
+    "chronic_pain": {
+        "pain_level": ItemParameters(2.0, 0.1, "scale_score", 7, response_types=("scale",)),
+        "pain_location": ItemParameters(0.8, -0.8, "symptoms", response_types=("multiple_choice", "text")),
+        "pain_impact": ItemParameters(1.8, 0.4, "scale_score", 8, response_types=("scale",)),
+    },
+}
+
+
+# Catalog categories without calibrated parameters; only categories whose
+# scoring direction is unambiguous get defaults
+DEFAULT_PARAMETERS = {
+    "symptoms": ItemParameters(1.0, 0.0, "symptoms", response_types=("multiple_choice", "text")),
+    "pain_location": ItemParameters(0.6, -0.8, "symptoms", response_types=("multiple_choice", "text")),
+    "medication": ItemParameters(1.0, 0.9, "medication_adherence", response_types=("boolean", "text")),
+}
+
+ItemBank = Dict[str, Dict[str, ItemParameters]]
+
+
+def build_item_bank(catalog, calibration: ItemBank = ITEM_CALIBRATION) -> ItemBank:
+    """Item bank for the questions a catalog actually contains.
+
+    One item per category, with calibrated parameters where they exist and
+    the category defaults otherwise, asked in the response types the
+    catalog offers. Categories with neither, or with none of the item's
+    response types, are left to the category rotation.
+    """
+    item_bank = {}
+    for condition in catalog.conditions():
+        items = {}
+        for category in catalog.categories(condition):
+            params = calibration.get(condition, {}).get(category) or DEFAULT_PARAMETERS.get(category)
+            available = catalog.response_types(condition, category)
+            forms = tuple(form for form in params.response_types if form in available) if params else ()
+            if not forms:
+                logger.debug(f"No item parameters for {condition}.{category}")
+                continue
+            items[category] = params._replace(response_types=forms)
+        if items:
+            item_bank[condition] = items
+    return item_bank
+
+
+def _logistic(x: float) -> float:
+    if x >= 0:
+        return 1.0 / (1.0 + math.exp(-x))
+    z = math.exp(x)
+    return z / (1.0 + z)
+
+
+class ItemTables(NamedTuple):
+    """Per-item rows precomputed over the theta grid"""
+    log_p: Tuple[float, ...]
+    log_q: Tuple[float, ...]
+    information: Tuple[float, ...]
+
+
+class CATSession:
+    """Running ability estimate for one patient's questionnaire"""
+
+    def __init__(self, condition: str):
+        self.condition = condition
+        self.log_posterior = list(_LOG_PRIOR)
+        self.administered: List[str] = []  # categories
+        self.responses: List[Optional[int]] = []
+        self.theta = 0.0
+        self.standard_error = 1.0
+        self.complete = False
+
+    @property
+    def items_answered(self) -> int:
+        return len(self.administered)
+
+
+class AdaptiveTestingEngine:
+    """Maximum-information item selection over a precomputed 2PL item bank"""
+
+    def __init__(self, item_bank: ItemBank, se_target: float = DEFAULT_SE_TARGET, max_items: int = DEFAULT_MAX_ITEMS, min_items: int = DEFAULT_MIN_ITEMS):
+        self.item_bank = item_bank
+        self.se_target = se_target
+        self.max_items = max_items
+        self.min_items = min_items
+
+        self._tables: Dict[str, Dict[str, ItemTables]] = {}
+        self._rankings: Dict[str, Tuple[Tuple[str, ...], ...]] = {}
+
+        for condition, items in item_bank.items():
+            tables = {}
+            for category, params in items.items():
+                p = [_logistic(params.discrimination * (theta - params.difficulty)) for theta in THETA_GRID]
+                tables[category] = ItemTables(
+                    log_p=tuple(math.log(max(value, 1e-12)) for value in p),
+                    log_q=tuple(math.log(max(1.0 - value, 1e-12)) for value in p),
+                    information=tuple(params.discrimination ** 2 * value * (1.0 - value) for value in p)
+                )
+            self._tables[condition] = tables
+
+            # For every grid point, items ordered by information (best first)
+            self._rankings[condition] = tuple(
+                tuple(sorted(tables, key=lambda category: -tables[category].information[index]))
+                for index in range(len(THETA_GRID))
+            )
+
+    def supports(self, condition: str) -> bool:
+        return condition in self._tables
+
+    def start_session(self, condition: str) -> CATSession:
+        return CATSession(condition)
+
+    def _grid_index(self, theta: float) -> int:
+        index = int(round((theta - THETA_GRID[0]) * 10))
+        return min(max(index, 0), len(THETA_GRID) - 1)
+
+    def select_next_item(self, session: CATSession, allowed_response_types: Optional[Iterable[str]] = None) -> Optional[Tuple[str, str]]:
+        """Pick the unasked item with the most information at the current estimate.
+
+        Returns ``(category, response_type)``: the item's first response type
+        in ``allowed_response_types``, or its preferred one if none is.
+        """
+        if session.complete or not self.supports(session.condition):
+            return None
+
+        if self.should_stop(session):
+            session.complete = True
+            return None
+
+        ranking = self._rankings[session.condition][self._grid_index(session.theta)]
+        items = self.item_bank[session.condition]
+        administered = set(session.administered)
+        allowed = set(allowed_response_types) if allowed_response_types else None
+
+        fallback = None
+        for category in ranking:
+            if category in administered:
+                continue
+            forms = items[category].response_types
+            form = next((form for form in forms if allowed is None or form in allowed), None)
+            if form is not None:
+                return category, form
+            if fallback is None:
+                fallback = (category, forms[0])
+
+        if fallback is None:
+            session.complete = True
+        return fallback
+
+    def should_stop(self, session: CATSession) -> bool:
+        """Stopping rule on the standard error of the ability estimate"""
+        answered = session.items_answered
+        if answered >= min(self.max_items, len(self._tables.get(session.condition, ()))):
+            return True
+        return answered >= self.min_items and session.standard_error <= self.se_target
+
+    def record_response(self, session: CATSession, item_id: Tuple[str, str], score: Optional[int]):
+        """Update the posterior over the grid with one scored response"""
+        category = item_id[0]
+        session.administered.append(category)
+        session.responses.append(score)
+
+        tables = self._tables.get(session.condition, {}).get(category)
+        if tables is None or score is None:
+            return
+
+        row = tables.log_p if score else tables.log_q
+        session.log_posterior = [prior + likelihood for prior, likelihood in zip(session.log_posterior, row)]
+        self._update_estimate(session)
+
+    def _update_estimate(self, session: CATSession):
+        """Expected a posteriori estimate and posterior standard deviation"""
+        peak = max(session.log_posterior)
+        weights = [math.exp(value - peak) for value in session.log_posterior]
+        total = sum(weights)
+        mean = sum(w * theta for w, theta in zip(weights, THETA_GRID)) / total
+        variance = sum(w * (theta - mean) ** 2 for w, theta in zip(weights, THETA_GRID)) / total
+        session.theta = mean
+        session.standard_error = math.sqrt(variance)
+
+    def score_response(self, condition: str, item_id: Tuple[str, str], message: str, extracted_data: Dict[str, Any]) -> Optional[int]:
+        """Dichotomise a free-text answer for an item, or None if it can't be scored"""
+        params = self.item_bank.get(condition, {}).get(item_id[0])
+        if params is None:
+            return None
+
+        message = message or ""
+        if params.measure == "symptoms":
+            # The problem is present unless the answer denies it
+            if _NONE_PATTERN.search(message) or _NEGATIVE_ONLY_PATTERN.match(message):
+                return 0
+            return 1
+
+        if params.measure == "medication_adherence":
+            # Yes is the good answer; "didn't miss any" is a yes, not a "not"
+            if _NEGATED_LAPSE_PATTERN.search(message):
+                return 0
+            adherence = extracted_data.get("medication_adherence", {}).get("value")
+            if adherence:
+                return 1 if adherence == "missed" else 0
+            if _NO_PATTERN.search(message):
+                return 1
+            return 0 if _YES_PATTERN.search(message) else None
+
+        value = None
+        measurement = extracted_data.get(params.measure)
+        if measurement is None and params.measure == "systolic_bp" and "blood_pressure" in extracted_data:
+            measurement = {"value": extracted_data["blood_pressure"]["value"].split("/")[0]}
+        if measurement is not None:
+            value = measurement.get("value")
+            if measurement.get("unit") == "mmol/L":
+                value = float(value) * 18.0  # cut-offs are in mg/dL
+        else:
+            number = _NUMBER_PATTERN.search(message or "")
+            value = number.group() if number else None
+
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+
+        if params.higher_is_worse:
+            return 1 if value >= params.cutoff else 0
+        return 1 if value <= params.cutoff else 0
+
+    def summary(self, session: CATSession) -> Dict[str, Any]:
+        return {
+            "theta": round(session.theta, 3),
+            "standard_error": round(session.standard_error, 3),
+            "items_answered": session.items_answered,
+            "complete": session.complete
+        }
+
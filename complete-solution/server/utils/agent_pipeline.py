@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Any, Optional, List, Callable, Awaitable, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STEP_TIMEOUT = float(os.getenv("AGENT_STEP_TIMEOUT_SECONDS", "10"))
+
+
+class PipelineStep(NamedTuple):
+    """One independent unit of work in a conversation turn.
+
+    ``required`` steps re-raise their failure once every step has finished;
+    optional steps degrade to ``fallback``. Required steps only time out if
+    they set ``timeout``: a timeout can't stop a write running in a worker
+    thread, so the turn could commit after being reported as failed.
+    """
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    timeout: Optional[float] = None
+    fallback: Any = None
+    required: bool = False
+
+
+class StepResult(NamedTuple):
+    name: str
+    value: Any
+    status: str  # ok, timeout, error
+    elapsed_ms: float
+    error: Optional[BaseException] = None
+
+
+class PipelineStepError(RuntimeError):
+    """Raised when a required pipeline step fails or times out"""
+
+    def __init__(self, result: StepResult):
+        super().__init__(f"Pipeline step '{result.name}' failed with {result.status}: {result.error}")
+        self.result = result
+
+
+class PipelineResult:
+    """Values and timings of a pipeline run"""
+
+    def __init__(self, results: Dict[str, StepResult], elapsed_ms: float):
+        self.results = results
+        self.elapsed_ms = elapsed_ms
+
+    def __getitem__(self, name: str) -> Any:
+        return self.results[name].value
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        return {name: round(result.elapsed_ms, 2) for name, result in self.results.items()}
+
+    @property
+    def critical_step(self) -> Optional[str]:
+        """The slowest step, which bounds the latency of the run"""
+        if not self.results:
+            return None
+        return max(self.results.values(), key=lambda result: result.elapsed_ms).name
+
+    @property
+    def degraded(self) -> List[str]:
+        return [name for name, result in self.results.items() if result.status != "ok"]
+
+
+class AgentPipeline:
+    """Runs independent agent and database steps of a turn concurrently.
+
+    Steps only overlap while they await: database work has to run off the
+    event loop (``asyncio.to_thread``) for its time to be hidden.
+    """
+
+    def __init__(self, default_timeout: float = DEFAULT_STEP_TIMEOUT):
+        self.default_timeout = default_timeout
+
+    async def _run_step(self, step: PipelineStep) -> StepResult:
+        start = time.perf_counter()
+        timeout = step.timeout
+        if timeout is None and not step.required:
+            timeout = self.default_timeout
+        try:
+            value = await asyncio.wait_for(step.run(), timeout=timeout)
+            return StepResult(step.name, value, "ok", (time.perf_counter() - start) * 1000)
+        except asyncio.TimeoutError as e:
+            logger.error(f"Pipeline step {step.name} timed out after {timeout}s")
+            return StepResult(step.name, step.fallback, "timeout", (time.perf_counter() - start) * 1000, e)
+        except Exception as e:
+            logger.error(f"Pipeline step {step.name} failed: {e}")
+            return StepResult(step.name, step.fallback, "error", (time.perf_counter() - start) * 1000, e)
+
+    async def run(self, steps: List[PipelineStep]) -> PipelineResult:
+        """Run all steps concurrently and collect their results"""
+        start = time.perf_counter()
+
+        # Steps never raise, so one failure can't cancel or hide its siblings
+        step_results = await asyncio.gather(*(self._run_step(step) for step in steps))
+
+        results = {result.name: result for result in step_results}
+        pipeline_result = PipelineResult(results, (time.perf_counter() - start) * 1000)
+
+        for step in steps:
+            result = results[step.name]
+            if step.required and result.status != "ok":
+                raise PipelineStepError(result)
+
+        return pipeline_result
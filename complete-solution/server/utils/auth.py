@@ -1,4 +1,5 @@
 import hashlib
+import hmac
 import os
 from datetime import datetime, timedelta
 from typing import Optional
@@ -8,6 +9,9 @@ import json
 # Simple token storage (in production, use Redis or database)
 tokens = {}
 
+# Keys for kiosks and partner integrations acting on behalf of many patients
+INTEGRATION_API_KEYS = [key.strip() for key in os.getenv("INTEGRATION_API_KEYS", "").split(",") if key.strip()]
+
 def create_simple_token(email: str, date_of_birth: str) -> str:
     """Create a simple token based on email and date of birth"""
     token_data = f"{email}:{date_of_birth}:{datetime.now().timestamp()}"
@@ -40,4 +44,10 @@ def get_current_user(token: str):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token"
         )
-    return user_data
\ No newline at end of file
+    return user_data
+
+def verify_api_key(api_key: Optional[str]) -> bool:
+    """Check an integration API key without leaking timing information"""
+    if not api_key:
+        return False
+    return any(hmac.compare_digest(api_key, key) for key in INTEGRATION_API_KEYS)
@@ -0,0 +1,204 @@
+import asyncio
+import heapq
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Tuple
+
+from .database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+FREQUENCY_INTERVALS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(days=7),
+    "monthly": timedelta(days=30),
+}
+
+
+def parse_preferred_time(preferred_time: str) -> Tuple[int, int]:
+    """Parse an HH:MM preferred check-in time"""
+    try:
+        hour, minute = (int(part) for part in preferred_time.split(":"))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Preferred time must be HH:MM, got {preferred_time!r}")
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Preferred time out of range: {preferred_time!r}")
+    return hour, minute
+
+
+def first_run_time(frequency: str, preferred_time: str, now: datetime) -> datetime:
+    """First preferred time (UTC) one period from ``now``.
+
+    A daily schedule first runs at the next preferred time, a weekly one at
+    the preferred time six to seven days out, and so on.
+    """
+    if frequency not in FREQUENCY_INTERVALS:
+        raise ValueError(f"Unknown check-in frequency {frequency!r}")
+    hour, minute = parse_preferred_time(preferred_time)
+    earliest = now + FREQUENCY_INTERVALS[frequency] - timedelta(days=1)
+    candidate = earliest.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= earliest:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def following_run_time(frequency: str, previous_run: datetime, now: datetime) -> datetime:
+    """Run after ``previous_run``; missed runs during downtime are skipped, not replayed"""
+    interval = FREQUENCY_INTERVALS.get(frequency, FREQUENCY_INTERVALS["daily"])
+    next_run = previous_run + interval
+    if next_run <= now:
+        missed = (now - next_run) // interval + 1
+        next_run += interval * missed
+    return next_run
+
+
+class CheckInScheduler:
+    """Heap scheduler for persisted check-in schedules.
+
+    Only schedules due within ``horizon`` (capped at ``max_loaded`` rows) are
+    held in memory, the loop sleeps until the earliest of them is due, and
+    due check-ins are handed to a bounded worker pool. Check-ins that share
+    a preferred time are spread by adding random jitter to the time they
+    leave the heap, so no worker sits idle waiting out the jitter.
+    Because ``next_run_at`` lives in the database, a restart picks up where
+    the previous process stopped. Every process that loads a due check-in
+    tries to claim it by moving ``next_run_at`` on with a compare-and-set;
+    only the one that succeeds dispatches it.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, dispatch: Callable[[int], Awaitable[Any]], workers: int = 8, queue_size: int = 1000, jitter_seconds: float = 60.0, horizon: timedelta = timedelta(minutes=10), max_loaded: int = 10000):
+        self.db_manager = db_manager
+        self.dispatch = dispatch
+        self.worker_count = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.jitter_seconds = jitter_seconds
+        self.horizon = horizon
+        self.max_loaded = max_loaded
+
+        self._heap: List[Tuple[datetime, int, datetime]] = []  # (fire at, patient_id, due)
+        self._entries: Dict[int, datetime] = {}  # patient_id -> due time, queued or in flight
+        self._loaded_until = datetime.min
+        self._truncated = False
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.dispatched = 0
+        self.failed = 0
+
+    async def start(self):
+        """Start the scheduling loop and the worker pool"""
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._run_loop()))
+        for index in range(self.worker_count):
+            self._tasks.append(asyncio.create_task(self._worker(index)))
+        logger.info(f"Check-in scheduler started with {self.worker_count} workers")
+
+    async def stop(self):
+        """Cancel the loop and workers; undispatched check-ins stay due in the database"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self, patient_id: int, next_run_at: Optional[datetime]):
+        """Make the scheduler aware of a new or changed schedule"""
+        # Any heap entry for the old time is now stale and will be skipped
+        if next_run_at is None or next_run_at >= self._loaded_until:
+            # Beyond the loaded horizon: a later refill picks it up
+            self._entries.pop(patient_id, None)
+        else:
+            self._push(patient_id, next_run_at)
+        self._wakeup.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": len(self._heap),
+            "queued": self.queue.qsize(),
+            "dispatched": self.dispatched,
+            "failed": self.failed,
+            "loaded_until": self._loaded_until.isoformat() if self._loaded_until != datetime.min else None
+        }
+
+    def _push(self, patient_id: int, due: datetime):
+        self._entries[patient_id] = due
+        fire_at = due + timedelta(seconds=random.uniform(0, self.jitter_seconds))
+        heapq.heappush(self._heap, (fire_at, patient_id, due))
+
+    async def _refill(self, now: datetime):
+        """Load schedules due within the horizon that aren't already tracked"""
+        until = now + self.horizon
+        rows = await self.db_manager.get_due_checkin_schedules(until, self.max_loaded)
+        for row in rows:
+            if row["patient_id"] not in self._entries:
+                self._push(row["patient_id"], row["next_run_at"])
+
+        self._truncated = len(rows) >= self.max_loaded
+        self._loaded_until = rows[-1]["next_run_at"] if self._truncated else until
+
+    async def _claim(self, patient_id: int, due: datetime) -> Optional[datetime]:
+        """Claim the run at ``due`` by persisting the one after it.
+
+        Returns the next run time, or None if the schedule changed, was
+        deactivated or was claimed by another worker meanwhile.
+        """
+        schedule = await self.db_manager.get_checkin_schedule(patient_id)
+        if not schedule or not schedule["active"] or schedule["next_run_at"] != due:
+            return None
+        now = datetime.utcnow()
+        next_run_at = following_run_time(schedule["frequency"], due, now)
+        updated = await self.db_manager.reschedule_checkin(patient_id, due, next_run_at, now)
+        return next_run_at if updated else None
+
+    async def _run_loop(self):
+        while True:
+            try:
+                now = datetime.utcnow()
+                if now >= self._loaded_until or (self._truncated and len(self._heap) < self.max_loaded // 2):
+                    await self._refill(now)
+
+                while self._heap and self._heap[0][0] <= now:
+                    _, patient_id, due = heapq.heappop(self._heap)
+                    if self._entries.get(patient_id) != due:
+                        continue  # superseded by a newer schedule
+                    # Blocks when the workers fall behind
+                    await self.queue.put((patient_id, due))
+
+                next_wake = self._loaded_until
+                if self._heap:
+                    next_wake = min(next_wake, self._heap[0][0])
+                delay = max((next_wake - datetime.utcnow()).total_seconds(), 0.05)
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in check-in scheduler loop: {e}")
+                await asyncio.sleep(5)
+
+    async def _worker(self, index: int):
+        while True:
+            patient_id, due = await self.queue.get()
+            try:
+                next_run_at = await self._claim(patient_id, due)
+                if self._entries.get(patient_id) == due:
+                    del self._entries[patient_id]
+                    if next_run_at is not None:
+                        self.notify(patient_id, next_run_at)
+                if next_run_at is None:
+                    continue  # claimed elsewhere, changed or deactivated
+
+                await self.dispatch(patient_id)
+                self.dispatched += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Error dispatching check-in for patient {patient_id}: {e}")
+            finally:
+                self.queue.task_done()
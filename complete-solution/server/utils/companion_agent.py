@@ -9,15 +9,20 @@ import random
 
 from .models import Patient, AgentResponse, CheckInSchedule
 from .database import DatabaseManager
+from .emotion_classifier import default_classifier
+from .checkin_scheduler import first_run_time
+from .metrics import instrumented
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+@instrumented("agent_call", "Agent method", agent="companion")
 class CompanionAgent:
     def __init__(self):
         """Initialize the Companion Agent with mock responses for testing"""
         self.db_manager = DatabaseManager()
+        self.emotion_classifier = default_classifier
 
         # Agent personality and capabilities
         self.system_prompt = """
@@ -113,32 +118,8 @@ class CompanionAgent:
     async def detect_emotional_state(self, message: str) -> Dict[str, Any]:
         """Detect emotional state from patient message"""
         try:
-            # Simple keyword-based emotional analysis
-            message_lower = message.lower()
-
-            if any(word in message_lower for word in ['tired', 'exhausted', 'fatigue', 'drained']):
-                emotional_state = "fatigued"
-                urgency_level = "medium"
-            elif any(word in message_lower for word in ['anxious', 'worried', 'stressed', 'nervous']):
-                emotional_state = "anxious"
-                urgency_level = "medium"
-            elif any(word in message_lower for word in ['sad', 'depressed', 'down', 'hopeless']):
-                emotional_state = "depressed"
-                urgency_level = "high"
-            elif any(word in message_lower for word in ['good', 'great', 'better', 'improving']):
-                emotional_state = "positive"
-                urgency_level = "low"
-            else:
-                emotional_state = "neutral"
-                urgency_level = "low"
-
-            return {
-                "emotional_state": emotional_state,
-                "confidence_score": 0.7,
-                "key_emotions": [emotional_state],
-                "urgency_level": urgency_level,
-                "suggested_response_tone": "supportive"
-            }
+            # Weighted lexicon scoring over every emotion, with negation handling
+            return self.emotion_classifier.classify(message)
 
         except Exception as e:
             logger.error(f"Error detecting emotional state: {e}")
@@ -150,6 +131,22 @@ class CompanionAgent:
                 "suggested_response_tone": "supportive"
             }
 
+    async def backfill_emotional_states(self, batch_size: int = 5000) -> int:
+        """Classify stored patient messages that have no emotional state yet"""
+        try:
+            classified = 0
+            async for batch in self.db_manager.iter_unclassified_interactions(batch_size):
+                states = self.emotion_classifier.classify_batch(row["message"] for row in batch)
+                await self.db_manager.store_emotional_states(batch, states)
+                classified += len(batch)
+
+            logger.info(f"Backfilled emotional states for {classified} messages")
+            return classified
+
+        except Exception as e:
+            logger.error(f"Error backfilling emotional states: {e}")
+            raise
+
     async def generate_follow_up(self, patient: Dict[str, Any], emotional_state: Dict[str, Any]) -> str:
         """Generate appropriate follow-up based on emotional state"""
         try:
@@ -169,21 +166,24 @@ class CompanionAgent:
             logger.error(f"Error generating follow-up: {e}")
             return "I understand. How can I best support you right now?"
 
-    async def schedule_check_in(self, patient_id: int):
-        """Schedule a check-in for a patient"""
+    async def schedule_check_in(self, patient_id: int, frequency: str = "daily", preferred_time: str = "09:00", active: bool = True) -> Optional[datetime]:
+        """Persist a recurring check-in schedule and return its next run time (UTC)"""
         try:
-            # This would integrate with a scheduling system
-            # For now, we'll just log the scheduled check-in
-            logger.info(f"Scheduled check-in for patient {patient_id}")
-
-            # In a real implementation, this would:
-            # 1. Check patient preferences for timing
-            # 2. Schedule the check-in
-            # 3. Send notifications
-            # 4. Track check-in completion rates
+            next_run_at = first_run_time(frequency, preferred_time, datetime.utcnow()) if active else None
+
+            await self.db_manager.upsert_checkin_schedule(
+                patient_id=patient_id,
+                frequency=frequency,
+                preferred_time=preferred_time,
+                active=active,
+                next_run_at=next_run_at
+            )
+            logger.info(f"Scheduled {frequency} check-in for patient {patient_id}")
+            return next_run_at
 
         except Exception as e:
             logger.error(f"Error scheduling check-in: {e}")
+            raise
 
     async def _generate_response(self, prompt: str) -> str:
         """Generate response using mock logic instead of Gemini"""
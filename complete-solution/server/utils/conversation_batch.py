@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+from fastapi import HTTPException
+
+from .models import BatchConversationItem
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+TakeTurn = Callable[[Dict[str, Any], Dict[str, Any], str], Awaitable[Dict[str, Any]]]
+# Snapshot in-memory per-patient state; calling the result restores it
+Checkpoint = Callable[[Dict[str, Any]], Callable[[], None]]
+
+
+class ConversationBatchProcessor:
+    """Answers a batch of (session_id, message) items with shared lookups.
+
+    Sessions, patients and histories are read with one query each. Items are
+    grouped by patient: a patient's items run in submission order (they may
+    share a session and its phase), different patients run concurrently, at
+    most ``concurrency`` at a time. Handlers queue their writes (turns, phase
+    moves and PRO answers) on the session instead of committing per turn, and
+    the whole batch is written in one transaction at the end. A session that
+    conflicts is rolled back alone; ``checkpoint`` lets its patient's
+    in-memory state (e.g. the adaptive questionnaire) be rolled back with it.
+    That state is per patient, so it is snapshotted once, before the
+    patient's first item, and restored if any of their sessions conflicts.
+    """
+
+    def __init__(self, db_manager, take_turn: TakeTurn, describe_error: Callable[[Exception], HTTPException],
+                 concurrency: int = BATCH_CONCURRENCY, checkpoint: Optional[Checkpoint] = None):
+        self.db_manager = db_manager
+        self.take_turn = take_turn
+        self.describe_error = describe_error
+        self.concurrency = concurrency
+        self.checkpoint = checkpoint
+
+    async def run(self, items: List[BatchConversationItem], patient_id: Optional[int] = None) -> Dict[str, Any]:
+        """Process the items; ``patient_id`` limits them to one patient's sessions"""
+        start = time.perf_counter()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+
+        sessions = await self.db_manager.get_conversation_sessions(list(dict.fromkeys(item.session_id for item in items)))
+        patients = await self.db_manager.get_patients(list({session["patient_id"] for session in sessions.values()}))
+        histories = await self.db_manager.get_conversation_histories(list(sessions))
+
+        by_patient: Dict[int, List[int]] = {}
+        for index, item in enumerate(items):
+            session = sessions.get(item.session_id)
+            if session is None or session["patient_id"] not in patients or \
+                    (patient_id is not None and session["patient_id"] != patient_id):
+                results[index] = _error(index, item.session_id, 404, "Conversation session not found")
+                continue
+            session["history"] = histories[session["id"]]
+            by_patient.setdefault(session["patient_id"], []).append(index)
+
+        writes: Dict[str, List[tuple]] = {}
+        answered: Dict[str, List[int]] = {}
+        restores: Dict[int, Callable[[], None]] = {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def answer_patient(owner: int, indexes: List[int]):
+            async with semaphore:
+                if self.checkpoint:
+                    restores[owner] = self.checkpoint(patients[owner])
+                for index in indexes:
+                    item = items[index]
+                    session = sessions[item.session_id]
+                    # A failed turn drops only its own queued writes
+                    session["writes"] = []
+                    try:
+                        result = await self.take_turn(patients[session["patient_id"]], session, item.message)
+                    except Exception as e:
+                        error = self.describe_error(e)
+                        results[index] = _error(index, item.session_id, error.status_code, error.detail)
+                        continue
+                    writes.setdefault(session["id"], []).extend(session["writes"])
+                    answered.setdefault(session["id"], []).append(index)
+                    session["history"].append({
+                        "message": item.message,
+                        "response": result["response"],
+                        "agent_type": result["agent_type"],
+                        "timestamp": datetime.utcnow().isoformat()
+                    })
+                    results[index] = {"index": index, "status_code": 200, **result}
+
+        await asyncio.gather(*(answer_patient(owner, indexes) for owner, indexes in by_patient.items()))
+
+        # One transaction; a session changed by another request meanwhile is rolled back alone
+        try:
+            conflicts = await self.db_manager.store_conversation_writes(writes)
+        except Exception:
+            for restore in restores.values():
+                restore()
+            raise
+        for owner in {sessions[session_id]["patient_id"] for session_id in conflicts}:
+            if owner in restores:
+                restores[owner]()
+        for session_id, conflict in conflicts.items():
+            for index in answered[session_id]:
+                results[index] = _error(index, session_id, 409, str(conflict))
+
+        failed = sum(1 for result in results if result["status_code"] != 200)
+        return {
+            "results": results,
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+
+
+def _error(index: int, session_id: str, status_code: int, detail: str) -> Dict[str, Any]:
+    return {"index": index, "session_id": session_id, "status_code": status_code, "detail": detail}
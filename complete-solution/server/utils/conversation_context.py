@@ -0,0 +1,160 @@
+import logging
+import os
+from collections import OrderedDict
+from typing import Dict, Any, List, NamedTuple, Optional
+
+from .pro_extraction import PROExtractor, default_extractor
+from .emotion_classifier import EmotionClassifier, default_classifier
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RECENT_TURNS = int(os.getenv("CONTEXT_RECENT_TURNS", "6"))
+MAX_CACHED_SESSIONS = int(os.getenv("CONTEXT_MAX_CACHED_SESSIONS", "5000"))
+
+summary_cache = metrics.cache("conversation_summary")
+
+# Rough token estimate; good enough to compare prompts before and after
+CHARS_PER_TOKEN = 4
+
+# Number of emotion changes kept in the rendered trajectory
+TRAJECTORY_LENGTH = 8
+
+
+def estimate_tokens(history: List[Dict[str, Any]]) -> int:
+    """Approximate prompt tokens of a conversation history"""
+    return sum((len(turn.get("message") or "") + len(turn.get("response") or "")) // CHARS_PER_TOKEN + 1
+               for turn in history)
+
+
+class SessionSummary:
+    """Running summary of the turns that fell out of the verbatim window"""
+
+    def __init__(self):
+        self.turns = 0
+        self.pro_values: Dict[str, Dict[str, Any]] = {}
+        self.emotions: List[List[Any]] = []  # [emotional_state, consecutive turns]
+        self.until: Optional[str] = None
+
+    def add_turn(self, turn: Dict[str, Any], extractor: PROExtractor, classifier: EmotionClassifier):
+        """Fold one stored interaction into the summary"""
+        self.turns += 1
+        self.until = turn.get("timestamp")
+        message = turn.get("message") or ""
+        if not message:
+            return
+
+        for measurement in extractor.extract(message).measurements:
+            reading = self.pro_values.setdefault(measurement.name, {"first": measurement.value, "count": 0})
+            reading["latest"] = measurement.value
+            reading["unit"] = measurement.unit
+            reading["count"] += 1
+
+        emotional_state = classifier.classify(message)["emotional_state"]
+        if self.emotions and self.emotions[-1][0] == emotional_state:
+            self.emotions[-1][1] += 1
+        else:
+            self.emotions.append([emotional_state, 1])
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "turns": self.turns,
+            "pro_values": self.pro_values,
+            "emotional_trajectory": [emotion for emotion, _ in self.emotions[-TRAJECTORY_LENGTH:]]
+        }
+
+    def render(self) -> str:
+        lines = [f"Summary of {self.turns} earlier interactions:"]
+        for name, reading in self.pro_values.items():
+            unit = f" {reading['unit']}" if reading.get("unit") else ""
+            detail = f"latest {reading['latest']}{unit}"
+            if reading["count"] > 1:
+                detail += f" (first {reading['first']}{unit}, {reading['count']} reports)"
+            lines.append(f"- {name}: {detail}")
+        if self.emotions:
+            trajectory = " -> ".join(
+                f"{emotion} x{count}" if count > 1 else emotion
+                for emotion, count in self.emotions[-TRAJECTORY_LENGTH:]
+            )
+            lines.append(f"- emotional trajectory: {trajectory}")
+        return "\n".join(lines)
+
+
+class ConversationContext(NamedTuple):
+    """History to hand to an agent, and what compaction saved"""
+    history: List[Dict[str, Any]]
+    summary: Optional[Dict[str, Any]]
+    tokens_before: int
+    tokens_after: int
+
+
+class ConversationContextManager:
+    """Keeps the last K turns verbatim and rolls older ones into a summary.
+
+    Summaries are cached per session and extended incrementally, so each
+    turn only extracts PRO values and emotions from the interactions that
+    left the window since the previous turn.
+    """
+
+    def __init__(self, recent_turns: int = RECENT_TURNS, max_sessions: int = MAX_CACHED_SESSIONS,
+                 extractor: PROExtractor = default_extractor, classifier: EmotionClassifier = default_classifier):
+        self.recent_turns = recent_turns
+        self.max_sessions = max_sessions
+        self.extractor = extractor
+        self.classifier = classifier
+        self._summaries: "OrderedDict[str, SessionSummary]" = OrderedDict()
+        self.requests = 0
+        self.compacted = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def build(self, session_id: str, history: List[Dict[str, Any]]) -> ConversationContext:
+        """Compact a session's full history into summary + recent turns"""
+        tokens_before = estimate_tokens(history)
+        self.requests += 1
+        self.tokens_before += tokens_before
+
+        older_count = len(history) - self.recent_turns
+        if older_count <= 0:
+            self.tokens_after += tokens_before
+            return ConversationContext(history, None, tokens_before, tokens_before)
+
+        summary = self._summaries.get(session_id)
+        if summary is None or summary.turns > older_count:
+            summary_cache.miss()
+            summary = SessionSummary()
+            self._summaries[session_id] = summary
+        else:
+            summary_cache.hit()
+        self._summaries.move_to_end(session_id)
+        while len(self._summaries) > self.max_sessions:
+            self._summaries.popitem(last=False)
+
+        for turn in history[summary.turns:older_count]:
+            summary.add_turn(turn, self.extractor, self.classifier)
+
+        compacted = [{
+            "message": "",
+            "response": summary.render(),
+            "agent_type": "summary",
+            "timestamp": summary.until
+        }] + history[older_count:]
+        tokens_after = estimate_tokens(compacted)
+        self.compacted += 1
+        self.tokens_after += tokens_after
+        return ConversationContext(compacted, summary.as_dict(), tokens_before, tokens_after)
+
+    def end_session(self, session_id: str):
+        """Drop the cached summary of a completed session"""
+        self._summaries.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "compacted": self.compacted,
+            "cached_sessions": len(self._summaries),
+            "recent_turns": self.recent_turns,
+            "avg_tokens_before": round(self.tokens_before / self.requests, 1) if self.requests else 0.0,
+            "avg_tokens_after": round(self.tokens_after / self.requests, 1) if self.requests else 0.0,
+            "tokens_saved": self.tokens_before - self.tokens_after
+        }
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Any, Callable, Awaitable, Iterable, Optional
+
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = float(os.getenv("WS_HEARTBEAT_SECONDS", "20"))
+HEARTBEAT_TIMEOUT_SECONDS = float(os.getenv("WS_HEARTBEAT_TIMEOUT_SECONDS", "60"))
+SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "32"))
+SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+MAX_PENDING_TURNS = int(os.getenv("WS_MAX_PENDING_TURNS", "4"))
+
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_TRY_AGAIN_LATER = 1013  # client isn't reading its frames
+CLOSE_HEARTBEAT_TIMEOUT = 4408
+
+
+class SocketStats:
+    """Counters shared by every conversation socket"""
+
+    def __init__(self):
+        self.active = 0
+        self.opened = 0
+        self.turns = 0
+        self.rejected_turns = 0
+        self.slow_consumers = 0
+        self.heartbeat_timeouts = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+class ConversationSocket:
+    """Frames of one patient's conversation over an accepted WebSocket.
+
+    Incoming messages are queued (at most ``max_pending`` waiting turns, the
+    rest are rejected with a ``busy`` error) and answered one at a time by
+    ``take_turn``. Outgoing frames go through a bounded queue drained by a
+    writer task; a client that stops reading is disconnected instead of
+    letting frames pile up in memory. The server pings every
+    ``heartbeat_seconds`` and drops connections that stay silent.
+    """
+
+    def __init__(self, websocket: WebSocket, take_turn: Callable[[str], Awaitable[Dict[str, Any]]],
+                 stats: SocketStats, heartbeat_seconds: float = HEARTBEAT_SECONDS,
+                 heartbeat_timeout: float = HEARTBEAT_TIMEOUT_SECONDS, max_pending: int = MAX_PENDING_TURNS):
+        self.websocket = websocket
+        self.take_turn = take_turn
+        self.stats = stats
+        self.heartbeat_seconds = heartbeat_seconds
+        self.heartbeat_timeout = heartbeat_timeout
+        self._outgoing: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self._pending: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._last_seen = time.monotonic()
+        self._close_code: Optional[int] = None
+
+    async def send(self, frame: Dict[str, Any]):
+        """Queue a frame, disconnecting the client if it can't keep up"""
+        # Not through wait_for when there's room: on Python 3.11 it can swallow
+        # a cancel that lands as the put completes, and run() never returns
+        try:
+            self._outgoing.put_nowait(frame)
+            return
+        except asyncio.QueueFull:
+            pass
+        try:
+            await asyncio.wait_for(self._outgoing.put(frame), timeout=SEND_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self.stats.slow_consumers += 1
+            await self._close(CLOSE_TRY_AGAIN_LATER)
+
+    async def run(self, initial_frames: Iterable[Dict[str, Any]] = ()):
+        """Serve the socket until the client disconnects or is dropped.
+
+        ``initial_frames`` (the ready frame and any replayed turns) are sent
+        once the writer is draining the queue, so a long replay can't fill it.
+        """
+        self.stats.active += 1
+        self.stats.opened += 1
+        tasks = [asyncio.create_task(self._write())]
+        try:
+            for frame in initial_frames:
+                if self._close_code is not None:
+                    return
+                await self.send(frame)
+            tasks += [asyncio.create_task(self._answer()),
+                      asyncio.create_task(self._heartbeat())]
+            await self._read()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.stats.active -= 1
+
+    async def _read(self):
+        while self._close_code is None:
+            try:
+                frame = await self.websocket.receive_json()
+            except (WebSocketDisconnect, RuntimeError):
+                return
+            except ValueError:
+                await self.send({"type": "error", "status_code": 400, "detail": "Frames must be JSON"})
+                continue
+            self._last_seen = time.monotonic()
+
+            kind = frame.get("type") if isinstance(frame, dict) else None
+            if kind == "ping":
+                await self.send({"type": "pong", "ts": frame.get("ts")})
+            elif kind == "message" and isinstance(frame.get("text"), str):
+                try:
+                    self._pending.put_nowait((frame.get("id"), frame["text"]))
+                except asyncio.QueueFull:
+                    self.stats.rejected_turns += 1
+                    await self.send({"type": "error", "id": frame.get("id"), "status_code": 429,
+                                     "detail": "Too many turns in flight, wait for a reply"})
+            elif kind != "pong":
+                await self.send({"type": "error", "status_code": 400, "detail": f"Unknown frame type {kind!r}"})
+
+    async def _answer(self):
+        while True:
+            frame_id, text = await self._pending.get()
+            try:
+                reply = await self.take_turn(text)
+                self.stats.turns += 1
+            except Exception as e:
+                logger.error(f"Error answering socket turn: {e}")
+                reply = {"type": "error", "status_code": 500, "detail": str(e)}
+            await self.send({**reply, "id": frame_id})
+
+    async def _write(self):
+        while True:
+            frame = await self._outgoing.get()
+            await self.websocket.send_text(orjson.dumps(frame, default=str).decode())
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            if time.monotonic() - self._last_seen > self.heartbeat_timeout:
+                self.stats.heartbeat_timeouts += 1
+                await self._close(CLOSE_HEARTBEAT_TIMEOUT)
+                return
+            await self.send({"type": "ping", "ts": time.time()})
+
+    async def _close(self, code: int):
+        if self._close_code is None:
+            self._close_code = code
+            try:
+                await self.websocket.close(code=code)
+            except RuntimeError:
+                pass  # already closed by the client
@@ -1,13 +1,18 @@
 import sqlite3
 import asyncio
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import logging
 import uuid
 
+from .models import SessionPhase
+from .session_phases import InvalidPhaseTransition, validate_transition
+from .metrics import instrumented
+
 logger = logging.getLogger(__name__)
 
+@instrumented("db_query", "DatabaseManager method")
 class DatabaseManager:
     def __init__(self, db_path: str = "pro_system.db"):
         self.db_path = db_path
@@ -41,9 +46,30 @@ class DatabaseManager:
                     started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     ended_at TIMESTAMP,
                     status TEXT DEFAULT 'active',
+                    phase TEXT DEFAULT 'greeting',
+                    phase_entered_at TIMESTAMP,
                     FOREIGN KEY (patient_id) REFERENCES patients (id)
                 )
             ''')
+            phase_added = self._add_column_if_missing(cursor, "conversation_sessions", "phase", "TEXT DEFAULT 'greeting'")
+            phase_entered_added = self._add_column_if_missing(cursor, "conversation_sessions", "phase_entered_at", "TIMESTAMP")
+
+            # Session phase transitions, timed for latency and drop-off analysis
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS session_phase_transitions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    from_phase TEXT NOT NULL,
+                    to_phase TEXT NOT NULL,
+                    duration_ms REAL,
+                    transitioned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (session_id) REFERENCES conversation_sessions (id)
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_phase_transitions_session
+                ON session_phase_transitions (session_id)
+            ''')
 
             # Conversation interactions table
             cursor.execute('''
@@ -59,6 +85,48 @@ class DatabaseManager:
                     FOREIGN KEY (patient_id) REFERENCES patients (id)
                 )
             ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_conversation_interactions_session
+                ON conversation_interactions (session_id, timestamp)
+            ''')
+            if phase_added or phase_entered_added:
+                self._backfill_session_phases(cursor)
+
+            # Recurring check-in schedules, one per patient
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS checkin_schedules (
+                    patient_id INTEGER PRIMARY KEY,
+                    frequency TEXT NOT NULL,
+                    preferred_time TEXT NOT NULL,
+                    active INTEGER DEFAULT 1,
+                    next_run_at TIMESTAMP,
+                    last_run_at TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (patient_id) REFERENCES patients (id)
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_checkin_schedules_due
+                ON checkin_schedules (active, next_run_at)
+            ''')
+
+            # Emotional state classified from each patient message
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS emotional_states (
+                    interaction_id INTEGER PRIMARY KEY,
+                    patient_id INTEGER NOT NULL,
+                    emotional_state TEXT NOT NULL,
+                    confidence_score REAL,
+                    distribution TEXT,
+                    timestamp TIMESTAMP,
+                    FOREIGN KEY (interaction_id) REFERENCES conversation_interactions (id),
+                    FOREIGN KEY (patient_id) REFERENCES patients (id)
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_emotional_states_patient
+                ON emotional_states (patient_id, timestamp)
+            ''')
 
             # PRO responses table
             cursor.execute('''
@@ -69,11 +137,13 @@ class DatabaseManager:
                     question_id TEXT NOT NULL,
                     response_value TEXT,
                     response_type TEXT DEFAULT 'text',
+                    unit TEXT,
                     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (patient_id) REFERENCES patients (id),
                     FOREIGN KEY (session_id) REFERENCES conversation_sessions (id)
                 )
             ''')
+            self._add_column_if_missing(cursor, "pro_responses", "unit", "TEXT")
 
             # Trend alerts table
             cursor.execute('''
@@ -90,6 +160,36 @@ class DatabaseManager:
                 )
             ''')
 
+            # Background jobs; a running job is leased until lease_expires_at
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT,
+                    patient_id INTEGER,
+                    status TEXT DEFAULT 'queued',
+                    priority INTEGER DEFAULT 0,
+                    attempts INTEGER DEFAULT 0,
+                    max_attempts INTEGER DEFAULT 5,
+                    run_at TIMESTAMP NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires_at TIMESTAMP,
+                    result TEXT,
+                    error TEXT,
+                    created_at TIMESTAMP NOT NULL,
+                    updated_at TIMESTAMP NOT NULL,
+                    finished_at TIMESTAMP
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_jobs_ready
+                ON jobs (status, priority DESC, run_at)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_jobs_lease
+                ON jobs (status, lease_expires_at)
+            ''')
+
             conn.commit()
             conn.close()
             logger.info("Database initialized successfully")
@@ -98,10 +198,54 @@ class DatabaseManager:
             logger.error(f"Error initializing database: {e}")
             raise
 
+    def _add_column_if_missing(self, cursor, table: str, column: str, definition: str) -> bool:
+        """Add a column to an existing table created by an older schema; returns whether it was added"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            return True
+        return False
+
+    def _backfill_session_phases(self, cursor):
+        """Derive the phase of sessions created before phases were persisted.
+
+        Otherwise they would all read as 'greeting' and be sent back through
+        it. A session with any interaction is past the greeting and triage, so
+        it resumes in the questionnaire, from its last interaction (UTC, like
+        started_at).
+        """
+        cursor.execute('''
+            UPDATE conversation_sessions
+            SET phase = CASE
+                    WHEN status = 'completed' THEN ?
+                    WHEN EXISTS (SELECT 1 FROM conversation_interactions i WHERE i.session_id = conversation_sessions.id) THEN ?
+                    ELSE ?
+                END,
+                phase_entered_at = COALESCE(
+                    (SELECT MAX(i.timestamp) FROM conversation_interactions i WHERE i.session_id = conversation_sessions.id),
+                    started_at
+                )
+            WHERE phase_entered_at IS NULL
+        ''', (SessionPhase.COMPLETED.value, SessionPhase.QUESTIONNAIRE.value, SessionPhase.GREETING.value))
+        if cursor.rowcount:
+            logger.info(f"Backfilled the phase of {cursor.rowcount} existing conversation sessions")
+
     def _get_connection(self):
         """Get database connection"""
         return sqlite3.connect(self.db_path)
 
+    def _patient_row(self, row) -> Dict[str, Any]:
+        return {
+            "id": row[0],
+            "email": row[1],
+            "date_of_birth": row[2],
+            "condition": row[3],
+            "medical_history": row[4],
+            "preferred_language": row[5],
+            "accessibility_needs": row[6],
+            "created_at": row[7]
+        }
+
     async def create_patient(self, email: str, date_of_birth: str, condition: str, medical_history: str = "", preferred_language: str = "en", accessibility_needs: Optional[str] = None) -> int:
         """Create a new patient"""
         try:
@@ -133,22 +277,31 @@ class DatabaseManager:
             conn.close()
 
             if patient_data:
-                return {
-                    "id": patient_data[0],
-                    "email": patient_data[1],
-                    "date_of_birth": patient_data[2],
-                    "condition": patient_data[3],
-                    "medical_history": patient_data[4],
-                    "preferred_language": patient_data[5],
-                    "accessibility_needs": patient_data[6],
-                    "created_at": patient_data[7]
-                }
+                return self._patient_row(patient_data)
             return None
 
         except Exception as e:
             logger.error(f"Error getting patient: {e}")
             raise
 
+    async def get_patients(self, patient_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get several patients in one query, keyed by ID"""
+        if not patient_ids:
+            return {}
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            placeholders = ",".join("?" * len(patient_ids))
+            cursor.execute(f'SELECT * FROM patients WHERE id IN ({placeholders})', list(patient_ids))
+            patients = {row[0]: self._patient_row(row) for row in cursor.fetchall()}
+            conn.close()
+            return patients
+
+        except Exception as e:
+            logger.error(f"Error getting patients: {e}")
+            raise
+
     async def get_patient(self, patient_id: int):
         """Get patient by ID"""
         try:
@@ -160,16 +313,7 @@ class DatabaseManager:
             conn.close()
 
             if patient_data:
-                return {
-                    "id": patient_data[0],
-                    "email": patient_data[1],
-                    "date_of_birth": patient_data[2],
-                    "condition": patient_data[3],
-                    "medical_history": patient_data[4],
-                    "preferred_language": patient_data[5],
-                    "accessibility_needs": patient_data[6],
-                    "created_at": patient_data[7]
-                }
+                return self._patient_row(patient_data)
             return None
 
         except Exception as e:
@@ -203,9 +347,9 @@ class DatabaseManager:
             cursor = conn.cursor()
 
             cursor.execute('''
-                INSERT INTO conversation_sessions (id, patient_id)
-                VALUES (?, ?)
-            ''', (session_id, patient_id))
+                INSERT INTO conversation_sessions (id, patient_id, phase, phase_entered_at)
+                VALUES (?, ?, ?, ?)
+            ''', (session_id, patient_id, SessionPhase.GREETING.value, datetime.utcnow().isoformat()))
 
             conn.commit()
             conn.close()
@@ -215,8 +359,165 @@ class DatabaseManager:
             logger.error(f"Error creating conversation session: {e}")
             raise
 
+    async def get_conversation_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get a conversation session and its current phase by ID"""
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                SELECT id, patient_id, started_at, ended_at, status, phase, phase_entered_at
+                FROM conversation_sessions
+                WHERE id = ?
+            ''', (session_id,))
+            row = cursor.fetchone()
+            conn.close()
+
+            if row:
+                return {
+                    "id": row[0],
+                    "patient_id": row[1],
+                    "started_at": row[2],
+                    "ended_at": row[3],
+                    "status": row[4],
+                    "phase": row[5] or SessionPhase.GREETING.value,
+                    "phase_entered_at": row[6]
+                }
+            return None
+
+        except Exception as e:
+            logger.error(f"Error getting conversation session: {e}")
+            raise
+
+    def _apply_phase_transition(self, cursor, session_id: str, from_phase: SessionPhase, to_phase: SessionPhase) -> Optional[float]:
+        """Guarded phase update on an open transaction; raises InvalidPhaseTransition on conflict"""
+        validate_transition(from_phase, to_phase)
+        # UTC, like the CURRENT_TIMESTAMP defaults of started_at and the interactions
+        now = datetime.utcnow()
+
+        cursor.execute(
+            'SELECT phase_entered_at FROM conversation_sessions WHERE id = ? AND phase = ?',
+            (session_id, from_phase.value)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            raise InvalidPhaseTransition(f"Session {session_id} is not in phase {from_phase.value}")
+
+        duration_ms = None
+        if row[0]:
+            duration_ms = (now - datetime.fromisoformat(row[0])).total_seconds() * 1000
+
+        if to_phase == SessionPhase.COMPLETED:
+            cursor.execute('''
+                UPDATE conversation_sessions
+                SET phase = ?, phase_entered_at = ?, status = 'completed', ended_at = ?
+                WHERE id = ? AND phase = ?
+            ''', (to_phase.value, now.isoformat(), now.isoformat(), session_id, from_phase.value))
+        else:
+            cursor.execute('''
+                UPDATE conversation_sessions
+                SET phase = ?, phase_entered_at = ?
+                WHERE id = ? AND phase = ?
+            ''', (to_phase.value, now.isoformat(), session_id, from_phase.value))
+
+        # Another request moved the session first
+        if cursor.rowcount == 0:
+            raise InvalidPhaseTransition(f"Session {session_id} is not in phase {from_phase.value}")
+
+        cursor.execute('''
+            INSERT INTO session_phase_transitions (session_id, from_phase, to_phase, duration_ms)
+            VALUES (?, ?, ?, ?)
+        ''', (session_id, from_phase.value, to_phase.value, duration_ms))
+        return duration_ms
+
+    async def transition_session_phase(self, session_id: str, from_phase: SessionPhase, to_phase: SessionPhase) -> Optional[float]:
+        """Move a session to its next phase and record how long the previous phase took"""
+        try:
+            conn = self._get_connection()
+            try:
+                duration_ms = self._apply_phase_transition(conn.cursor(), session_id, from_phase, to_phase)
+                conn.commit()
+                return duration_ms
+            except InvalidPhaseTransition:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+
+        except Exception as e:
+            logger.error(f"Error transitioning session phase: {e}")
+            raise
+
+    async def get_conversation_sessions(self, session_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several sessions in one query, keyed by ID"""
+        if not session_ids:
+            return {}
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            placeholders = ",".join("?" * len(session_ids))
+            cursor.execute(f'''
+                SELECT id, patient_id, started_at, ended_at, status, phase, phase_entered_at
+                FROM conversation_sessions
+                WHERE id IN ({placeholders})
+            ''', list(session_ids))
+            sessions = {
+                row[0]: {
+                    "id": row[0],
+                    "patient_id": row[1],
+                    "started_at": row[2],
+                    "ended_at": row[3],
+                    "status": row[4],
+                    "phase": row[5] or SessionPhase.GREETING.value,
+                    "phase_entered_at": row[6]
+                }
+                for row in cursor.fetchall()
+            }
+            conn.close()
+            return sessions
+
+        except Exception as e:
+            logger.error(f"Error getting conversation sessions: {e}")
+            raise
+
+    async def get_phase_statistics(self) -> Dict[str, Any]:
+        """Time spent in each phase and where unfinished sessions stopped"""
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                SELECT from_phase, COUNT(*), AVG(duration_ms), MAX(duration_ms)
+                FROM session_phase_transitions
+                GROUP BY from_phase
+            ''')
+            latency = {
+                row[0]: {"transitions": row[1], "avg_duration_ms": row[2], "max_duration_ms": row[3]}
+                for row in cursor.fetchall()
+            }
+
+            cursor.execute('''
+                SELECT phase, COUNT(*)
+                FROM conversation_sessions
+                WHERE status = 'active'
+                GROUP BY phase
+            ''')
+            open_sessions = {row[0]: row[1] for row in cursor.fetchall()}
+
+            conn.close()
+            return {"phase_latency": latency, "open_sessions_by_phase": open_sessions}
+
+        except Exception as e:
+            logger.error(f"Error getting phase statistics: {e}")
+            raise
+
     async def get_conversation_history(self, session_id: str) -> List[Dict[str, Any]]:
         """Get conversation history for a session"""
+        # Runs in a worker thread so concurrent pipeline steps really overlap
+        return await asyncio.to_thread(self._get_conversation_history, session_id)
+
+    def _get_conversation_history(self, session_id: str) -> List[Dict[str, Any]]:
         try:
             conn = self._get_connection()
             cursor = conn.cursor()
@@ -244,6 +545,92 @@ class DatabaseManager:
             logger.error(f"Error getting conversation history: {e}")
             raise
 
+    async def get_conversation_histories(self, session_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Conversation histories of several sessions in one query"""
+        histories = {session_id: [] for session_id in session_ids}
+        if not histories:
+            return histories
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            placeholders = ",".join("?" * len(histories))
+            cursor.execute(f'''
+                SELECT session_id, message, response, agent_type, timestamp
+                FROM conversation_interactions
+                WHERE session_id IN ({placeholders})
+                ORDER BY timestamp ASC
+            ''', list(histories))
+            for row in cursor.fetchall():
+                histories[row[0]].append({
+                    "message": row[1],
+                    "response": row[2],
+                    "agent_type": row[3],
+                    "timestamp": row[4]
+                })
+
+            conn.close()
+            return histories
+
+        except Exception as e:
+            logger.error(f"Error getting conversation histories: {e}")
+            raise
+
+    async def store_conversation_writes(self, writes_by_session: Dict[str, List[tuple]]) -> Dict[str, InvalidPhaseTransition]:
+        """Apply the queued writes of many sessions in one transaction.
+
+        Each session's writes are ``("interaction", patient_id, message,
+        response, agent_type)``, ``("pro", patient_id, question_id,
+        response_value, response_type, unit)`` or ``("transition",
+        from_phase, to_phase)`` tuples, applied in order inside their own
+        savepoint: a session whose
+        phase changed underneath is rolled back alone and returned with its
+        conflict, the others are committed together. The transaction runs in
+        a worker thread.
+        """
+        return await asyncio.to_thread(self._store_conversation_writes, writes_by_session)
+
+    def _store_conversation_writes(self, writes_by_session: Dict[str, List[tuple]]) -> Dict[str, InvalidPhaseTransition]:
+        conflicts = {}
+        try:
+            conn = self._get_connection()
+            conn.isolation_level = None
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                for session_id, writes in writes_by_session.items():
+                    cursor.execute("SAVEPOINT session_writes")
+                    try:
+                        for write in writes:
+                            if write[0] == "transition":
+                                self._apply_phase_transition(cursor, session_id, write[1], write[2])
+                            elif write[0] == "pro":
+                                cursor.execute('''
+                                    INSERT INTO pro_responses (session_id, patient_id, question_id, response_value, response_type, unit)
+                                    VALUES (?, ?, ?, ?, ?, ?)
+                                ''', (session_id, *write[1:]))
+                            else:
+                                cursor.execute('''
+                                    INSERT INTO conversation_interactions (session_id, patient_id, message, response, agent_type)
+                                    VALUES (?, ?, ?, ?, ?)
+                                ''', (session_id, *write[1:]))
+                    except InvalidPhaseTransition as e:
+                        cursor.execute("ROLLBACK TO session_writes")
+                        conflicts[session_id] = e
+                    cursor.execute("RELEASE session_writes")
+                cursor.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    cursor.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+            return conflicts
+
+        except Exception as e:
+            logger.error(f"Error storing batched conversation writes: {e}")
+            raise
+
     async def store_conversation_interaction(self, session_id: str, patient_id: int, message: str, response: str, agent_type: str):
         """Store a conversation interaction"""
         try:
@@ -262,16 +649,178 @@ class DatabaseManager:
             logger.error(f"Error storing conversation interaction: {e}")
             raise
 
-    async def store_pro_response(self, patient_id: int, session_id: str, question_id: str, response_value: str, response_type: str = "text"):
-        """Store a PRO response"""
+    def _checkin_schedule_row(self, row) -> Dict[str, Any]:
+        return {
+            "patient_id": row[0],
+            "frequency": row[1],
+            "preferred_time": row[2],
+            "active": bool(row[3]),
+            "next_run_at": datetime.fromisoformat(row[4]) if row[4] else None,
+            "last_run_at": datetime.fromisoformat(row[5]) if row[5] else None
+        }
+
+    async def upsert_checkin_schedule(self, patient_id: int, frequency: str, preferred_time: str, active: bool, next_run_at: Optional[datetime]):
+        """Create or replace a patient's check-in schedule"""
         try:
             conn = self._get_connection()
             cursor = conn.cursor()
 
             cursor.execute('''
-                INSERT INTO pro_responses (patient_id, session_id, question_id, response_value, response_type)
+                INSERT INTO checkin_schedules (patient_id, frequency, preferred_time, active, next_run_at)
                 VALUES (?, ?, ?, ?, ?)
-            ''', (patient_id, session_id, question_id, response_value, response_type))
+                ON CONFLICT (patient_id) DO UPDATE SET
+                    frequency = excluded.frequency,
+                    preferred_time = excluded.preferred_time,
+                    active = excluded.active,
+                    next_run_at = excluded.next_run_at,
+                    updated_at = CURRENT_TIMESTAMP
+            ''', (patient_id, frequency, preferred_time, int(active),
+                  next_run_at.isoformat(timespec="seconds") if next_run_at else None))
+
+            conn.commit()
+            conn.close()
+
+        except Exception as e:
+            logger.error(f"Error saving check-in schedule: {e}")
+            raise
+
+    async def get_checkin_schedule(self, patient_id: int) -> Optional[Dict[str, Any]]:
+        """Get a patient's check-in schedule"""
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                SELECT patient_id, frequency, preferred_time, active, next_run_at, last_run_at
+                FROM checkin_schedules
+                WHERE patient_id = ?
+            ''', (patient_id,))
+            row = cursor.fetchone()
+            conn.close()
+
+            return self._checkin_schedule_row(row) if row else None
+
+        except Exception as e:
+            logger.error(f"Error getting check-in schedule: {e}")
+            raise
+
+    async def get_due_checkin_schedules(self, until: datetime, limit: int) -> List[Dict[str, Any]]:
+        """Active schedules due before ``until``, earliest first"""
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                SELECT patient_id, frequency, preferred_time, active, next_run_at, last_run_at
+                FROM checkin_schedules
+                WHERE active = 1 AND next_run_at < ?
+                ORDER BY next_run_at
+                LIMIT ?
+            ''', (until.isoformat(timespec="seconds"), limit))
+            rows = cursor.fetchall()
+            conn.close()
+
+            return [self._checkin_schedule_row(row) for row in rows]
+
+        except Exception as e:
+            logger.error(f"Error getting due check-in schedules: {e}")
+            raise
+
+    async def reschedule_checkin(self, patient_id: int, expected_next_run_at: datetime, next_run_at: datetime, last_run_at: datetime) -> bool:
+        """Advance a schedule after a run, unless it was changed in the meantime"""
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                UPDATE checkin_schedules
+                SET next_run_at = ?, last_run_at = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE patient_id = ? AND next_run_at = ?
+            ''', (next_run_at.isoformat(timespec="seconds"), last_run_at.isoformat(timespec="seconds"),
+                  patient_id, expected_next_run_at.isoformat(timespec="seconds")))
+            updated = cursor.rowcount > 0
+
+            conn.commit()
+            conn.close()
+            return updated
+
+        except Exception as e:
+            logger.error(f"Error rescheduling check-in: {e}")
+            raise
+
+    async def iter_unclassified_interactions(self, batch_size: int = 5000):
+        """Yield batches of patient messages without a stored emotional state"""
+        last_id = 0
+        while True:
+            try:
+                conn = self._get_connection()
+                cursor = conn.cursor()
+
+                # Keyset pagination keeps every batch an index range scan
+                cursor.execute('''
+                    SELECT ci.id, ci.patient_id, ci.message, ci.timestamp
+                    FROM conversation_interactions ci
+                    LEFT JOIN emotional_states es ON es.interaction_id = ci.id
+                    WHERE ci.id > ? AND es.interaction_id IS NULL
+                      AND ci.message IS NOT NULL AND ci.message != ''
+                    ORDER BY ci.id
+                    LIMIT ?
+                ''', (last_id, batch_size))
+                rows = cursor.fetchall()
+                conn.close()
+
+            except Exception as e:
+                logger.error(f"Error reading conversation interactions: {e}")
+                raise
+
+            if not rows:
+                return
+
+            last_id = rows[-1][0]
+            yield [
+                {"id": row[0], "patient_id": row[1], "message": row[2], "timestamp": row[3]}
+                for row in rows
+            ]
+
+    async def store_emotional_states(self, interactions: List[Dict[str, Any]], states: List[Dict[str, Any]]):
+        """Store classified emotional states for a batch of interactions"""
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.executemany('''
+                INSERT OR REPLACE INTO emotional_states
+                    (interaction_id, patient_id, emotional_state, confidence_score, distribution, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [
+                (
+                    interaction["id"],
+                    interaction["patient_id"],
+                    state["emotional_state"],
+                    state["confidence_score"],
+                    json.dumps(state.get("distribution", {})),
+                    interaction["timestamp"]
+                )
+                for interaction, state in zip(interactions, states)
+            ])
+
+            conn.commit()
+            conn.close()
+
+        except Exception as e:
+            logger.error(f"Error storing emotional states: {e}")
+            raise
+
+    async def store_pro_response(self, patient_id: int, session_id: str, question_id: str, response_value: str, response_type: str = "text", unit: Optional[str] = None):
+        """Store a PRO response"""
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                INSERT INTO pro_responses (patient_id, session_id, question_id, response_value, response_type, unit)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (patient_id, session_id, question_id, response_value, response_type, unit))
 
             conn.commit()
             conn.close()
@@ -287,7 +836,7 @@ class DatabaseManager:
             cursor = conn.cursor()
 
             cursor.execute('''
-                SELECT question_id, response_value, response_type, timestamp
+                SELECT question_id, response_value, response_type, timestamp, unit
                 FROM pro_responses
                 WHERE patient_id = ?
                 ORDER BY timestamp ASC
@@ -299,7 +848,8 @@ class DatabaseManager:
                     "question_id": row[0],
                     "response_value": row[1],
                     "response_type": row[2],
-                    "timestamp": row[3]
+                    "timestamp": row[3],
+                    "unit": row[4]
                 })
 
             conn.close()
@@ -325,4 +875,199 @@ class DatabaseManager:
 
         except Exception as e:
             logger.error(f"Error creating trend alert: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def _job_row(self, row) -> Dict[str, Any]:
+        return {
+            "id": row[0],
+            "kind": row[1],
+            "payload": json.loads(row[2]) if row[2] else {},
+            "patient_id": row[3],
+            "status": row[4],
+            "priority": row[5],
+            "attempts": row[6],
+            "max_attempts": row[7],
+            "run_at": row[8],
+            "lease_owner": row[9],
+            "lease_expires_at": row[10],
+            "result": json.loads(row[11]) if row[11] else None,
+            "error": row[12],
+            "created_at": row[13],
+            "updated_at": row[14],
+            "finished_at": row[15]
+        }
+
+    async def enqueue_job(self, kind: str, payload: Dict[str, Any], patient_id: Optional[int] = None, priority: int = 0, max_attempts: int = 5, run_at: Optional[datetime] = None) -> str:
+        """Queue a background job and return its ID"""
+        try:
+            job_id = str(uuid.uuid4())
+            now = _timestamp(datetime.utcnow())
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                INSERT INTO jobs (id, kind, payload, patient_id, priority, max_attempts, run_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (job_id, kind, json.dumps(payload, default=str), patient_id, priority, max_attempts,
+                  _timestamp(run_at) if run_at else now, now, now))
+
+            conn.commit()
+            conn.close()
+            return job_id
+
+        except Exception as e:
+            logger.error(f"Error enqueuing job: {e}")
+            raise
+
+    async def lease_jobs(self, owner: str, limit: int, lease_seconds: float) -> List[Dict[str, Any]]:
+        """Claim up to ``limit`` runnable jobs, highest priority first.
+
+        Runnable means queued and due, or running with an expired lease (its
+        worker died). Jobs whose lease expired on their last attempt are
+        failed instead of being handed out again. ``BEGIN IMMEDIATE`` can wait
+        on other writers, so the transaction runs in a worker thread.
+        """
+        return await asyncio.to_thread(self._lease_jobs, owner, limit, lease_seconds)
+
+    def _lease_jobs(self, owner: str, limit: int, lease_seconds: float) -> List[Dict[str, Any]]:
+        try:
+            now = datetime.utcnow()
+            conn = self._get_connection()
+            conn.isolation_level = None
+            cursor = conn.cursor()
+            try:
+                # Taken before reading so two processes can't claim the same job
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute('''
+                    UPDATE jobs
+                    SET status = 'failed', error = 'Lease expired on the last attempt', lease_owner = NULL,
+                        updated_at = ?, finished_at = ?
+                    WHERE status = 'running' AND lease_expires_at <= ? AND attempts >= max_attempts
+                ''', (_timestamp(now), _timestamp(now), _timestamp(now)))
+
+                cursor.execute('''
+                    SELECT id FROM jobs
+                    WHERE (status = 'queued' AND run_at <= ?) OR (status = 'running' AND lease_expires_at <= ?)
+                    ORDER BY priority DESC, run_at
+                    LIMIT ?
+                ''', (_timestamp(now), _timestamp(now), limit))
+                job_ids = [row[0] for row in cursor.fetchall()]
+
+                jobs = []
+                if job_ids:
+                    placeholders = ",".join("?" * len(job_ids))
+                    cursor.execute(f'''
+                        UPDATE jobs
+                        SET status = 'running', attempts = attempts + 1, lease_owner = ?,
+                            lease_expires_at = ?, updated_at = ?
+                        WHERE id IN ({placeholders})
+                    ''', (owner, _timestamp(now + timedelta(seconds=lease_seconds)), _timestamp(now), *job_ids))
+                    cursor.execute(f'SELECT * FROM jobs WHERE id IN ({placeholders}) ORDER BY priority DESC, run_at', job_ids)
+                    jobs = [self._job_row(row) for row in cursor.fetchall()]
+                cursor.execute("COMMIT")
+                return jobs
+            except Exception:
+                if conn.in_transaction:
+                    cursor.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+
+        except Exception as e:
+            logger.error(f"Error leasing jobs: {e}")
+            raise
+
+    async def extend_job_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Push back the lease of a job this worker still holds"""
+        try:
+            now = datetime.utcnow()
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                UPDATE jobs SET lease_expires_at = ?, updated_at = ?
+                WHERE id = ? AND status = 'running' AND lease_owner = ?
+            ''', (_timestamp(now + timedelta(seconds=lease_seconds)), _timestamp(now), job_id, owner))
+            extended = cursor.rowcount == 1
+
+            conn.commit()
+            conn.close()
+            return extended
+
+        except Exception as e:
+            logger.error(f"Error extending job lease: {e}")
+            raise
+
+    async def finish_job(self, job_id: str, owner: str, result: Any = None, error: Optional[str] = None, retry_at: Optional[datetime] = None) -> bool:
+        """Record a job's outcome: succeeded with ``result``, requeued for ``retry_at``, or failed with ``error``.
+
+        Ignored (returns False) when the lease was lost to another worker.
+        """
+        try:
+            now = _timestamp(datetime.utcnow())
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            if error is None:
+                cursor.execute('''
+                    UPDATE jobs
+                    SET status = 'succeeded', result = ?, error = NULL, lease_owner = NULL, updated_at = ?, finished_at = ?
+                    WHERE id = ? AND status = 'running' AND lease_owner = ?
+                ''', (json.dumps(result, default=str), now, now, job_id, owner))
+            elif retry_at is not None:
+                cursor.execute('''
+                    UPDATE jobs
+                    SET status = 'queued', error = ?, run_at = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+                    WHERE id = ? AND status = 'running' AND lease_owner = ?
+                ''', (error, _timestamp(retry_at), now, job_id, owner))
+            else:
+                cursor.execute('''
+                    UPDATE jobs
+                    SET status = 'failed', error = ?, lease_owner = NULL, updated_at = ?, finished_at = ?
+                    WHERE id = ? AND status = 'running' AND lease_owner = ?
+                ''', (error, now, now, job_id, owner))
+            finished = cursor.rowcount == 1
+
+            conn.commit()
+            conn.close()
+            return finished
+
+        except Exception as e:
+            logger.error(f"Error finishing job: {e}")
+            raise
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by ID"""
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,))
+            row = cursor.fetchone()
+            conn.close()
+
+            return self._job_row(row) if row else None
+
+        except Exception as e:
+            logger.error(f"Error getting job: {e}")
+            raise
+
+    async def get_job_counts(self) -> Dict[str, int]:
+        """Number of jobs in each status"""
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status')
+            counts = {row[0]: row[1] for row in cursor.fetchall()}
+            conn.close()
+            return counts
+
+        except Exception as e:
+            logger.error(f"Error getting job counts: {e}")
+            raise
+
+
+def _timestamp(value: datetime) -> str:
+    # Fixed width so timestamps compare correctly as text
+    return value.isoformat(timespec="milliseconds")
@@ -0,0 +1,172 @@
+import re
+import logging
+from typing import Dict, Any, List, Iterable, Tuple
+
+from .metrics import instrumented
+
+logger = logging.getLogger(__name__)
+
+EMOTIONS = ("fatigued", "anxious", "depressed", "positive")
+NEUTRAL = "neutral"
+
+# Constant evidence for "neutral" so that weak cues don't dominate
+NEUTRAL_PRIOR = 0.6
+
+# token -> (emotion, weight)
+LEXICON: Dict[str, Tuple[str, float]] = {
+    # fatigue
+    "tired": ("fatigued", 1.0), "exhausted": ("fatigued", 1.4), "fatigue": ("fatigued", 1.2),
+    "fatigued": ("fatigued", 1.2), "drained": ("fatigued", 1.2), "sleepy": ("fatigued", 0.8),
+    "weary": ("fatigued", 1.0), "worn": ("fatigued", 0.8), "lethargic": ("fatigued", 1.2),
+    # anxiety
+    "anxious": ("anxious", 1.2), "anxiety": ("anxious", 1.2), "worried": ("anxious", 1.0),
+    "worry": ("anxious", 0.9), "worrying": ("anxious", 1.0), "stressed": ("anxious", 1.0),
+    "stress": ("anxious", 0.8), "nervous": ("anxious", 1.0), "scared": ("anxious", 1.1),
+    "afraid": ("anxious", 1.0), "panicky": ("anxious", 1.3), "overwhelmed": ("anxious", 1.1),
+    # low mood
+    "sad": ("depressed", 1.0), "depressed": ("depressed", 1.4), "down": ("depressed", 0.7),
+    "hopeless": ("depressed", 1.6), "miserable": ("depressed", 1.3), "lonely": ("depressed", 1.0),
+    "empty": ("depressed", 0.9), "worthless": ("depressed", 1.6), "crying": ("depressed", 1.1),
+    # positive
+    "good": ("positive", 0.8), "great": ("positive", 1.0), "better": ("positive", 1.0),
+    "improving": ("positive", 1.1), "improved": ("positive", 1.1), "fine": ("positive", 0.5),
+    "happy": ("positive", 1.1), "well": ("positive", 0.6), "hopeful": ("positive", 1.1),
+    "energetic": ("positive", 1.0), "calm": ("positive", 0.8), "relaxed": ("positive", 0.9),
+}
+
+NEGATORS = frozenset({"not", "no", "never", "hardly", "without", "nor", "cannot"})
+INTENSIFIERS = {"very": 1.5, "really": 1.4, "so": 1.3, "extremely": 1.8, "super": 1.5, "too": 1.3,
+                "slightly": 0.6, "little": 0.7, "bit": 0.7, "somewhat": 0.7}
+CONTRASTS = frozenset({"but", "however", "although", "though"})
+# Negation never reaches past the end of its clause: "I can't sleep, so anxious"
+CLAUSE_BREAKS = frozenset({",", ".", ";", "!", "?", "so", "and", "because", "then"}) | CONTRASTS
+
+# A clause-initial "no" answers the question, it doesn't negate what follows:
+# "No, I feel tired", "No I feel tired"
+ANSWER_WORDS = frozenset({"no", "nope", "nah"})
+
+NEGATION_SCOPE = 3
+CONTRAST_BOOST = 1.5
+
+# What a negated cue counts towards: "not anxious" reads as mildly positive,
+# while "not good" or "not feeling well" is a low mood in its own right
+NEGATION_TARGETS = {"fatigued": "positive", "anxious": "positive", "depressed": "positive", "positive": "depressed"}
+NEGATION_WEIGHT = 0.5
+NEGATED_POSITIVE_WEIGHT = 1.25
+
+# Words that describe a change rather than a state. After a symptom they
+# soften it instead of outweighing it: "tired but improving" is still tired
+TREND_WORDS = frozenset({"better", "improving", "improved"})
+TREND_WEIGHT = 0.5
+
+# Self-harm statements are always urgent, whatever the lexicon scores say
+_RISK_PATTERN = re.compile(
+    r"\b(?:(?:want|wanted|wanting|going|plan(?:ning)?)\s+to\s+(?:die|end\s+it\s+all)|"
+    r"kill(?:ing)?\s+myself|end(?:ing)?\s+my\s+life|suicid(?:e|al)|self[-\s]?harm|hurt(?:ing)?\s+myself|"
+    r"better\s+off\s+dead|no\s+(?:reason|point)\s+(?:to|in)\s+liv(?:e|ing)|"
+    r"(?:don'?t|do\s+not)\s+want\s+to\s+(?:live|be\s+alive|wake\s+up))",
+    re.IGNORECASE
+)
+
+URGENCY = {"depressed": "high", "anxious": "medium", "fatigued": "medium", "positive": "low", NEUTRAL: "low"}
+RESPONSE_TONE = {"depressed": "gentle", "anxious": "reassuring", "fatigued": "supportive",
+                 "positive": "encouraging", NEUTRAL: "supportive"}
+
+_TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?|[,.;!?]")
+
+
+@instrumented("classification", "Emotion classification", methods=("classify", "classify_batch"))
+class EmotionClassifier:
+    """Lexicon classifier that scores every emotion in one pass over the tokens"""
+
+    def __init__(self, lexicon: Dict[str, Tuple[str, float]] = LEXICON):
+        self.lexicon = lexicon
+
+    def score(self, message: str) -> Dict[str, float]:
+        """Return a probability distribution over emotions (including neutral)"""
+        scores = dict.fromkeys(EMOTIONS, 0.0)
+        negation_left = 0
+        intensity = 1.0
+        clause_weight = 1.0
+        clause_start = True
+        symptom_seen = False
+
+        for token in _TOKEN_PATTERN.findall((message or "").lower()):
+            if clause_start:
+                clause_start = False
+                if token in ANSWER_WORDS:
+                    continue
+            if token in NEGATORS or token.endswith("n't"):
+                negation_left = NEGATION_SCOPE
+                continue
+            if token in CLAUSE_BREAKS and not (token in INTENSIFIERS and negation_left == NEGATION_SCOPE):
+                # "so" right after a negator is an intensifier: "not so good"
+                negation_left = 0
+                clause_start = not token.isalpha()
+                if token in CONTRASTS:
+                    # The clause after "but" usually carries the overall sentiment
+                    clause_weight = CONTRAST_BOOST
+                if token not in INTENSIFIERS:
+                    intensity = 1.0
+                    continue
+            if token in INTENSIFIERS:
+                intensity = INTENSIFIERS[token]
+                continue
+
+            entry = self.lexicon.get(token)
+            if entry is not None:
+                emotion, weight = entry
+                if token in TREND_WORDS and symptom_seen:
+                    weight *= intensity * TREND_WEIGHT
+                else:
+                    weight *= intensity * clause_weight
+                if negation_left:
+                    negated_weight = NEGATED_POSITIVE_WEIGHT if emotion == "positive" else NEGATION_WEIGHT
+                    scores[NEGATION_TARGETS[emotion]] += weight * negated_weight
+                    negation_left = 0
+                else:
+                    scores[emotion] += weight
+                    symptom_seen = symptom_seen or emotion != "positive"
+
+            intensity = 1.0
+            if negation_left:
+                negation_left -= 1
+
+        scores[NEUTRAL] = NEUTRAL_PRIOR
+        total = sum(scores.values())
+        return {emotion: value / total for emotion, value in scores.items()}
+
+    def classify(self, message: str) -> Dict[str, Any]:
+        """Classify one message into the emotional state structure used by the agents"""
+        distribution = self.score(message)
+        return self._to_state(distribution, self.at_risk(message))
+
+    def classify_batch(self, messages: Iterable[str]) -> List[Dict[str, Any]]:
+        """Classify many messages, e.g. to backfill stored conversation interactions"""
+        score = self.score
+        to_state = self._to_state
+        at_risk = self.at_risk
+        return [to_state(score(message), at_risk(message)) for message in messages]
+
+    @staticmethod
+    def at_risk(message: str) -> bool:
+        """Whether the message mentions self-harm or wanting to die"""
+        return _RISK_PATTERN.search(message or "") is not None
+
+    def _to_state(self, distribution: Dict[str, float], at_risk: bool = False) -> Dict[str, Any]:
+        emotional_state = max(distribution, key=distribution.get)
+        key_emotions = sorted(
+            (emotion for emotion in EMOTIONS if distribution[emotion] >= 0.2),
+            key=lambda emotion: -distribution[emotion]
+        )
+        return {
+            "emotional_state": emotional_state,
+            "confidence_score": round(distribution[emotional_state], 3),
+            "key_emotions": key_emotions or [emotional_state],
+            "urgency_level": "high" if at_risk else URGENCY[emotional_state],
+            "suggested_response_tone": "gentle" if at_risk else RESPONSE_TONE[emotional_state],
+            "distribution": {emotion: round(value, 3) for emotion, value in distribution.items()}
+        }
+
+
+default_classifier = EmotionClassifier()
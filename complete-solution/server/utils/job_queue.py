@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Callable, Awaitable, AsyncIterator
+
+from .database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_SECONDS = float(os.getenv("JOB_BACKOFF_SECONDS", "2"))
+JOB_BACKOFF_MAX_SECONDS = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "300"))
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class PermanentJobError(Exception):
+    """Raised by a job handler for failures that retrying won't fix"""
+
+
+def retry_delay(attempts: int, base: float = JOB_BACKOFF_SECONDS, cap: float = JOB_BACKOFF_MAX_SECONDS) -> float:
+    """Exponential backoff with full jitter after ``attempts`` failed runs"""
+    return random.uniform(0, min(cap, base * 2 ** (attempts - 1)))
+
+
+class JobQueue:
+    """Durable job queue on the application's SQLite database.
+
+    Jobs are rows in the ``jobs`` table, so they survive restarts and can be
+    consumed by the workers of several processes. A worker leases a job for
+    ``lease_seconds`` and keeps extending the lease while the handler runs;
+    if the worker dies the lease expires and another worker picks the job
+    up. Failed runs are retried with exponential backoff until
+    ``max_attempts``, and higher ``priority`` jobs are leased first.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, workers: int = JOB_WORKERS, lease_seconds: float = JOB_LEASE_SECONDS,
+                 poll_seconds: float = JOB_POLL_SECONDS, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.db_manager = db_manager
+        self.worker_count = workers
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._wakeup = asyncio.Event()
+        self._changed: Dict[str, asyncio.Event] = {}  # job_id -> set when it changes in this process
+        self._tasks: List[asyncio.Task] = []
+        self.running = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+
+    def register(self, kind: str, handler: JobHandler):
+        """Handle jobs of ``kind``; the handler gets the job's payload and returns its result"""
+        self._handlers[kind] = handler
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any], patient_id: Optional[int] = None,
+                      priority: int = 0, max_attempts: Optional[int] = None) -> str:
+        """Persist a job and wake an idle worker; returns the job ID"""
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind {kind!r}")
+        job_id = await self.db_manager.enqueue_job(kind, payload, patient_id=patient_id, priority=priority,
+                                                   max_attempts=max_attempts or self.max_attempts)
+        self._wakeup.set()
+        return job_id
+
+    async def start(self):
+        """Start the worker pool"""
+        if self._tasks:
+            return
+        for index in range(self.worker_count):
+            self._tasks.append(asyncio.create_task(self._worker(index)))
+        logger.info(f"Job queue started with {self.worker_count} workers")
+
+    async def stop(self):
+        """Cancel the workers; their jobs are picked up again once the leases expire"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.db_manager.get_job(job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job whenever its status or attempt count changes, until it finishes.
+
+        Changes made by this process wake the watcher immediately; the
+        database is also re-read every ``poll_seconds`` for jobs run
+        elsewhere.
+        """
+        changed = self._changed.setdefault(job_id, asyncio.Event())
+        last = None
+        try:
+            while True:
+                changed.clear()
+                job = await self.db_manager.get_job(job_id)
+                if job is None:
+                    return
+                if (job["status"], job["attempts"]) != last:
+                    last = (job["status"], job["attempts"])
+                    yield job
+                if job["status"] in TERMINAL_STATUSES:
+                    return
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._changed.pop(job_id, None)
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "jobs": await self.db_manager.get_job_counts(),
+            "workers": self.worker_count,
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed
+        }
+
+    def _notify(self, job_id: str):
+        changed = self._changed.get(job_id)
+        if changed is not None:
+            changed.set()
+
+    async def _worker(self, index: int):
+        while True:
+            try:
+                jobs = await self.db_manager.lease_jobs(self.owner, 1, self.lease_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {index} could not lease jobs: {e}")
+                jobs = []
+
+            if not jobs:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Another job may be waiting; let the next idle worker look
+            self._wakeup.set()
+            try:
+                await self._run(jobs[0])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The lease expires and the job is retried
+                logger.error(f"Job worker {index} could not record the outcome of job {jobs[0]['id']}: {e}")
+
+    async def _run(self, job: Dict[str, Any]):
+        job_id = job["id"]
+        self._notify(job_id)
+        self.running += 1
+        keep_alive = asyncio.create_task(self._keep_leased(job_id))
+        try:
+            handler = self._handlers.get(job["kind"])
+            if handler is None:
+                raise PermanentJobError(f"No handler registered for job kind {job['kind']!r}")
+            result = await handler(job["payload"])
+            keep_alive.cancel()
+            await self.db_manager.finish_job(job_id, self.owner, result=result)
+            self.succeeded += 1
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            keep_alive.cancel()
+            error = f"{type(e).__name__}: {e}"
+            if isinstance(e, PermanentJobError) or job["attempts"] >= job["max_attempts"]:
+                logger.error(f"Job {job_id} ({job['kind']}) failed after {job['attempts']} attempts: {error}")
+                await self.db_manager.finish_job(job_id, self.owner, error=error)
+                self.failed += 1
+            else:
+                delay = retry_delay(job["attempts"])
+                logger.warning(f"Job {job_id} ({job['kind']}) attempt {job['attempts']} failed, retrying in {delay:.1f}s: {error}")
+                await self.db_manager.finish_job(job_id, self.owner, error=error,
+                                                 retry_at=datetime.utcnow() + timedelta(seconds=delay))
+                self.retried += 1
+
+        finally:
+            keep_alive.cancel()
+            self.running -= 1
+            self._notify(job_id)
+
+    async def _keep_leased(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await self.db_manager.extend_job_lease(job_id, self.owner, self.lease_seconds):
+                logger.warning(f"Lost the lease on job {job_id}")
+                return
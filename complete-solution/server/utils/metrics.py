@@ -0,0 +1,248 @@
+import functools
+import inspect
+import os
+import time
+from bisect import bisect_left
+from typing import Dict, Any, Optional, List, Tuple, Iterable, Callable
+
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() != "false"
+
+# Seconds; spans sub-millisecond DB reads to multi-second agent calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram.
+
+    Recording is a bisect and three additions with no lock: every timed call
+    finishes on the event loop thread, so updates don't interleave.
+    """
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+
+class CacheCounter:
+    """Hits and misses of one cache"""
+    __slots__ = ("hits", "misses")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self):
+        self.hits += 1
+
+    def miss(self):
+        self.misses += 1
+
+    @property
+    def ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class MetricsRegistry:
+    """Named, labelled metrics rendered in the Prometheus text format.
+
+    Look metrics up once and keep the returned object: recording on it
+    costs a few attribute updates, the lookup costs a dict access.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._families: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self._metrics: Dict[str, Dict[LabelSet, Any]] = {}
+        self._caches: Dict[str, CacheCounter] = {}
+
+    def _get(self, kind: str, name: str, help: str, factory: Callable[[], Any], labels: Dict[str, str]):
+        if name not in self._families:
+            self._families[name] = (kind, help)
+            self._metrics[name] = {}
+        key = tuple(sorted((label, str(value)) for label, value in labels.items()))
+        family = self._metrics[name]
+        metric = family.get(key)
+        if metric is None:
+            metric = family[key] = factory()
+        return metric
+
+    def histogram(self, name: str, help: str, **labels) -> Histogram:
+        return self._get("histogram", name, help, lambda: Histogram(self.buckets), labels)
+
+    def gauge(self, name: str, help: str, **labels) -> Gauge:
+        return self._get("gauge", name, help, Gauge, labels)
+
+    def counter(self, name: str, help: str, **labels) -> Counter:
+        return self._get("counter", name, help, Counter, labels)
+
+    def cache(self, name: str) -> CacheCounter:
+        if name not in self._caches:
+            self._caches[name] = CacheCounter()
+        return self._caches[name]
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        for name, (kind, help) in self._families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in self._metrics[name].items():
+                if kind == "histogram":
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float("inf"),), metric.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {metric.sum!r}")
+                    lines.append(f"{name}_count{_labels(labels)} {metric.count}")
+                else:
+                    lines.append(f"{name}{_labels(labels)} {metric.value}")
+
+        if self._caches:
+            lines.append("# HELP cache_requests_total Cache lookups by result")
+            lines.append("# TYPE cache_requests_total counter")
+            for cache, counter in self._caches.items():
+                lines.append(f'cache_requests_total{{cache="{_escape(cache)}",result="hit"}} {counter.hits}')
+                lines.append(f'cache_requests_total{{cache="{_escape(cache)}",result="miss"}} {counter.misses}')
+            lines.append("# HELP cache_hit_ratio Share of cache lookups that were hits")
+            lines.append("# TYPE cache_hit_ratio gauge")
+            for cache, counter in self._caches.items():
+                lines.append(f'cache_hit_ratio{{cache="{_escape(cache)}"}} {round(counter.ratio, 4)}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{label}="{_escape(value)}"' for label, value in labels) + "}"
+
+
+metrics = MetricsRegistry()
+
+
+def timed(function: Callable, histogram: Histogram, in_flight: Gauge) -> Callable:
+    """Wrap a sync or async callable to record its duration and concurrency"""
+    perf_counter = time.perf_counter
+
+    if inspect.iscoroutinefunction(function):
+        @functools.wraps(function)
+        async def timed_coroutine(*args, **kwargs):
+            in_flight.value += 1
+            start = perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                histogram.observe(perf_counter() - start)
+                in_flight.value -= 1
+        return timed_coroutine
+
+    @functools.wraps(function)
+    def timed_function(*args, **kwargs):
+        in_flight.value += 1
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.observe(perf_counter() - start)
+            in_flight.value -= 1
+    return timed_function
+
+
+def instrumented(prefix: str, description: str, methods: Optional[Iterable[str]] = None,
+                 registry: MetricsRegistry = metrics, **labels):
+    """Class decorator timing the class's methods.
+
+    Records ``<prefix>_duration_seconds`` and ``<prefix>_in_flight`` with a
+    ``method`` label (plus ``labels``). Without ``methods`` every public
+    coroutine method defined on the class is timed.
+    """
+    def decorate(cls):
+        if not METRICS_ENABLED:
+            return cls
+        names = methods if methods is not None else [
+            name for name, member in vars(cls).items()
+            if not name.startswith("_") and inspect.iscoroutinefunction(member)
+        ]
+        for name in names:
+            histogram = registry.histogram(f"{prefix}_duration_seconds", f"{description} latency in seconds", method=name, **labels)
+            in_flight = registry.gauge(f"{prefix}_in_flight", f"{description} calls in progress", method=name, **labels)
+            setattr(cls, name, timed(getattr(cls, name), histogram, in_flight))
+        return cls
+    return decorate
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that records latency, in-flight requests and response statuses per route.
+
+    Timing covers dependencies, the endpoint and response serialization;
+    for streaming responses it stops when the stream starts.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if not METRICS_ENABLED:
+            return handler
+
+        labels = {"method": ",".join(sorted(self.methods)), "route": self.path}
+        histogram = metrics.histogram("http_request_duration_seconds", "HTTP request latency in seconds", **labels)
+        in_flight = metrics.gauge("http_requests_in_flight", "HTTP requests in progress", **labels)
+        statuses: Dict[int, Counter] = {}
+        perf_counter = time.perf_counter
+
+        async def timed_handler(request):
+            in_flight.value += 1
+            start = perf_counter()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except RequestValidationError:
+                status = 422
+                raise
+            finally:
+                histogram.observe(perf_counter() - start)
+                in_flight.value -= 1
+                counter = statuses.get(status)
+                if counter is None:
+                    counter = statuses[status] = metrics.counter(
+                        "http_requests_total", "HTTP responses by status", status=status, **labels)
+                counter.value += 1
+
+        return timed_handler
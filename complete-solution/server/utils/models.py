@@ -14,6 +14,13 @@ class AlertSeverity(str, Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+class SessionPhase(str, Enum):
+    GREETING = "greeting"
+    EMOTIONAL_TRIAGE = "emotional_triage"
+    QUESTIONNAIRE = "questionnaire"
+    WRAP_UP = "wrap_up"
+    COMPLETED = "completed"
+
 class ResponseType(str, Enum):
     TEXT = "text"
     NUMERIC = "numeric"
@@ -27,7 +34,7 @@ class Patient(BaseModel):
     email: str
     date_of_birth: str
     condition: str
-    medical_history: str = ""
+    medical_history: Optional[str] = ""
     preferred_language: str = "en"
     accessibility_needs: Optional[str] = None
     created_at: datetime
@@ -58,13 +65,15 @@ class ConversationSession(BaseModel):
     start_time: datetime
     end_time: Optional[datetime] = None
     status: str  # active, completed, abandoned
+    phase: SessionPhase = SessionPhase.GREETING
+    phase_entered_at: Optional[datetime] = None
 
 class TrendAnalysis(BaseModel):
     patient_id: int
     analysis_date: datetime
     trends: List[Dict[str, Any]]
-    anomalies: List[Dict[str, Any]]
-    risk_assessment: Dict[str, Any]
+    anomalies: List[Dict[str, Any]] = Field(default_factory=list)  # absent when there's no data
+    risk_assessment: Dict[str, Any] = Field(default_factory=dict)
     alerts: List[Dict[str, Any]]
     recommendations: List[str]
     risk_score: Optional[float]
@@ -110,6 +119,16 @@ class ClinicianLogin(BaseModel):
     email: str = Field(..., pattern=r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
     password: str
 
+class LoginResponse(BaseModel):
+    token: str
+    patient_id: int
+    email: str
+    condition: str
+
+class PatientProfileResponse(BaseModel):
+    message: str
+    patient_id: int
+
 class ConversationRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
@@ -121,13 +140,73 @@ class ConversationResponse(BaseModel):
     next_action: Optional[str] = None
     emotional_state: Optional[Dict[str, Any]] = None
 
+class BatchConversationItem(BaseModel):
+    session_id: str
+    message: str
+
+class BatchConversationRequest(BaseModel):
+    items: List[BatchConversationItem] = Field(..., min_length=1)
+
+class BatchItemResult(BaseModel):
+    index: int
+    session_id: str
+    status_code: int
+    response: Optional[str] = None
+    agent_type: Optional[str] = None
+    next_action: Optional[str] = None
+    emotional_state: Optional[Dict[str, Any]] = None
+    detail: Optional[str] = None
+
+class BatchConversationResponse(BaseModel):
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+    elapsed_ms: float
+
 class AnalysisResponse(BaseModel):
+    patient_id: int
     analysis: TrendAnalysis
+    timestamp: datetime
 
 class CompletionResponse(BaseModel):
+    session_id: str
     completion_message: str
+    insights: TrendAnalysis
     session_summary: Dict[str, Any]
 
+class JobAccepted(BaseModel):
+    job_id: str
+    status: str
+    session_id: Optional[str] = None
+    status_url: str
+    events_url: str
+
+class JobStatus(BaseModel):
+    id: str
+    kind: str
+    status: str  # queued, running, succeeded, failed
+    priority: int
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+class CheckInScheduleResponse(BaseModel):
+    patient_id: int
+    frequency: str
+    preferred_time: str
+    active: bool
+    next_run_at: Optional[datetime] = None
+
+class HealthResponse(BaseModel):
+    status: str
+    timestamp: datetime
+    agents: Dict[str, str]
+
 class PatientSearchRequest(BaseModel):
     email: Optional[str] = None
     date_of_birth: Optional[str] = None
@@ -0,0 +1,254 @@
+import re
+import logging
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+from .metrics import instrumented
+
+logger = logging.getLogger(__name__)
+
+# Shared pattern fragments
+_GAP = r"[^.\d\n]{0,30}?"
+_DECIMAL = r"\d{1,3}(?:\.\d+)?"
+
+# Every supported measurement is one named alternative of a single master
+# pattern, so a message is scanned exactly once with ``finditer``. Order
+# matters: more specific alternatives (keyword-anchored) come first.
+_ALTERNATIVES = [
+    # "blood pressure was 135/85 mmHg", "bp 120 over 80"
+    ("bp_kw", r"(?:blood\s+pressure|\bbp)\b" + _GAP +
+     r"(?P<bp_kw_sys>\d{2,3})(?:\s*(?:/|over)\s*(?P<bp_kw_dia>\d{2,3}))?(?:\s*(?P<bp_kw_unit>mm\s?hg))?"),
+    # "blood sugar 7.8 mmol/L", "glucose 180"
+    ("bs_kw", r"(?:blood\s+sugar|blood\s+glucose|glucose|\bbg)\b" + _GAP +
+     r"(?P<bs_kw_value>" + _DECIMAL + r")(?:\s*(?P<bs_kw_unit>mg\s*/\s*dl|mmol(?:\s*/\s*l)?))?"),
+    # A bare "sugar" needs a reading verb before the number: "sugar was 140",
+    # "my sugars came in at 6.5", but not "2 sugar cookies at 3 pm"
+    ("bs_read", r"\bsugars?(?:\s+(?:level|reading)s?)?\s*(?:was|is|were|reads?|reading|measured|came\s+in|[:=])"
+     r"(?:\s+(?:at|of))?(?:\s+(?:about|around|roughly|approximately))?\s*"
+     r"(?P<bs_read_value>" + _DECIMAL + r")(?:\s*(?P<bs_read_unit>mg\s*/\s*dl|mmol(?:\s*/\s*l)?))?"),
+    # "pain is about 7/10", "pain level 4", "my pain is a 6". A number needs a
+    # scale or level cue to be a score: not "pain in my 2 knees"
+    ("pain_scale", r"\bpain\b" + _GAP +
+     r"(?P<pain_scale_value>\d{1,2})\s*(?:/|out\s+of)\s*10\b"),
+    ("pain_kw", r"\bpain\b" + _GAP + r"\b(?:level|score|rating|rated|(?:is|was|at|of)(?:\s+(?:about|around))?\s+an?)"
+     r"\s*[:=]?\s*(?:(?:about|around)\s+)?(?P<pain_kw_value>\d{1,2})(?![\d.])"),
+    # "pulse 72", "heart rate around 88 bpm"
+    ("hr_kw", r"(?:heart\s+rate|pulse|\bhr)\b" + _GAP +
+     r"(?P<hr_kw_value>\d{2,3})(?:\s*(?P<hr_kw_unit>bpm|beats))?"),
+    # "weighed 82.5 kg this morning"
+    ("wt_kw", r"\bweigh(?:t|ed|s|ing)?\b" + _GAP +
+     r"(?P<wt_kw_value>\d{2,3}(?:\.\d+)?)(?:\s*(?P<wt_kw_unit>kgs?|kilograms?|lbs?|pounds?)\b)?"),
+    # "temperature 38.2 C", "fever of 101"
+    ("tmp_kw", r"\b(?:temp(?:erature)?|fever)\b" + _GAP +
+     r"(?P<tmp_kw_value>\d{2,3}(?:\.\d+)?)(?:\s*°?\s*(?P<tmp_kw_unit>celsius|fahrenheit|[cf]\b))?"),
+    # "slept 6 hours", "sleep was about 7.5 hrs"
+    ("sl_kw", r"\b(?:slept|sleep)\b" + _GAP +
+     r"(?P<sl_kw_value>\d{1,2}(?:\.\d+)?)\s*(?:hours?|hrs?|h)\b"),
+    # "missed my meds", "didn't take my insulin", "I never take my pills"
+    ("med_missed", r"\b(?:miss(?:ed)?|forg[eo]t|skip(?:ped)?|ran\s+out\s+of|"
+     r"(?:didn'?t|did\s+not|don'?t|do\s+not|doesn'?t|does\s+not|haven'?t|have\s+not|never|stopped|quit|no\s+longer)"
+     r"\s+(?:take|taking|taken|took))"
+     r"\s+(?:to\s+take\s+)?(?:all\s+|any\s+)?(?:my\s+|the\s+|of\s+my\s+)?(?:meds|medications?|medicines?|pills|insulin|doses?|tablets)\b"),
+    # "took my medication"
+    ("med_taken", r"\b(?:took|taken|take|taking)\s+(?:all\s+|any\s+)?(?:my\s+|the\s+|of\s+my\s+)?"
+     r"(?:meds|medications?|medicines?|pills|insulin|doses?|tablets)\b"),
+    # Unanchored forms: "135/85", "120 over 80", "180 mg/dL", "72 bpm", "7 hours of sleep"
+    ("bp_num", r"(?<![\d/.])(?P<bp_num_sys>\d{2,3})\s*(?:/|over)\s*(?P<bp_num_dia>\d{2,3})(?![\d/])(?:\s*(?P<bp_num_unit>mm\s?hg))?"),
+    ("scale_num", r"(?<![\d/.])(?P<scale_num_value>\d{1,2})\s*(?:/|out\s+of)\s*10\b"),
+    ("bs_num", r"(?P<bs_num_value>" + _DECIMAL + r")\s*(?P<bs_num_unit>mg\s*/\s*dl|mmol\s*/\s*l)"),
+    ("hr_num", r"(?P<hr_num_value>\d{2,3})\s*bpm\b"),
+    ("wt_num", r"(?P<wt_num_value>\d{2,3}(?:\.\d+)?)\s*(?P<wt_num_unit>kgs?|kilograms?|lbs?|pounds?)\b"),
+    ("tmp_num", r"(?P<tmp_num_value>\d{2,3}(?:\.\d+)?)\s*°\s*(?P<tmp_num_unit>[cf])\b"),
+    ("sl_num", r"(?P<sl_num_value>\d{1,2}(?:\.\d+)?)\s*(?:hours?|hrs?)\s+(?:of\s+)?sleep"),
+    # Engagement cues used by the questionnaire agent
+    ("kw_low", r"\b(?:yes|no|ok|okay|fine)\b"),
+    ("kw_high", r"\b(?:because|since|when|how)\b"),
+]
+
+_MASTER_PATTERN = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern in _ALTERNATIVES),
+    re.IGNORECASE
+)
+
+# A negator earlier in the same clause: "I never really take my pills"
+_NEGATED_CLAUSE = re.compile(
+    r"\b(?:not|never|no\s+longer|stopped|quit|(?:do|does|did|have|has|can|could|wo|would)n'?t)\b[^.,;!?]{0,30}$",
+    re.IGNORECASE
+)
+
+# A negator right before a missed-dose verb: "I have not missed", "I didn't really skip"
+_NEGATED_VERB = re.compile(
+    r"\b(?:not|never|(?:do|does|did|have|has)n'?t)\s+(?:\w+\s+)?$",
+    re.IGNORECASE
+)
+
+_WEIGHT_UNITS = {"kg": "kg", "kgs": "kg", "kilogram": "kg", "kilograms": "kg",
+                 "lb": "lb", "lbs": "lb", "pound": "lb", "pounds": "lb"}
+
+
+class Measurement(NamedTuple):
+    """A single PRO value found in free text"""
+    name: str
+    value: str
+    unit: Optional[str]
+    response_type: str
+    span: Tuple[int, int]
+
+
+class ExtractionResult(NamedTuple):
+    """All measurements and engagement cues found in one message"""
+    measurements: List[Measurement]
+    low_engagement_cues: int
+    high_engagement_cues: int
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Return the first value of each measurement keyed by name"""
+        extracted = {}
+        for measurement in self.measurements:
+            if measurement.name not in extracted:
+                extracted[measurement.name] = {
+                    "value": measurement.value,
+                    "unit": measurement.unit,
+                    "response_type": measurement.response_type
+                }
+        return extracted
+
+
+def _blood_pressure(match, prefix: str) -> Optional[Measurement]:
+    systolic = int(match.group(f"{prefix}_sys"))
+    diastolic = match.group(f"{prefix}_dia")
+    if not 70 <= systolic <= 260:
+        return None
+    if diastolic is None:
+        return Measurement("systolic_bp", str(systolic), "mmHg", "numeric", match.span())
+    diastolic = int(diastolic)
+    if not 30 <= diastolic <= 160 or diastolic >= systolic:
+        return None
+    return Measurement("blood_pressure", f"{systolic}/{diastolic}", "mmHg", "text", match.span())
+
+
+def _blood_sugar(match, prefix: str) -> Optional[Measurement]:
+    value = match.group(f"{prefix}_value")
+    unit = (match.group(f"{prefix}_unit") or "").lower().replace(" ", "")
+    if unit.startswith("mmol"):
+        unit = "mmol/L"
+    elif unit:
+        unit = "mg/dL"
+    else:
+        # Readings without a unit: mmol/L values are small, mg/dL values are not
+        unit = "mmol/L" if float(value) < 30 else "mg/dL"
+    # Outside these ranges the number isn't a glucose reading
+    low, high = (1, 35) if unit == "mmol/L" else (18, 600)
+    if not low <= float(value) <= high:
+        return None
+    return Measurement("blood_sugar", value, unit, "numeric", match.span())
+
+
+def _pain(match, prefix: str) -> Optional[Measurement]:
+    value = match.group(f"{prefix}_value")
+    if int(value) > 10:
+        return None
+    name = "scale_score" if prefix == "scale_num" else "pain_level"
+    return Measurement(name, value, "/10", "scale", match.span())
+
+
+def _heart_rate(match, prefix: str) -> Optional[Measurement]:
+    value = match.group(f"{prefix}_value")
+    if not 25 <= int(value) <= 250:
+        return None
+    return Measurement("heart_rate", value, "bpm", "numeric", match.span())
+
+
+def _weight(match, prefix: str) -> Optional[Measurement]:
+    unit = match.group(f"{prefix}_unit")
+    unit = _WEIGHT_UNITS.get(unit.lower()) if unit else None
+    return Measurement("weight", match.group(f"{prefix}_value"), unit, "numeric", match.span())
+
+
+def _temperature(match, prefix: str) -> Optional[Measurement]:
+    value = match.group(f"{prefix}_value")
+    unit = (match.group(f"{prefix}_unit") or "").lower()
+    if not unit:
+        unit = "f" if float(value) > 45 else "c"
+    unit = "°F" if unit.startswith("f") else "°C"
+    low, high = (90, 110) if unit == "°F" else (32, 45)
+    if not low <= float(value) <= high:
+        return None
+    return Measurement("temperature", value, unit, "numeric", match.span())
+
+
+def _sleep(match, prefix: str) -> Optional[Measurement]:
+    value = match.group(f"{prefix}_value")
+    if float(value) > 24:
+        return None
+    return Measurement("sleep_hours", value, "hours", "numeric", match.span())
+
+
+def _medication(match, prefix: str) -> Optional[Measurement]:
+    if prefix == "med_missed":
+        # "I did not miss my pills" is an adherent answer
+        negated = _NEGATED_VERB.search(match.string, 0, match.start())
+        value = "taken" if negated else "missed"
+    else:
+        negated = _NEGATED_CLAUSE.search(match.string, 0, match.start())
+        value = "missed" if negated else "taken"
+    return Measurement("medication_adherence", value, None, "boolean", match.span())
+
+
+_HANDLERS = {
+    "bp_kw": _blood_pressure,
+    "bp_num": _blood_pressure,
+    "bs_kw": _blood_sugar,
+    "bs_read": _blood_sugar,
+    "bs_num": _blood_sugar,
+    "pain_scale": _pain,
+    "pain_kw": _pain,
+    "scale_num": _pain,
+    "hr_kw": _heart_rate,
+    "hr_num": _heart_rate,
+    "wt_kw": _weight,
+    "wt_num": _weight,
+    "tmp_kw": _temperature,
+    "tmp_num": _temperature,
+    "sl_kw": _sleep,
+    "sl_num": _sleep,
+    "med_missed": _medication,
+    "med_taken": _medication,
+}
+
+
+@instrumented("extraction", "PRO extraction", methods=("extract",))
+class PROExtractor:
+    """Single-pass extractor for PRO measurements in patient free text"""
+
+    def __init__(self, pattern: re.Pattern = _MASTER_PATTERN):
+        self.pattern = pattern
+
+    def extract(self, message: str) -> ExtractionResult:
+        """Extract every supported measurement from a message"""
+        measurements = []
+        low_cues = 0
+        high_cues = 0
+
+        for match in self.pattern.finditer(message or ""):
+            kind = match.lastgroup
+            if kind == "kw_low":
+                low_cues += 1
+                continue
+            if kind == "kw_high":
+                high_cues += 1
+                continue
+
+            try:
+                measurement = _HANDLERS[kind](match, kind)
+            except (ValueError, KeyError) as e:
+                logger.error(f"Error extracting {kind} from message: {e}")
+                continue
+
+            if measurement is not None:
+                measurements.append(measurement)
+
+        return ExtractionResult(measurements, low_cues, high_cues)
+
+
+# Built once at import so request handlers never compile patterns
+default_extractor = PROExtractor()
@@ -0,0 +1,216 @@
+import json
+import logging
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Tuple
+
+from .models import ResponseType
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANGUAGE = "en"
+DEFAULT_CONDITION = "diabetes"
+DEFAULT_COMPLEXITY = "medium"
+COMPLEXITY_LEVELS = ("simple", "medium", "complex")
+
+_RESPONSE_TYPES = frozenset(response_type.value for response_type in ResponseType)
+
+# Per-language rewrites applied once per question at build time. For simple
+# questions the first matching rule wins; complex questions get the first
+# matching context note appended.
+SIMPLIFY_RULES = {
+    "en": [("scale of 1-10", "scale from 1 to 10"), ("mg/dL", "milligrams per deciliter")],
+    "es": [("escala del 1 al 10", "escala que va del 1 al 10"), ("mg/dL", "miligramos por decilitro")],
+}
+
+COMPLEX_NOTES = {
+    "en": [("blood sugar", "(Normal range is typically 80-120 mg/dL)")],
+    "es": [("azúcar en la sangre", "(El rango normal suele ser de 80-120 mg/dL)")],
+}
+
+# Translations of the built-in question bank, keyed by the English text
+BUILTIN_TRANSLATIONS = {
+    "es": {
+        "What was your blood sugar reading today?": "¿Cuál fue su nivel de azúcar en la sangre hoy?",
+        "Please enter your blood sugar reading (mg/dL):": "Por favor ingrese su nivel de azúcar en la sangre (mg/dL):",
+        "On a scale of 1-10, how well controlled do you feel your blood sugar has been today? (1=very poor, 10=excellent)":
+            "En una escala del 1 al 10, ¿qué tan controlado siente que ha estado su azúcar en la sangre hoy? (1=muy mal, 10=excelente)",
+        "Which diabetes symptoms are you experiencing today? (Select all that apply)":
+            "¿Qué síntomas de diabetes tiene hoy? (Seleccione todos los que correspondan)",
+        "Did you take your diabetes medication as prescribed today?": "¿Tomó hoy su medicamento para la diabetes según lo indicado?",
+        "Did you take your diabetes medication as prescribed today? (Yes/No)":
+            "¿Tomó hoy su medicamento para la diabetes según lo indicado? (Sí/No)",
+        "What was your blood pressure reading today?": "¿Cuál fue su presión arterial hoy?",
+        "Please enter your systolic blood pressure (top number):": "Por favor ingrese su presión arterial sistólica (el número de arriba):",
+        "Which symptoms are you experiencing? (Select all that apply)": "¿Qué síntomas tiene? (Seleccione todos los que correspondan)",
+        "On a scale of 1-10, how stressed do you feel today? (1=very relaxed, 10=extremely stressed)":
+            "En una escala del 1 al 10, ¿qué tan estresado se siente hoy? (1=muy relajado, 10=extremadamente estresado)",
+        "On a scale of 1-10, how would you rate your mood today? (1=very low, 10=excellent)":
+            "En una escala del 1 al 10, ¿cómo calificaría su estado de ánimo hoy? (1=muy bajo, 10=excelente)",
+        "On a scale of 1-10, how would you rate your energy level today? (1=very low, 10=very high)":
+            "En una escala del 1 al 10, ¿cómo calificaría su nivel de energía hoy? (1=muy bajo, 10=muy alto)",
+        "How many hours did you sleep last night?": "¿Cuántas horas durmió anoche?",
+        "Which symptoms are you experiencing today? (Select all that apply)": "¿Qué síntomas tiene hoy? (Seleccione todos los que correspondan)",
+        "On a scale of 1-10, how would you rate your pain level today? (1=no pain, 10=worst pain imaginable)":
+            "En una escala del 1 al 10, ¿cómo calificaría su nivel de dolor hoy? (1=sin dolor, 10=el peor dolor imaginable)",
+        "Where is your pain located today?": "¿Dónde siente el dolor hoy?",
+        "Where is your pain located today? (Select all that apply)": "¿Dónde siente el dolor hoy? (Seleccione todos los que correspondan)",
+        "On a scale of 1-10, how much is pain affecting your daily activities today? (1=not at all, 10=completely)":
+            "En una escala del 1 al 10, ¿cuánto afecta el dolor sus actividades diarias hoy? (1=nada, 10=completamente)",
+    }
+}
+
+
+class QuestionCatalogError(ValueError):
+    """Raised when a question catalog fails validation"""
+
+
+def _render(question: str, language: str, complexity: str) -> str:
+    """Apply the complexity rewrite rules for one language"""
+    if complexity == "simple":
+        for old, new in SIMPLIFY_RULES.get(language, []):
+            if old in question:
+                return question.replace(old, new)
+    elif complexity == "complex":
+        lowered = question.lower()
+        for marker, note in COMPLEX_NOTES.get(language, []):
+            if marker in lowered:
+                return f"{question} {note}"
+    return question
+
+
+def validate_catalog(conditions: Any) -> None:
+    """Validate a catalog mapping of condition -> category -> response type -> question"""
+    if not isinstance(conditions, dict) or not conditions:
+        raise QuestionCatalogError("Catalog must define at least one condition")
+
+    for condition, categories in conditions.items():
+        if not isinstance(categories, dict) or not categories:
+            raise QuestionCatalogError(f"Condition '{condition}' must define at least one category")
+
+        for category, templates in categories.items():
+            where = f"{condition}.{category}"
+            if not isinstance(templates, dict):
+                raise QuestionCatalogError(f"Category '{where}' must be an object")
+
+            response_types = [key for key in templates if key != "options"]
+            if not response_types:
+                raise QuestionCatalogError(f"Category '{where}' has no questions")
+
+            for response_type in response_types:
+                if response_type not in _RESPONSE_TYPES:
+                    raise QuestionCatalogError(f"Unknown response type '{response_type}' in '{where}'")
+
+                question = templates[response_type]
+                if isinstance(question, dict):
+                    if DEFAULT_LANGUAGE not in question:
+                        raise QuestionCatalogError(f"Question '{where}.{response_type}' is missing '{DEFAULT_LANGUAGE}' text")
+                    if not all(isinstance(text, str) and text for text in question.values()):
+                        raise QuestionCatalogError(f"Question '{where}.{response_type}' has empty translations")
+                elif not isinstance(question, str) or not question:
+                    raise QuestionCatalogError(f"Question '{where}.{response_type}' must be a non-empty string")
+
+            options = templates.get("options")
+            if "multiple_choice" in templates and not options:
+                raise QuestionCatalogError(f"Multiple choice question '{where}' needs options")
+            if options is not None and not (isinstance(options, list) and all(isinstance(o, str) for o in options)):
+                raise QuestionCatalogError(f"Options for '{where}' must be a list of strings")
+
+
+class QuestionCatalog:
+    """Immutable, pre-rendered index of the question bank"""
+
+    def __init__(self, conditions: Dict[str, Any], translations: Optional[Dict[str, Dict[str, str]]] = None, version: str = "builtin"):
+        validate_catalog(conditions)
+        translations = translations or {}
+
+        questions = {}
+        categories = {}
+        response_types = {}
+        options = {}
+        languages = {DEFAULT_LANGUAGE}
+
+        for condition, condition_categories in conditions.items():
+            condition = condition.lower()
+            categories[condition] = tuple(condition_categories.keys())
+
+            for category, templates in condition_categories.items():
+                types = tuple(key for key in templates if key != "options")
+                response_types[(condition, category)] = types
+                options[(condition, category)] = tuple(templates.get("options", ()))
+
+                for response_type in types:
+                    texts = templates[response_type]
+                    if isinstance(texts, str):
+                        texts = {DEFAULT_LANGUAGE: texts}
+                    texts = dict(texts)
+                    for language, lookup in translations.items():
+                        if language not in texts and texts[DEFAULT_LANGUAGE] in lookup:
+                            texts[language] = lookup[texts[DEFAULT_LANGUAGE]]
+
+                    for language, text in texts.items():
+                        languages.add(language)
+                        for complexity in COMPLEXITY_LEVELS:
+                            key = (condition, category, response_type, language, complexity)
+                            questions[key] = _render(text, language, complexity)
+
+        self.version = version
+        self.languages = frozenset(languages)
+        self._questions = MappingProxyType(questions)
+        self._categories = MappingProxyType(categories)
+        self._response_types = MappingProxyType(response_types)
+        self._options = MappingProxyType(options)
+
+    @classmethod
+    def from_file(cls, path: str) -> "QuestionCatalog":
+        """Load and validate an external JSON catalog file"""
+        try:
+            with open(path, encoding="utf-8") as catalog_file:
+                data = json.load(catalog_file)
+        except (OSError, json.JSONDecodeError) as e:
+            raise QuestionCatalogError(f"Could not read question catalog {path}: {e}") from e
+
+        if not isinstance(data, dict):
+            raise QuestionCatalogError("Catalog file must contain a JSON object")
+
+        return cls(
+            data.get("conditions"),
+            translations=data.get("translations"),
+            version=str(data.get("version", path))
+        )
+
+    def resolve_condition(self, condition: str) -> str:
+        """Return the catalog condition used for a patient condition"""
+        condition = (condition or "").lower()
+        if condition in self._categories:
+            return condition
+        return DEFAULT_CONDITION if DEFAULT_CONDITION in self._categories else next(iter(self._categories))
+
+    def conditions(self) -> Tuple[str, ...]:
+        """Conditions the catalog defines questions for"""
+        return tuple(self._categories)
+
+    def categories(self, condition: str) -> Tuple[str, ...]:
+        """Question categories for a condition"""
+        return self._categories[self.resolve_condition(condition)]
+
+    def response_types(self, condition: str, category: str) -> Tuple[str, ...]:
+        """Response types available for a category"""
+        return self._response_types.get((self.resolve_condition(condition), category), ())
+
+    def options(self, condition: str, category: str) -> Tuple[str, ...]:
+        """Multiple choice options for a category"""
+        return self._options.get((self.resolve_condition(condition), category), ())
+
+    def render(self, condition: str, category: str, response_type: str, language: str = DEFAULT_LANGUAGE, complexity: str = DEFAULT_COMPLEXITY) -> Optional[str]:
+        """Look up a pre-rendered question, falling back to English and medium complexity"""
+        condition = self.resolve_condition(condition)
+        language = (language or DEFAULT_LANGUAGE).lower()
+        if complexity not in COMPLEXITY_LEVELS:
+            complexity = DEFAULT_COMPLEXITY
+        question = self._questions.get((condition, category, response_type, language, complexity))
+        if question is None and language != DEFAULT_LANGUAGE:
+            question = self._questions.get((condition, category, response_type, DEFAULT_LANGUAGE, complexity))
+        return question
+
+    def __len__(self) -> int:
+        return len(self._questions)
@@ -0,0 +1,33 @@
+from typing import Dict, FrozenSet, List
+
+from .models import SessionPhase
+
+
+class InvalidPhaseTransition(ValueError):
+    """Raised when a session is moved to a phase it cannot reach"""
+
+
+# Allowed transitions of the per-session state machine:
+# greeting -> emotional triage -> questionnaire -> wrap-up -> completed.
+# A session can be wrapped up early from any active phase.
+TRANSITIONS: Dict[SessionPhase, FrozenSet[SessionPhase]] = {
+    SessionPhase.GREETING: frozenset({SessionPhase.EMOTIONAL_TRIAGE, SessionPhase.WRAP_UP}),
+    SessionPhase.EMOTIONAL_TRIAGE: frozenset({SessionPhase.QUESTIONNAIRE, SessionPhase.WRAP_UP}),
+    SessionPhase.QUESTIONNAIRE: frozenset({SessionPhase.WRAP_UP}),
+    SessionPhase.WRAP_UP: frozenset({SessionPhase.COMPLETED}),
+    SessionPhase.COMPLETED: frozenset(),
+}
+
+def validate_transition(from_phase: SessionPhase, to_phase: SessionPhase):
+    """Raise InvalidPhaseTransition unless the state machine allows the move"""
+    if to_phase not in TRANSITIONS[from_phase]:
+        raise InvalidPhaseTransition(f"Cannot move session from {from_phase.value} to {to_phase.value}")
+
+
+def path_to_completion(phase: SessionPhase) -> List[SessionPhase]:
+    """Phases a session passes through when it is completed from ``phase``"""
+    if phase == SessionPhase.COMPLETED:
+        return []
+    if phase == SessionPhase.WRAP_UP:
+        return [SessionPhase.COMPLETED]
+    return [SessionPhase.WRAP_UP, SessionPhase.COMPLETED]
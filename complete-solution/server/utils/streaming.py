@@ -0,0 +1,51 @@
+import asyncio
+import orjson
+import re
+import time
+from typing import Dict, Any, Optional, AsyncIterator, Iterator
+
+# Mock agents return whole strings; stream them a few words at a time
+CHUNK_WORDS = 3
+
+_WORD_PATTERN = re.compile(r"\S+\s*")
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {orjson.dumps(data, default=str).decode()}\n\n"
+
+
+def chunk_text(text: str, words: int = CHUNK_WORDS) -> Iterator[str]:
+    """Split a response into chunks of a few words, keeping the whitespace"""
+    tokens = _WORD_PATTERN.findall(text or "")
+    for start in range(0, len(tokens), words):
+        yield "".join(tokens[start:start + words])
+
+
+class StreamTimer:
+    """Time to first token and total latency of one streamed response"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+
+    def mark_token(self):
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+
+    def metrics(self) -> Dict[str, Optional[float]]:
+        total = (time.perf_counter() - self.started) * 1000
+        ttft = (self.first_token - self.started) * 1000 if self.first_token is not None else None
+        return {
+            "ttft_ms": round(ttft, 2) if ttft is not None else None,
+            "total_ms": round(total, 2)
+        }
+
+
+async def stream_text(text: str, timer: StreamTimer) -> AsyncIterator[str]:
+    """SSE token events for an already complete response"""
+    for chunk in chunk_text(text):
+        timer.mark_token()
+        yield sse_event("token", {"text": chunk})
+        # Let the server flush each chunk
+        await asyncio.sleep(0)
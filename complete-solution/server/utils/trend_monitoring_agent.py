@@ -9,11 +9,13 @@ import random
 
 from .models import Patient, TrendAnalysis, TrendAlert, AlertSeverity
 from .database import DatabaseManager
+from .metrics import instrumented
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+@instrumented("agent_call", "Agent method", agent="trend_monitoring")
 class TrendMonitoringAgent:
     def __init__(self):
         """Initialize the Trend Monitoring Agent with mock responses for testing"""
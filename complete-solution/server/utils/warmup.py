@@ -0,0 +1,99 @@
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, List, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LazyAgent:
+    """Stands in for an agent and builds it on first attribute access.
+
+    Callers use it like the agent; the warm-up task normally builds it
+    before the first request arrives. Async code awaits ``load()`` first:
+    a build triggered by attribute access would run on the event loop.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self.factory = factory
+        self.build_seconds: Optional[float] = None
+        self._instance = None
+        self._lock = threading.Lock()
+        self._loading: Optional[asyncio.Future] = None
+
+    @property
+    def built(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> Any:
+        """Return the agent, building it if needed"""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    start = time.perf_counter()
+                    self._instance = self.factory()
+                    self.build_seconds = time.perf_counter() - start
+                    logger.info(f"Built {self.name} in {self.build_seconds * 1000:.1f}ms")
+        return self._instance
+
+    async def load(self) -> Any:
+        """Return the agent, building it in a worker thread if needed.
+
+        Concurrent callers and the warm-up share one build; a failed build is
+        retried by the next caller.
+        """
+        if self._instance is not None:
+            return self._instance
+        if self._loading is None or (self._loading.done() and self._loading.exception() is not None):
+            self._loading = asyncio.ensure_future(asyncio.to_thread(self.get))
+        return await asyncio.shield(self._loading)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.get(), attr)
+
+
+class WarmUp:
+    """Start-up steps run in a background task with per-step timings"""
+
+    def __init__(self):
+        self.steps: List[Tuple[str, Callable[[], Any]]] = []
+        self.timings: Dict[str, float] = {}
+        self.ready = False
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, name: str, step: Callable[[], Any]):
+        self.steps.append((name, step))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def run(self):
+        """Run every step in order; synchronous steps run in a worker thread"""
+        started = time.perf_counter()
+        for name, step in self.steps:
+            step_started = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(step):
+                    await step()
+                else:
+                    await asyncio.to_thread(step)
+            except Exception as e:
+                self.error = f"{name}: {e}"
+                logger.error(f"Warm-up step {name} failed: {e}")
+                return
+            self.timings[name] = round((time.perf_counter() - step_started) * 1000, 2)
+        self.timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+        self.ready = True
+        logger.info(f"Warm-up finished in {self.timings['total']}ms")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else ("failed" if self.error else "warming_up"),
+            "timings_ms": self.timings,
+            "error": self.error
+        }